@@ -4,7 +4,7 @@ Global Error Handling Middleware
 from flask import jsonify
 from utils.exceptions import (
     AppException, ValidationError, NotFoundError, 
-    GenerationError, StorageError, APIError
+    GenerationError, StorageError, APIError, CircuitOpenError, GenerationCancelledError
 )
 from utils.logger import setup_logger
 
@@ -46,6 +46,25 @@ def register_error_handlers(app):
             "message": str(e)
         }), 500
     
+    @app.errorhandler(CircuitOpenError)
+    def handle_circuit_open_error(e):
+        logger.warning(f"Circuit open: {str(e)}")
+        response = jsonify({
+            "error": "External API temporarily unavailable",
+            "message": str(e)
+        })
+        if e.retry_after is not None:
+            response.headers['Retry-After'] = str(max(int(e.retry_after), 1))
+        return response, 503
+    
+    @app.errorhandler(GenerationCancelledError)
+    def handle_generation_cancelled_error(e):
+        logger.info(f"Generation cancelled: {str(e)}")
+        return jsonify({
+            "error": "Generation cancelled",
+            "message": str(e)
+        }), 409
+    
     @app.errorhandler(APIError)
     def handle_api_error(e):
         logger.error(f"API error: {str(e)}")
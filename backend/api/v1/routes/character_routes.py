@@ -1,10 +1,20 @@
 """
 Character Routes
 """
-from flask import Blueprint, request, jsonify
+import json
+from collections import Counter
+from bson import ObjectId
+from flask import Blueprint, Response, request, jsonify, url_for, stream_with_context
+from config import config
 from core.services.character_service import CharacterService
 from core.services.generation_service import GenerationService
-from utils.validators import validate_character_form, validate_character_id
+from core.tasks.job_queue import (
+    enqueue_job, get_active_job, get_batch_jobs, cancel_job, INTERACTIVE_PRIORITY, BULK_PRIORITY
+)
+from core.tasks.progress import get_progress_publisher, TERMINAL_EVENTS
+from database.repositories.character_repository import ANIMATION_DIRECTIONS
+from utils.validators import validate_character_form, validate_character_id, validate_batch_id
+from utils.exceptions import ValidationError
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -16,47 +26,306 @@ generation_service = GenerationService()
 
 @bp.route('/characters/generate', methods=['POST'])
 def generate_character():
-    """Create character (generate images + story)"""
+    """
+    Create character and queue its generation (images + story)
+    
+    With "reuse": true, an earlier character generated from an identical form is
+    copied instead (200, no job and no external API calls) when one exists.
+    """
     try:
         data = request.get_json()
         
         # Validate input
         validated_data = validate_character_form(data)
-        
-        # Generate character
-        character = generation_service.generate_character(validated_data)
-        
-        # Return result
-        return jsonify(character.to_dict()), 201
+        reuse = bool(validated_data.pop('reuse', False))
+        
+        if reuse:
+            character = generation_service.reuse_character(validated_data)
+            if character is not None:
+                return jsonify({
+                    'character_id': str(character.id),
+                    'status': character.status,
+                    'reused_from': character.metadata.get('reused_from'),
+                    'character': character.to_dict()
+                }), 200
+        
+        # Create character and queue generation job (runs in a background worker)
+        character = generation_service.create_character(validated_data)
+        try:
+            job = enqueue_job(
+                str(character.id), validated_data,
+                priority=INTERACTIVE_PRIORITY,
+                owner=_client_key(character),
+                cost=generation_service._count_steps(validated_data),
+                deadline_seconds=float(validated_data['deadlineSeconds']) if 'deadlineSeconds' in validated_data else None
+            )
+        except Exception:
+            generation_service.character_repo.update_status(str(character.id), 'failed')
+            raise
+        
+        # Return job reference, subscribe to events_url (or poll status_url) for the result
+        status_url = url_for('jobs.get_job_status', job_id=str(job.id))
+        response = jsonify({
+            'job_id': str(job.id),
+            'character_id': str(character.id),
+            'status': job.status,
+            'status_url': status_url,
+            'events_url': url_for('characters.stream_character_events', character_id=str(character.id)),
+            'cancel_url': url_for('characters.cancel_generation', character_id=str(character.id))
+        })
+        response.headers['Location'] = status_url
+        return response, 202
     
     except Exception as e:
         logger.error(f"Failed to generate character: {str(e)}")
         raise
 
 
-@bp.route('/characters', methods=['GET'])
-def get_characters():
-    """Get character list"""
+@bp.route('/characters/batch', methods=['POST'])
+def generate_character_batch():
+    """
+    Create several characters and queue their generation as one batch
+    
+    Body: {"characters": [form, ...]}. Every form is validated before anything is
+    queued. Items run as bulk-priority jobs on the shared workers, with the same
+    rate limits and connection pools as single generations; follow them with
+    GET /characters/batch/<batch_id> (or each item's events_url).
+    """
+    try:
+        data = request.get_json() or {}
+        forms = data.get('characters')
+        if not isinstance(forms, list) or not forms:
+            raise ValidationError("characters must be a non-empty list of character forms")
+        if len(forms) > config.BATCH_MAX_ITEMS:
+            raise ValidationError(f"A batch can contain at most {config.BATCH_MAX_ITEMS} characters")
+        
+        # Validate every form first, an invalid form rejects the whole batch
+        validated_forms = []
+        for index, form in enumerate(forms):
+            if not isinstance(form, dict):
+                raise ValidationError(f"characters[{index}] must be an object")
+            try:
+                validated_forms.append(validate_character_form(form))
+            except ValidationError as e:
+                raise ValidationError(f"characters[{index}]: {str(e)}")
+        
+        batch_id = str(ObjectId())
+        owner = _client_key()
+        items = []
+        for index, validated_data in enumerate(validated_forms):
+            character = generation_service.create_character(validated_data)
+            try:
+                job = enqueue_job(
+                    str(character.id), validated_data,
+                    priority=BULK_PRIORITY,
+                    owner=owner,
+                    cost=generation_service._count_steps(validated_data),
+                    deadline_seconds=float(validated_data['deadlineSeconds']) if 'deadlineSeconds' in validated_data else None,
+                    batch_id=batch_id,
+                    batch_index=index
+                )
+            except Exception:
+                generation_service.character_repo.update_status(str(character.id), 'failed')
+                raise
+            items.append({
+                'index': index,
+                'job_id': str(job.id),
+                'character_id': str(character.id),
+                'status': job.status,
+                'events_url': url_for('characters.stream_character_events', character_id=str(character.id))
+            })
+        logger.info(f"Queued batch {batch_id} with {len(items)} characters")
+        
+        status_url = url_for('characters.get_batch_status', batch_id=batch_id)
+        response = jsonify({
+            'batch_id': batch_id,
+            'total': len(items),
+            'status_url': status_url,
+            'cancel_url': url_for('characters.cancel_batch', batch_id=batch_id),
+            'items': items
+        })
+        response.headers['Location'] = status_url
+        return response, 202
+    
+    except Exception as e:
+        logger.error(f"Failed to generate character batch: {str(e)}")
+        raise
+
+
+@bp.route('/characters/batch/<batch_id>', methods=['GET'])
+def get_batch_status(batch_id):
+    """Get the progress of every character of a batch"""
     try:
-        user_id = request.args.get('user_id')
-        limit = request.args.get('limit', type=int)
-        skip = request.args.get('skip', 0, type=int)
-        status = request.args.get('status', 'completed')
-        
-        characters = character_service.get_characters(
-            user_id=user_id,
-            limit=limit,
-            skip=skip,
-            status=status
-        )
+        validate_batch_id(batch_id)
+        jobs = get_batch_jobs(batch_id)
+        
+        if not jobs:
+            from utils.exceptions import NotFoundError
+            raise NotFoundError(f"Batch not found: {batch_id}")
         
+        characters = {
+            str(character.id): character
+            for character in generation_service.character_repo.get_by_ids(
+                [str(job.character_id) for job in jobs], 'name', 'status', 'input_params', 'completed_steps'
+            )
+        }
+        
+        items = []
+        for job in jobs:
+            character = characters.get(str(job.character_id))
+            if job.status == 'succeeded':
+                progress = 1.0
+            else:
+                progress = _calculate_progress(character) if character else 0.0
+            items.append({
+                'index': job.batch_index,
+                'job_id': str(job.id),
+                'character_id': str(job.character_id),
+                'name': character.name if character else None,
+                'status': job.status,
+                'character_status': character.status if character else None,
+                'progress': progress,
+                'completed_steps': len(character.completed_steps or []) if character else 0,
+                'error': job.error,
+                'events_url': url_for('characters.stream_character_events', character_id=str(job.character_id))
+            })
+        
+        counts = Counter(job.status for job in jobs)
         return jsonify({
-            'characters': [char.to_dict() for char in characters],
-            'total': len(characters)
+            'batch_id': batch_id,
+            'total': len(jobs),
+            'counts': dict(counts),
+            'finished': all(job.finished for job in jobs),
+            'progress': sum(item['progress'] for item in items) / len(items),
+            'items': items
         }), 200
     
     except Exception as e:
-        logger.error(f"Failed to get characters: {str(e)}")
+        logger.error(f"Failed to get batch status: {str(e)}")
+        raise
+
+
+@bp.route('/characters/batch/<batch_id>/cancel', methods=['POST'])
+def cancel_batch(batch_id):
+    """Cancel every queued or running character of a batch (finished ones are kept)"""
+    try:
+        validate_batch_id(batch_id)
+        jobs = get_batch_jobs(batch_id)
+        
+        if not jobs:
+            from utils.exceptions import NotFoundError
+            raise NotFoundError(f"Batch not found: {batch_id}")
+        
+        cancelled = requested = 0
+        for job in jobs:
+            if job.finished:
+                continue
+            job = cancel_job(job)
+            if job is None:
+                continue
+            if job.status == 'cancelled':
+                cancelled += 1
+            else:
+                requested += 1
+        
+        return jsonify({
+            'batch_id': batch_id,
+            'cancelled': cancelled,
+            'cancel_requested': requested
+        }), 202 if requested else 200
+    
+    except Exception as e:
+        logger.error(f"Failed to cancel batch: {str(e)}")
+        raise
+
+
+def _client_key(character=None) -> str:
+    """Fair-share key of the requester: the character's user, else the client address"""
+    if character is not None and character.user_id:
+        return str(character.user_id)
+    forwarded_for = request.headers.get('X-Forwarded-For', '')
+    return forwarded_for.split(',')[0].strip() or request.remote_addr or 'anonymous'
+
+
+@bp.route('/characters/<character_id>/resume', methods=['POST'])
+def resume_generation(character_id):
+    """Queue a generation job that only generates the steps an earlier run did not finish"""
+    try:
+        validate_character_id(character_id)
+        character = generation_service.character_repo.get_by_id(character_id)
+        
+        if not character:
+            from utils.exceptions import NotFoundError
+            raise NotFoundError(f"Character not found: {character_id}")
+        
+        if character.status in ['pending_save', 'completed']:
+            return jsonify({
+                'error': 'Character generation is already finished',
+                'status': character.status
+            }), 400
+        
+        # A queued or running job already resumes from the finished steps (unless it is being cancelled)
+        job = get_active_job(character_id)
+        if job is None or job.cancel_requested:
+            job = enqueue_job(
+                character_id, character.input_params,
+                priority=INTERACTIVE_PRIORITY,
+                owner=_client_key(character),
+                cost=generation_service._count_steps(character.input_params or {})
+            )
+        
+        status_url = url_for('jobs.get_job_status', job_id=str(job.id))
+        response = jsonify({
+            'job_id': str(job.id),
+            'character_id': character_id,
+            'status': job.status,
+            'completed_steps': list(character.completed_steps or []),
+            'status_url': status_url,
+            'events_url': url_for('characters.stream_character_events', character_id=character_id)
+        })
+        response.headers['Location'] = status_url
+        return response, 202
+    
+    except Exception as e:
+        logger.error(f"Failed to resume generation: {str(e)}")
+        raise
+
+
+@bp.route('/characters/<character_id>/cancel', methods=['POST'])
+def cancel_generation(character_id):
+    """
+    Cancel the queued or running generation of a character
+    
+    A queued job is cancelled at once (200). A running job stops at its next
+    wait or check (202), pending API calls and retries are abandoned; finished
+    steps are kept and can be resumed.
+    """
+    try:
+        validate_character_id(character_id)
+        character = generation_service.character_repo.get_by_id(character_id)
+        
+        if not character:
+            from utils.exceptions import NotFoundError
+            raise NotFoundError(f"Character not found: {character_id}")
+        
+        job = get_active_job(character_id)
+        if job is not None:
+            job = cancel_job(job)
+        if job is None:
+            return jsonify({
+                'error': 'No generation in progress',
+                'status': character.status
+            }), 400
+        
+        return jsonify({
+            'job_id': str(job.id),
+            'character_id': character_id,
+            'status': job.status,
+            'cancel_requested': job.cancel_requested
+        }), 200 if job.status == 'cancelled' else 202
+    
+    except Exception as e:
+        logger.error(f"Failed to cancel generation: {str(e)}")
         raise
 
 
@@ -176,6 +445,67 @@ def get_character_status(character_id):
         raise
 
 
+@bp.route('/characters/<character_id>/events', methods=['GET'])
+def stream_character_events(character_id):
+    """
+    Stream generation progress as Server-Sent Events
+    
+    The first event ("snapshot") is the current state of the character. Then one
+    event is sent per finished step ("started", "step"), and the stream ends with
+    "completed", "failed" or "cancelled". Reconnecting clients send Last-Event-ID to continue.
+    """
+    validate_character_id(character_id)
+    character = generation_service.character_repo.get_by_id(character_id)
+    
+    if not character:
+        from utils.exceptions import NotFoundError
+        raise NotFoundError(f"Character not found: {character_id}")
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    progress = get_progress_publisher()
+    finished_statuses = ('pending_save', 'completed', 'failed', 'cancelled')
+    
+    def stream():
+        yield _sse_event('snapshot', {
+            'status': character.status,
+            'completed_steps': list(character.completed_steps or []),
+            'progress': _calculate_progress(character),
+            'character': character.to_dict()
+        })
+        if character.status in finished_statuses and not last_event_id:
+            return
+        
+        for event in progress.subscribe(character_id, last_event_id):
+            if event is None:
+                # Idle: keep the connection open, and stop if the generation ended without
+                # an event reaching this process (e.g. worker in another process, memory backend)
+                status = generation_service.character_repo.get_status(character_id)
+                if status is None or status in finished_statuses:
+                    yield _sse_event('end', {'status': status})
+                    return
+                yield ': keep-alive\n\n'
+                continue
+            
+            yield _sse_event(event['type'], event, event_id=event['id'])
+            if event['type'] in TERMINAL_EVENTS:
+                return
+    
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (Nginx)
+    return response
+
+
+def _sse_event(event_type, data, event_id=None):
+    """Format a Server-Sent Event"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
 @bp.route('/characters/<character_id>/save', methods=['POST'])
 def save_character(character_id):
     """Save character to gallery (confirm save)"""
@@ -197,7 +527,7 @@ def save_character(character_id):
         # If status is pending_save, change to completed
         if character.status == 'pending_save':
             character.status = 'completed'
-            character.save()
+            character_service.character_repo.update_status(character_id, 'completed')
             logger.info(f"Character {character_id} status changed from pending_save to completed")
         
         logger.info(f"Character {character_id} saved to gallery by user (status is completed)")
@@ -243,11 +573,13 @@ def _calculate_progress(character):
         return 1.0
     elif character.status == 'failed':
         return 0.0
-    elif character.status == 'generating':
-        # Estimate progress based on number of generated images
-        total_images = character.input_params.get('imageCount', 4)
-        generated_images = len(character.images)
-        return min(generated_images / total_images, 0.9)  # Maximum 90% until completed
+    elif character.status == 'pending_save':
+        return 1.0
+    elif character.status in ('generating', 'cancelled'):
+        # Finished steps out of base image + rotations + story
+        total_steps = generation_service._count_steps(character.input_params)
+        finished_steps = len(character.completed_steps or [])
+        return min(finished_steps / total_steps, 0.9)  # Maximum 90% until completed
     else:
         return 0.0
 
@@ -261,13 +593,22 @@ def add_animation(character_id):
         animation_type = data.get('animation_type')
         
         if not animation_type:
-            from utils.exceptions import ValidationError
             raise ValidationError("animation_type is required")
         
         if animation_type not in ['walk', 'run', 'jump', 'attack']:
-            from utils.exceptions import ValidationError
             raise ValidationError("Invalid animation_type. Must be one of: walk, run, jump, attack")
         
+        # Directions generated right away (default: south)
+        directions = data.get('directions') or ['south']
+        if not isinstance(directions, list) or any(direction not in ANIMATION_DIRECTIONS for direction in directions):
+            raise ValidationError(f"directions must be a list of: {', '.join(ANIMATION_DIRECTIONS)}")
+        directions = list(dict.fromkeys(directions))
+        
+        # Mirror mode override (default: the character's mirrorDirections)
+        mirror = data.get('mirrorDirections')
+        if mirror is not None and not isinstance(mirror, bool):
+            raise ValidationError("mirrorDirections must be a boolean")
+        
         character = character_service.get_character(character_id)
         if not character:
             from utils.exceptions import NotFoundError
@@ -285,39 +626,19 @@ def add_animation(character_id):
             }), 200
         
         # Create new animation (default generate south direction animation)
-        character.animations[animation_type] = {
-            'south': [],
-            'north': [],
-            'north-east': [],
-            'east': [],
-            'south-east': [],
-            'south-west': [],
-            'west': [],
-            'north-west': []
-        }
+        character.animations[animation_type] = {direction: [] for direction in ANIMATION_DIRECTIONS}
         
-        character.save()
+        character_service.character_repo.init_animation(character_id, animation_type)
         
-        # Auto-generate south direction animation (default direction)
+        # Auto-generate the requested directions (concurrently, saved and checkpointed by the service)
         try:
-            from core.services.generation_service import GenerationService
-            generation_service = GenerationService()
-            
-            # Get south direction idle image as reference
+            # Only characters that have their south direction idle image
             south_idle = next((img for img in character.images if img.get('direction') == 'south'), None)
             if south_idle:
-                logger.info(f"Auto-generating south direction for {animation_type}")
-                frames = generation_service._generate_animation_frames(
-                    character_id=character_id,
-                    animation_type=animation_type,
-                    direction='south',
-                    reference_image_path=south_idle.get('path'),
-                    n_frames=4
-                )
-                character.animations[animation_type]['south'] = frames
-                character.save()
+                logger.info(f"Auto-generating {', '.join(directions)} for {animation_type}")
+                generation_service.generate_animation(character, animation_type, directions, mirror=mirror)
         except Exception as e:
-            logger.warning(f"Failed to auto-generate south direction: {str(e)}")
+            logger.warning(f"Failed to auto-generate {', '.join(directions)}: {str(e)}")
             # Continue, don't block animation creation
         
         logger.info(f"Added animation {animation_type} to character {character_id}")
@@ -342,7 +663,6 @@ def generate_animation_direction(character_id, animation_type, direction):
         valid_directions = ['north', 'north-east', 'east', 'south-east', 
                            'south', 'south-west', 'west', 'north-west']
         if direction not in valid_directions:
-            from utils.exceptions import ValidationError
             raise ValidationError(f"Invalid direction. Must be one of: {', '.join(valid_directions)}")
         
         character = character_service.get_character(character_id)
@@ -359,10 +679,6 @@ def generate_animation_direction(character_id, animation_type, direction):
             from utils.exceptions import NotFoundError
             raise NotFoundError(f"Animation {animation_type} not found. Please add it first.")
         
-        # Call generation service to generate animation frames
-        from core.services.generation_service import GenerationService
-        generation_service = GenerationService()
-        
         # Get idle image for this direction as reference
         # Try to find by direction field, if not found try angle field
         idle_image = next((img for img in character.images if img.get('direction') == direction), None)
@@ -375,24 +691,18 @@ def generate_animation_direction(character_id, animation_type, direction):
             from utils.exceptions import NotFoundError
             raise NotFoundError(f"Idle image for direction {direction} not found. Available directions: {[img.get('direction') or img.get('angle') for img in character.images]}")
         
-        # Generate animation frames (using prompt-only generation, similar to generating directional images)
-        frames = generation_service._generate_animation_frames(
-            character_id=character_id,
-            animation_type=animation_type,
-            direction=direction,
-            reference_image_path=None,  # Don't use reference image, use prompt-only
-            n_frames=4,  # Default 4 frames
-            use_prompt_only=True  # Use prompt-only generation, define independent description for each frame
-        )
-        
-        # Update character's animation data
-        if direction not in character.animations[animation_type]:
-            character.animations[animation_type][direction] = []
+        # Mirror mode override (default: the character's mirrorDirections)
+        mirror = (request.get_json(silent=True) or {}).get('mirrorDirections')
+        if mirror is not None and not isinstance(mirror, bool):
+            raise ValidationError("mirrorDirections must be a boolean")
+        
+        # Generate animation frames (prompt-only generation, similar to generating directional images);
+        # in mirror mode a west-facing direction is flipped from its stored east-facing frames.
+        # The service saves them on the character and records the step
+        frames = generation_service.generate_animation(character, animation_type, [direction], mirror=mirror)[direction]
         
         # Ensure frames are sorted by frame_index to avoid GIF frame order confusion
         sorted_frames = sorted(frames, key=lambda f: f.get('frame_index', 0))
-        character.animations[animation_type][direction] = sorted_frames
-        character.save()
         
         logger.info(f"Generated {len(sorted_frames)} frames for {animation_type} - {direction}")
         
@@ -474,7 +784,6 @@ def delete_animation(character_id, animation_type):
         validate_character_id(character_id)
         
         if animation_type not in ['walk', 'run', 'jump', 'attack']:
-            from utils.exceptions import ValidationError
             raise ValidationError("Invalid animation_type. Must be one of: walk, run, jump, attack")
         
         character = character_service.get_character(character_id)
@@ -521,7 +830,7 @@ def delete_animation(character_id, animation_type):
         
         # Delete animation from database
         del character.animations[animation_type]
-        character.save()
+        character_service.character_repo.remove_animation(character_id, animation_type)
         
         logger.info(f"Deleted animation {animation_type} from character {character_id}")
         
@@ -544,7 +853,6 @@ def delete_animation_direction(character_id, animation_type, direction):
         valid_directions = ['north', 'north-east', 'east', 'south-east', 
                            'south', 'south-west', 'west', 'north-west']
         if direction not in valid_directions:
-            from utils.exceptions import ValidationError
             raise ValidationError(f"Invalid direction. Must be one of: {', '.join(valid_directions)}")
         
         character = character_service.get_character(character_id)
@@ -581,7 +889,7 @@ def delete_animation_direction(character_id, animation_type, direction):
         
         # Delete direction from database
         character.animations[animation_type][direction] = []
-        character.save()
+        character_service.character_repo.set_animation_direction(character_id, animation_type, direction, [])
         
         logger.info(f"Deleted direction {direction} from animation {animation_type}")
         
@@ -3,6 +3,12 @@ Health Check Routes
 """
 from flask import Blueprint, jsonify
 from database.connection import check_db_connection
+from integrations.circuit_breaker import get_circuit_states
+from integrations.concurrency_limiter import get_concurrency_limits
+from integrations.hedging import get_hedging_stats
+from integrations.response_cache import get_response_cache
+from integrations.single_flight import get_single_flight_stats
+from config import config
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -29,3 +35,18 @@ def health_db():
         'database': 'connected' if db_status else 'disconnected'
     }), 200 if db_status else 503
 
+
+@bp.route('/health/integrations', methods=['GET'])
+def health_integrations():
+    """External API circuit breaker states, concurrency limits, request coalescing, hedging and response cache statistics"""
+    breakers = get_circuit_states()
+    degraded = any(state['state'] != 'closed' for state in breakers.values())
+    
+    return jsonify({
+        'status': 'degraded' if degraded else 'ok',
+        'circuit_breakers': breakers,
+        'concurrency_limits': get_concurrency_limits(),
+        'single_flight': get_single_flight_stats(),
+        'hedging': get_hedging_stats(),
+        'response_cache': get_response_cache().stats() if config.PIXELLAB_CACHE_ENABLED else None
+    }), 200
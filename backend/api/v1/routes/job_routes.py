@@ -0,0 +1,49 @@
+"""
+Job Routes
+"""
+from flask import Blueprint, request, jsonify
+from database.repositories.character_repository import CharacterRepository
+from core.tasks.job_queue import get_job, get_queue_metrics
+from utils.validators import validate_job_id
+from utils.exceptions import NotFoundError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+bp = Blueprint('jobs', __name__)
+character_repo = CharacterRepository()
+
+
+@bp.route('/jobs/metrics', methods=['GET'])
+def get_job_metrics():
+    """Queue depth and wait times per priority class (window: ?window=seconds, default 900)"""
+    try:
+        window = request.args.get('window', 900, type=float)
+        return jsonify(get_queue_metrics(window)), 200
+    
+    except Exception as e:
+        logger.error(f"Failed to get job metrics: {str(e)}")
+        raise
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Get background job status (includes the character once the job succeeded)"""
+    try:
+        validate_job_id(job_id)
+        job = get_job(job_id)
+        
+        if not job:
+            raise NotFoundError(f"Job not found: {job_id}")
+        
+        result = job.to_dict()
+        if job.status == 'succeeded':
+            # Read through the repository, polling must not count as a view
+            character = character_repo.get_by_id(str(job.character_id))
+            result['character'] = character.to_dict() if character else None
+        
+        return jsonify(result), 200
+    
+    except Exception as e:
+        logger.error(f"Failed to get job status: {str(e)}")
+        raise
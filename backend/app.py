@@ -10,6 +10,8 @@ from api.v1.routes.character_routes import bp as character_bp
 from api.v1.routes.gallery_routes import bp as gallery_bp
 from api.v1.routes.download_routes import bp as download_bp
 from api.v1.routes.health_routes import bp as health_bp
+from api.v1.routes.job_routes import bp as job_bp
+from core.tasks.worker import start_job_worker
 from utils.logger import setup_logger
 from pathlib import Path
 
@@ -86,6 +88,11 @@ def create_app():
     app.register_blueprint(gallery_bp, url_prefix='/api/v1')
     app.register_blueprint(download_bp, url_prefix='/api/v1')
     app.register_blueprint(health_bp, url_prefix='/api/v1')
+    app.register_blueprint(job_bp, url_prefix='/api/v1')
+    
+    # Background generation worker (external mode runs `python -m core.tasks.worker` instead)
+    if config.JOB_WORKER_MODE == 'inprocess' and not config.TESTING:
+        start_job_worker()
     
     # Legacy API compatibility (optional, for smooth migration)
     @app.route('/generate_gif', methods=['POST'])
@@ -13,6 +13,29 @@ load_dotenv()
 BASE_DIR = Path(__file__).parent
 
 
+def _parse_weights(value: str) -> dict:
+    """Parse "name=weight,..." into {name: float}"""
+    weights = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        name, weight = item.split('=', 1)
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def _parse_rate_limits(value: str) -> dict:
+    """Parse "endpoint=rate:burst,..." into {endpoint: {'rate': float, 'burst': int}}"""
+    limits = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        endpoint, budget = item.split('=', 1)
+        rate, _, burst = budget.partition(':')
+        limits[endpoint.strip()] = {'rate': float(rate), 'burst': int(burst or 1)}
+    return limits
+
+
 class Config:
     """Application Configuration Class"""
     
@@ -41,12 +64,128 @@ class Config:
     META_LLAMA_TOKEN = os.getenv('HF_TOKEN', '')
     STABILITY_API_KEY = os.getenv('SDF_KEY', '')
     
+    # External API base URLs (point both at scripts/mock_provider_server.py for load testing)
+    PIXELLAB_BASE_URL = os.getenv('PIXELLAB_BASE_URL', 'https://api.pixellab.ai/v1').rstrip('/')
+    HF_BASE_URL = os.getenv('HF_BASE_URL', 'https://router.huggingface.co/v1').rstrip('/')
+    
+    # HTTP connection pool configuration (shared by external API clients)
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '4'))  # Number of host pools to cache
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '16'))  # Max connections kept per host
+    HTTP_POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', 'False').lower() == 'true'  # Block when pool is exhausted
+    HTTP_KEEP_ALIVE = os.getenv('HTTP_KEEP_ALIVE', 'True').lower() == 'true'
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '10'))  # seconds
+    
+    # PixelLab read timeouts (seconds), generation may take several minutes
+    PIXELLAB_READ_TIMEOUT = float(os.getenv('PIXELLAB_READ_TIMEOUT', '180'))
+    PIXELLAB_ROTATE_READ_TIMEOUT = float(os.getenv('PIXELLAB_ROTATE_READ_TIMEOUT', '120'))
+    PIXELLAB_ANIMATE_READ_TIMEOUT = float(os.getenv('PIXELLAB_ANIMATE_READ_TIMEOUT', '120'))
+    
+    # Async PixelLab client: maximum in-flight requests per client instance
+    PIXELLAB_MAX_CONCURRENCY = int(os.getenv('PIXELLAB_MAX_CONCURRENCY', '16'))
+    
+    # Rate limiting (token bucket per external endpoint)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')  # memory (per process) or mongo (all workers)
+    RATE_LIMIT_COLLECTION = 'rate_limits'
+    PIXELLAB_RATE_LIMIT = float(os.getenv('PIXELLAB_RATE_LIMIT', '2'))  # requests/sec per endpoint
+    PIXELLAB_RATE_BURST = int(os.getenv('PIXELLAB_RATE_BURST', '4'))
+    HF_RATE_LIMIT = float(os.getenv('HF_RATE_LIMIT', '1'))
+    HF_RATE_BURST = int(os.getenv('HF_RATE_BURST', '2'))
+    RATE_LIMITS = {
+        'pixflux': {'rate': PIXELLAB_RATE_LIMIT, 'burst': PIXELLAB_RATE_BURST},
+        'rotate': {'rate': PIXELLAB_RATE_LIMIT, 'burst': PIXELLAB_RATE_BURST},
+        'animate-with-text': {'rate': PIXELLAB_RATE_LIMIT, 'burst': PIXELLAB_RATE_BURST},
+        'animate-with-skeleton': {'rate': PIXELLAB_RATE_LIMIT, 'burst': PIXELLAB_RATE_BURST},
+        'hf-router': {'rate': HF_RATE_LIMIT, 'burst': HF_RATE_BURST},
+    } if RATE_LIMIT_ENABLED else {}
+    # Per-endpoint overrides, e.g. RATE_LIMIT_OVERRIDES=rotate=1:2,pixflux=0.5:1 (rate:burst)
+    if RATE_LIMIT_ENABLED:
+        RATE_LIMITS.update(_parse_rate_limits(os.getenv('RATE_LIMIT_OVERRIDES', '')))
+    
+    # Adaptive concurrency (AIMD, per external endpoint): the in-flight limit grows while requests
+    # are healthy and is cut on 429/503/504, timeouts and latency spikes
+    ADAPTIVE_CONCURRENCY_ENABLED = os.getenv('ADAPTIVE_CONCURRENCY_ENABLED', 'True').lower() == 'true'
+    ADAPTIVE_CONCURRENCY_INITIAL = float(os.getenv('ADAPTIVE_CONCURRENCY_INITIAL', '8'))
+    ADAPTIVE_CONCURRENCY_MIN = float(os.getenv('ADAPTIVE_CONCURRENCY_MIN', '1'))
+    ADAPTIVE_CONCURRENCY_MAX = float(os.getenv('ADAPTIVE_CONCURRENCY_MAX', '64'))
+    ADAPTIVE_CONCURRENCY_BACKOFF = float(os.getenv('ADAPTIVE_CONCURRENCY_BACKOFF', '0.5'))  # Limit multiplier on overload
+    ADAPTIVE_LATENCY_SPIKE_RATIO = float(os.getenv('ADAPTIVE_LATENCY_SPIKE_RATIO', '2'))  # Latency above baseline x ratio is a spike
+    ADAPTIVE_LATENCY_MIN_SAMPLES = int(os.getenv('ADAPTIVE_LATENCY_MIN_SAMPLES', '10'))  # Healthy requests before spikes are detected
+    
+    # Circuit breaker (per external endpoint)
+    CIRCUIT_BREAKER_ENABLED = os.getenv('CIRCUIT_BREAKER_ENABLED', 'True').lower() == 'true'
+    CIRCUIT_FAILURE_RATE = float(os.getenv('CIRCUIT_FAILURE_RATE', '0.5'))  # Open at this failure rate
+    CIRCUIT_MIN_CALLS = int(os.getenv('CIRCUIT_MIN_CALLS', '4'))  # Minimum calls in window before evaluating
+    CIRCUIT_WINDOW_SIZE = int(os.getenv('CIRCUIT_WINDOW_SIZE', '20'))  # Sliding window of recent calls
+    CIRCUIT_OPEN_SECONDS = float(os.getenv('CIRCUIT_OPEN_SECONDS', '30'))  # Time before a half-open probe
+    CIRCUIT_HALF_OPEN_CALLS = int(os.getenv('CIRCUIT_HALF_OPEN_CALLS', '1'))  # Concurrent probe calls
+    
+    # Retry policy for external API calls (rate limited, 5xx, timeouts, connection errors)
+    RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '4'))  # Total attempts per request
+    RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '1'))  # seconds, doubled per attempt (with jitter)
+    RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '30'))  # seconds, cap for a single backoff
+    GENERATION_DEADLINE_SECONDS = float(os.getenv('GENERATION_DEADLINE_SECONDS', '600'))  # Total budget per character (0 = unbounded)
+    STORY_DEADLINE_SECONDS = float(os.getenv('STORY_DEADLINE_SECONDS', '90'))  # Story budget, runs alongside image generation (0 = overall budget)
+    
+    # Single-flight: concurrent identical external calls share one upstream request
+    SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'True').lower() == 'true'
+    
+    # Hedged requests: a rotate/animate call slower than HEDGE_PERCENTILE of recent latencies
+    # gets a duplicate request, the first to succeed wins
+    HEDGING_ENABLED = os.getenv('HEDGING_ENABLED', 'False').lower() == 'true'
+    HEDGE_ENDPOINTS = [
+        endpoint.strip()
+        for endpoint in os.getenv('HEDGE_ENDPOINTS', 'rotate,animate-with-text,animate-with-skeleton').split(',')
+        if endpoint.strip()
+    ]
+    HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', '95'))  # Latency percentile after which a request is hedged
+    HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', '20'))  # Latencies needed before hedging starts
+    HEDGE_WINDOW_SIZE = int(os.getenv('HEDGE_WINDOW_SIZE', '200'))  # Sliding window of recent latencies
+    HEDGE_MIN_DELAY = float(os.getenv('HEDGE_MIN_DELAY', '1'))  # seconds, never hedge earlier than this
+    HEDGE_BUDGET_RATIO = float(os.getenv('HEDGE_BUDGET_RATIO', '0.1'))  # Hedges allowed per request
+    HEDGE_BUDGET_BURST = float(os.getenv('HEDGE_BUDGET_BURST', '3'))  # Unused hedge budget that can accumulate
+    
+    # PixelLab response cache (generate_pixel_art), can also be enabled per call
+    PIXELLAB_CACHE_ENABLED = os.getenv('PIXELLAB_CACHE_ENABLED', 'False').lower() == 'true'
+    PIXELLAB_CACHE_DIR = STORAGE_BASE_PATH / 'cache' / 'pixellab'
+    PIXELLAB_CACHE_MAX_BYTES = int(os.getenv('PIXELLAB_CACHE_MAX_MB', '256')) * 1024 * 1024
+    
     # Generation configuration
     DEFAULT_IMAGE_WIDTH = 64
     DEFAULT_IMAGE_LENGTH = 64
     DEFAULT_DETAIL = 'medium detail'
     DEFAULT_GIF_DURATION = 200  # milliseconds
     DEFAULT_GIF_LOOP = 0  # 0 means infinite loop
+    ROTATION_MAX_WORKERS = int(os.getenv('ROTATION_MAX_WORKERS', '7'))  # Concurrent rotate requests per character
+    FRAME_MAX_WORKERS = int(os.getenv('FRAME_MAX_WORKERS', '4'))  # Concurrent frame requests per prompt-only animation direction
+    ANIMATION_MAX_WORKERS = int(os.getenv('ANIMATION_MAX_WORKERS', '8'))  # Concurrent animate requests per character (all types and directions)
+    # Default of the mirrorDirections form option: west, south-west and north-west images and animations
+    # are horizontal flips of east, south-east and north-east instead of separate API calls
+    MIRROR_DIRECTIONS_ENABLED = os.getenv('MIRROR_DIRECTIONS_ENABLED', 'False').lower() == 'true'
+    
+    # Background generation jobs (core.tasks)
+    # inprocess: worker threads run inside the web process; external: run `python -m core.tasks.worker`
+    JOB_WORKER_MODE = os.getenv('JOB_WORKER_MODE', 'inprocess').lower()
+    JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', '2'))  # Jobs run concurrently per worker process
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2'))  # seconds between queue polls when idle
+    JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '60'))  # Running jobs not renewed within this are re-queued
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))  # Claims per job (worker crashes/restarts count)
+    # Fair-share scheduling: share of worker capacity per priority class and per owner (user ID or client address)
+    JOB_PRIORITY_WEIGHTS = {'interactive': 4.0, 'bulk': 1.0}
+    JOB_PRIORITY_WEIGHTS.update(_parse_weights(os.getenv('JOB_PRIORITY_WEIGHTS', '')))  # e.g. interactive=8,bulk=1
+    JOB_OWNER_WEIGHTS = _parse_weights(os.getenv('JOB_OWNER_WEIGHTS', ''))  # e.g. 6566...=2,10.0.0.5=0.5 (default 1)
+    JOB_FAIR_SHARE_COLLECTION = 'job_fair_share'
+    JOB_DEADLINE_SECONDS = float(os.getenv('JOB_DEADLINE_SECONDS', '0'))  # Per-job deadline from enqueue, including queue time (0 = none)
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '50'))  # Characters per bulk generation request
+    JOB_CANCEL_POLL_INTERVAL = float(os.getenv('JOB_CANCEL_POLL_INTERVAL', '2'))  # seconds between cancellation checks of running jobs
+    
+    # Generation progress events (GET /characters/<id>/events, Server-Sent Events)
+    # memory: events stay in the process running the generation; mongo: capped collection tailed by every web process
+    PROGRESS_BACKEND = os.getenv('PROGRESS_BACKEND', 'memory' if JOB_WORKER_MODE == 'inprocess' else 'mongo').lower()
+    PROGRESS_COLLECTION = 'generation_events'
+    PROGRESS_COLLECTION_BYTES = int(os.getenv('PROGRESS_COLLECTION_MB', '16')) * 1024 * 1024
+    PROGRESS_RETENTION_SECONDS = float(os.getenv('PROGRESS_RETENTION_SECONDS', '300'))  # memory backend: keep events of finished generations
+    SSE_HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))  # Keep-alive interval of idle event streams
     
     # Logging configuration
     LOG_DIR = BASE_DIR / 'logs'
@@ -4,20 +4,126 @@ Orchestrates image generation, story generation, and animation generation workfl
 """
 import time
 import shutil
+import hashlib
+import json
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+)
 from pathlib import Path
-from typing import Dict, List, Optional
-from database.repositories.character_repository import CharacterRepository
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from database.repositories.character_repository import CharacterRepository, ANIMATION_DIRECTIONS
 from database.models.character_model import Character
 from integrations.clients.pixellab_client import PixelLabClient
+from integrations.clients.reference_image import ReferenceImage
 from integrations.clients.meta_llama_client import MetaLlamaClient
+from integrations.retry import Deadline
+from core.tasks.progress import get_progress_publisher
 from storage.file_manager import FileManager
 from utils.logger import setup_logger
-from utils.exceptions import GenerationError
+from utils.exceptions import (
+    GenerationError, CircuitOpenError, RetryableAPIError, RateLimitError, DeadlineExceededError,
+    GenerationCancelledError, StorageError
+)
 from utils.gif_generator import create_gif_from_frames
+from utils.image_mirror import MIRROR_SOURCES, mirror_image
 from config import config
 
 logger = setup_logger(__name__)
 
+# Generation steps recorded on Character.completed_steps (checkpoints for resuming)
+BASE_IMAGE_STEP = 'base_image'
+STORY_STEP = 'story'
+
+
+def rotation_step(direction: str) -> str:
+    return f'rotation:{direction}'
+
+
+def animation_step(animation_type: str, direction: str) -> str:
+    return f'animation:{animation_type}:{direction}'
+
+
+# Statuses of characters whose generation finished, their assets can be reused
+REUSABLE_STATUSES = ['pending_save', 'completed']
+
+
+def mirror_directions_enabled(form_data: Dict) -> bool:
+    """Whether west-facing directions are mirrored locally instead of generated (mirrorDirections form option)"""
+    return bool(form_data.get('mirrorDirections', config.MIRROR_DIRECTIONS_ENABLED))
+
+
+def character_fingerprint(form_data: Dict) -> str:
+    """
+    Hash of the form fields that determine the generated assets
+    
+    Text is whitespace-collapsed and lower-cased and numbers are parsed, so
+    trivially different submissions of the same form share a fingerprint.
+    """
+    def text(key: str) -> str:
+        return ' '.join(str(form_data.get(key) or '').split()).lower()
+    
+    def number(key: str, default: int) -> int:
+        try:
+            return int(form_data.get(key, default))
+        except (TypeError, ValueError):
+            return default
+    
+    image_count = number('imageCount', 4)
+    normalized = {
+        'name': text('name'),
+        'characterClass': text('characterClass'),
+        'appearance': text('appearance'),
+        # Also part of the Character DNA / story prompt
+        'specialFeatures': text('specialFeatures'),
+        'personality': text('personality'),
+        'size': [number('imageWidth', 64), number('imageLength', 64)],
+        'detail': text('detail') or 'medium detail',
+        'noBackground': bool(form_data.get('noBackground', True)),
+        'imageCount': image_count if image_count in (1, 4, 8) else 4
+    }
+    if mirror_directions_enabled(form_data):
+        # Only present when enabled, fingerprints of earlier characters stay valid
+        normalized['mirrorDirections'] = True
+    canonical = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _replace_id(value: Any, source_id: str, target_id: str) -> Any:
+    """Replace a character ID in every string (URLs, paths) of a nested structure"""
+    if isinstance(value, str):
+        return value.replace(source_id, target_id)
+    if isinstance(value, dict):
+        return {key: _replace_id(item, source_id, target_id) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_replace_id(item, source_id, target_id) for item in value]
+    return value
+
+
+def _as_completed(futures: Iterable[Future], deadline: Optional[Deadline] = None,
+                  timeout: Optional[float] = None) -> Iterator[Future]:
+    """
+    Yield futures as they complete, like concurrent.futures.as_completed()
+
+    Stops (without raising) as soon as the deadline is cancelled or timeout passes,
+    so a cancelled generation does not wait for requests still in flight.
+    """
+    stop = Future()
+    remove_callback = deadline.on_cancel(lambda: stop.set_result(None)) if deadline else None
+    expires_at = time.monotonic() + timeout if timeout is not None else None
+    try:
+        pending = set(futures)
+        while pending and not stop.done():
+            remaining = max(0.0, expires_at - time.monotonic()) if expires_at is not None else None
+            done, pending = wait(pending | {stop}, timeout=remaining, return_when=FIRST_COMPLETED)
+            pending.discard(stop)
+            done.discard(stop)
+            if not done and not stop.done():
+                return  # Timed out
+            yield from done
+    finally:
+        if remove_callback:
+            remove_callback()
+
 
 class GenerationService:
     """Generation Service - Orchestrates character generation workflows"""
@@ -27,58 +133,218 @@ class GenerationService:
         self.pixellab_client = PixelLabClient()
         self.llama_client = MetaLlamaClient()
         self.file_manager = FileManager()
+        self.progress = get_progress_publisher()
+    
+    def generate_character(self, form_data: Dict, user_id: str = None, reuse: bool = False) -> Character:
+        """
+        Generate complete character (images + story) in the calling thread
+        
+        Args:
+            form_data: Form data
+            user_id: User ID (optional)
+            reuse: Copy the assets of an earlier character generated from an identical
+                form instead of calling the external APIs (generates normally if there is none)
+        
+        Returns:
+            Generated Character object
+        """
+        if reuse:
+            character = self.reuse_character(form_data, user_id)
+            if character is not None:
+                return character
+        character = self.create_character(form_data, user_id)
+        return self.run_generation(character)
+    
+    def find_reusable_character(self, form_data: Dict) -> Optional[Character]:
+        """
+        Latest finished character generated from an identical form whose images are all still stored
+        """
+        image_count = int(form_data.get('imageCount', 4))
+        if image_count not in (1, 4, 8):
+            image_count = 4
+        for candidate in self.character_repo.get_by_fingerprint(character_fingerprint(form_data), REUSABLE_STATUSES):
+            completed_steps = self._completed_steps(candidate)
+            rotations = [step for step in completed_steps if step.startswith(rotation_step(''))]
+            if BASE_IMAGE_STEP in completed_steps and len(rotations) >= image_count - 1:
+                return candidate
+        return None
+    
+    def reuse_character(self, form_data: Dict, user_id: str = None) -> Optional[Character]:
+        """
+        Create a character from the assets of an earlier identical generation, without external API calls
+        
+        The files are cloned (hard-linked when possible) into the new character's storage,
+        so either character can be edited or deleted independently.
+        
+        Returns:
+            New character (status "pending_save"), None if no reusable character exists
+        """
+        source = self.find_reusable_character(form_data)
+        if source is None:
+            return None
+        
+        start_time = time.time()
+        source_id = str(source.id)
+        character = self.create_character(form_data, user_id)
+        character_id = str(character.id)
+        try:
+            self.file_manager.clone_character_files(source_id, character_id)
+        except StorageError as e:
+            logger.warning(f"Cannot reuse character {source_id}, generating instead: {str(e)}")
+            character.delete()
+            return None
+        
+        character.images = _replace_id(list(source.images or []), source_id, character_id)
+        character.animations = _replace_id(dict(source.animations or {}), source_id, character_id)
+        character.gif = _replace_id(dict(source.gif or {}), source_id, character_id)
+        character.story = dict(source.story or {})
+        character.metadata = {
+            **_replace_id(dict(source.metadata or {}), source_id, character_id),
+            'reused_from': source_id
+        }
+        character.completed_steps = list(source.completed_steps or [])
+        character.status = 'pending_save'
+        character.generation_time = time.time() - start_time
+        character.save()
+        
+        logger.info(f"Character {character_id} reuses the assets of character {source_id}")
+        return character
     
-    def generate_character(self, form_data: Dict, user_id: str = None) -> Character:
+    def create_character(self, form_data: Dict, user_id: str = None) -> Character:
         """
-        Generate complete character (images + story)
+        Create the Character document for a generation request (status: "pending")
         
         Args:
             form_data: Form data
             user_id: User ID (optional)
         
+        Returns:
+            Saved Character object
+        """
+        character = Character(
+            user_id=user_id,
+            name=form_data.get('name'),
+            description=form_data.get('description', ''),
+            status='pending',
+            input_params=form_data,
+            fingerprint=character_fingerprint(form_data)
+        )
+        character.save()
+        logger.info(f"Created character: {character.id}")
+        return character
+    
+    def run_generation(self, character: Character, resume: bool = True, deadline: Optional[Deadline] = None) -> Character:
+        """
+        Run the generation workflow for a created character (used by background jobs)
+        
+        Every finished step (base image, each rotation, story) is recorded on the character.
+        When resuming, steps whose files are still stored are kept and only the missing
+        steps are generated, so a restarted job does not pay for the finished ones again.
+        
+        Args:
+            character: Character created by create_character()
+            resume: Keep finished steps of an earlier run (False discards them and starts over)
+            deadline: Job deadline (optional), cancelling it stops the generation
+        
         Returns:
             Generated Character object
+        
+        Raises:
+            GenerationError: Generation failed (character status is set to "failed")
+            CircuitOpenError: External API circuit is open
+            GenerationCancelledError: Deadline was cancelled (character status is set to "cancelled")
         """
         start_time = time.time()
+        # Overall time budget shared by every external call (including retries) for this character
+        if deadline is not None:
+            deadline = deadline.within(config.GENERATION_DEADLINE_SECONDS)
+        else:
+            deadline = Deadline.after(config.GENERATION_DEADLINE_SECONDS)
+        form_data = character.input_params
         
         try:
-            # 1. Create Character document (status: "generating")
-            character = Character(
-                user_id=user_id,
-                name=form_data.get('name'),
-                description=form_data.get('description', ''),
-                status='generating',
-                input_params=form_data
-            )
-            character.save()
+            # 1. Update status to "generating"
+            completed_steps = self._completed_steps(character) if resume else set()
+            character.status = 'generating'
+            if not completed_steps:
+                # Results of an interrupted earlier run (if any) are discarded
+                character.images = []
+                character.story = {}
+                character.completed_steps = []
+                self.character_repo.reset_generation(str(character.id))
+                logger.info(f"Starting generation for character: {character.id}")
+            else:
+                if BASE_IMAGE_STEP not in completed_steps:
+                    # The base image is generated again, images rotated from the old one are discarded
+                    character.images = []
+                    character.completed_steps = sorted(completed_steps)
+                    self.character_repo.reset_images(str(character.id), character.completed_steps)
+                else:
+                    self.character_repo.update_status(str(character.id), 'generating')
+                logger.info(f"Resuming generation for character: {character.id}, finished steps: {sorted(completed_steps)}")
+            self.progress.started(str(character.id), self._count_steps(form_data), sorted(completed_steps))
             
-            logger.info(f"Created character: {character.id}, starting generation...")
+            # 2. Start story generation (only needs form data, runs alongside the images)
+            story_future = story_deadline = None
+            if STORY_STEP not in completed_steps:
+                story_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='story')
+                story_deadline = deadline.within(config.STORY_DEADLINE_SECONDS)
+                story_future = story_executor.submit(self._request_story, form_data, story_deadline)
+                story_executor.shutdown(wait=False)
             
-            # 2. Generate images (multiple angles)
-            images = self._generate_images(character, form_data)
+            # 3. Generate images (multiple angles)
+            self._generate_images(character, form_data, deadline, completed_steps)
             
-            # 3. Generate story (animations removed - no longer generated automatically)
-            story = self._generate_story(character, form_data)
+            # 4. Join the story (animations removed - no longer generated automatically)
+            if story_future is not None:
+                self._collect_story(character, story_future, story_deadline)
             
             # 5. Update status to 'pending_save' (not 'completed' - user must click save to gallery)
             character.status = 'pending_save'
             character.generation_time = time.time() - start_time
-            character.save()
+            self.character_repo.update_status(
+                str(character.id), 'pending_save', generation_time=character.generation_time
+            )
             
             logger.info(f"Character generation completed: {character.id}, time: {character.generation_time:.2f}s")
+            self.progress.completed(str(character.id), character.to_dict())
             
             return character
         
+        except GenerationCancelledError:
+            # Finished steps stay recorded, the generation can be resumed later
+            logger.info(f"Character generation cancelled: {character.id}")
+            character.status = 'cancelled'
+            self.character_repo.update_status(str(character.id), 'cancelled')
+            self.progress.cancelled(str(character.id), deadline.cancellation.reason)
+            raise
         except Exception as e:
             logger.error(f"Character generation failed: {str(e)}")
             # Update status to failed
-            if 'character' in locals():
-                character.status = 'failed'
-                character.save()
+            character.status = 'failed'
+            self.character_repo.update_status(str(character.id), 'failed')
+            self.progress.failed(str(character.id), str(e))
+            if isinstance(e, CircuitOpenError):
+                # Keep the subtype so the API layer can answer 503 with Retry-After
+                raise
             raise GenerationError(f"Character generation failed: {str(e)}")
     
-    def _generate_images(self, character: Character, form_data: Dict) -> List[Dict]:
-        """Generate multi-directional images using Rotate API"""
+    def _count_steps(self, form_data: Dict) -> int:
+        """Steps of a full generation: base image, one rotation per other direction, story"""
+        image_count = int(form_data.get('imageCount', 4))
+        if image_count not in (1, 4, 8):
+            image_count = 4
+        return image_count + 1
+    
+    def _generate_images(
+        self,
+        character: Character,
+        form_data: Dict,
+        deadline: Optional[Deadline] = None,
+        completed_steps: Optional[set] = None
+    ) -> List[Dict]:
+        """Generate multi-directional images using Rotate API (steps in completed_steps reuse the stored images)"""
+        completed_steps = completed_steps or set()
         # Get image count from form data (1, 4, or 8)
         image_count = int(form_data.get('imageCount', 4))
         
@@ -104,8 +370,6 @@ class GenerationService:
         # Generation parameters
         image_width = int(form_data.get('imageWidth', 64))
         image_length = int(form_data.get('imageLength', 64))
-        detail = form_data.get('detail', 'medium detail')
-        no_background = form_data.get('noBackground', True)  # Default transparent background
         
         images = []
         
@@ -114,86 +378,13 @@ class GenerationService:
         character_dna = self._extract_character_dna(form_data, image_width)
         logger.info(f"Character DNA extracted: {character_dna[:100]}...")
         
-        # Step 1: Generate base image (south direction) with retry mechanism
-        max_retries = 3  # Increase retries to 3
-        retry_count = 0
-        base_image_bytes = None
-        
-        while retry_count <= max_retries and base_image_bytes is None:
-            try:
-                # Use fixed Character DNA to generate base image
-                # Only add necessary direction info, don't change DNA
-                pixel_prompt = f"{character_dna}, side view, facing south, 8-bit pixel art, no background"
-                
-                if retry_count > 0:
-                    logger.info(f"Retrying base image generation (attempt {retry_count + 1}/{max_retries + 1})...")
-                else:
-                    logger.info(f"Generating base character image (south direction)...")
-                    logger.info(f"Prompt: {pixel_prompt[:100]}...")
-                
-                start_time = time.time()
-                base_image_bytes = self.pixellab_client.generate_pixel_art(
-                    description=pixel_prompt,
-                    image_width=image_width,
-                    image_length=image_length,
-                    detail=detail,
-                    direction="south",
-                    no_background=no_background
-                )
-                elapsed_time = time.time() - start_time
-                logger.info(f"Base image generation completed in {elapsed_time:.2f} seconds")
-                break
-            except Exception as e:
-                error_str = str(e)
-                logger.warning(f"Base image generation attempt {retry_count + 1} failed: {error_str}")
-                # Retry on timeout errors or connection errors
-                if "timeout" in error_str.lower() or "Read timed out" in error_str or "Connection" in error_str:
-                    retry_count += 1
-                    if retry_count <= max_retries:
-                        wait_time = 10 * retry_count  # Increase wait time: 10s, 20s, 30s
-                        logger.warning(f"Base image generation timeout/connection error, waiting {wait_time}s before retry {retry_count}/{max_retries}")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        logger.error(f"Base image generation failed after {max_retries + 1} attempts due to timeout/connection issues")
-                        raise GenerationError(f"Base image generation failed after {max_retries + 1} attempts. The PixelLab API may be slow or experiencing issues. Please try again later.")
-                else:
-                    # For other errors, don't retry, just raise
-                    logger.error(f"Base image generation failed with non-retryable error: {error_str}")
-                    raise
-        
-        # Save base image
-        if not base_image_bytes:
-            raise GenerationError("Failed to generate base image after retries")
-        
-        base_file_path, base_url = self.file_manager.save_image(
-            base_image_bytes,
-            str(character.id),
-            "south",
-            0
-        )
-        
-        # Add to character (as base_image)
-        character.add_image(base_url, base_file_path, "south", 0)
-        images.append({
-            'url': base_url,
-            'path': base_file_path,
-            'angle': 'south',
-            'direction': 'south',
-            'index': 0
-        })
-        
-        # Save Character DNA and Master Reference Image to character object
-        # Master Reference Image is the south direction image, all animations are based on this
-        if not hasattr(character, 'metadata') or character.metadata is None:
-            character.metadata = {}
-        character.metadata['character_dna'] = character_dna
-        character.metadata['master_reference_path'] = base_file_path
-        character.metadata['master_reference_direction'] = 'south'
-        character.save()
-        logger.info(f"Character DNA and Master Reference Image saved (south direction)")
-        
-        logger.info(f"Base image generated successfully")
+        # Step 1: Generate base image (south direction)
+        if BASE_IMAGE_STEP in completed_steps:
+            base_image_bytes = Path(character.metadata['master_reference_path']).read_bytes()
+            logger.info(f"Reusing base image from earlier run: {character.metadata['master_reference_path']}")
+        else:
+            base_image_bytes = self._generate_base_image(character, form_data, character_dna, deadline)
+        images.append({**self._find_image(character, 'south'), 'direction': 'south'})
         
         # Step 2: Generate other directions using Rotate API (if needed)
         # If only 1 image requested, skip rotation
@@ -203,68 +394,73 @@ class GenerationService:
         
         image_size = {"width": image_width, "height": image_length}
         
+        # Encode the base image once, every rotation request reuses it
+        base_reference = ReferenceImage(base_image_bytes)
+        
         # Filter out south direction (already generated), generate other directions
+        # Directions are listed clockwise, index = position in this list, so indices stay clockwise
         other_directions = [d for d in directions if d != "south"]
-        rotation_index = 1
-        
-        for direction in other_directions:
-            max_retries = 2
-            retry_count = 0
-            success = False
+        pending_directions = [d for d in other_directions if rotation_step(d) not in completed_steps]
+        if len(pending_directions) < len(other_directions):
+            logger.info(f"Reusing rotations from earlier run, remaining: {pending_directions}")
+        
+        # Mirror mode: west-facing directions are flipped locally from their east-facing counterpart
+        mirrored_sources = {}
+        if mirror_directions_enabled(form_data):
+            mirrored_sources = {
+                direction: MIRROR_SOURCES[direction]
+                for direction in pending_directions
+                if MIRROR_SOURCES.get(direction) in other_directions
+            }
+            logger.info(f"Mirroring directions locally: {mirrored_sources}")
+        rotated = self._rotate_directions(
+            base_reference, [d for d in pending_directions if d not in mirrored_sources], image_size, deadline
+        )
+        rotated.update(self._mirror_directions(character, mirrored_sources, rotated))
+        # A direction whose source could not be mirrored is rotated like the others
+        unmirrored = [d for d in mirrored_sources if d not in rotated]
+        if unmirrored:
+            logger.info(f"Rotating directions that could not be mirrored: {unmirrored}")
+            for direction in unmirrored:
+                del mirrored_sources[direction]
+            rotated.update(self._rotate_directions(base_reference, unmirrored, image_size, deadline))
+        
+        for rotation_index, direction in enumerate(other_directions, start=1):
+            if direction not in pending_directions:
+                images.append({**self._find_image(character, direction), 'direction': direction})
+                continue
             
-            while retry_count <= max_retries and not success:
-                try:
-                    if retry_count > 0:
-                        logger.info(f"Retrying rotation to {direction} (attempt {retry_count + 1}/{max_retries + 1})")
-                    else:
-                        logger.info(f"Rotating image to direction {rotation_index}/{len(other_directions)}: {direction}")
-                    
-                    # Use rotate API to generate image for this direction
-                    rotated_bytes = self.pixellab_client.rotate_image(
-                        from_image_bytes=base_image_bytes,
-                        from_direction="south",
-                        to_direction=direction,
-                        image_size=image_size,
-                        from_view="side",
-                        to_view="side",
-                        image_guidance_scale=7.5  # Higher guidance scale for consistency
-                    )
-                    
-                    # Save rotated image
-                    file_path, url = self.file_manager.save_image(
-                        rotated_bytes,
-                        str(character.id),
-                        direction,
-                        rotation_index
-                    )
-                    
-                    # Add to character
-                    character.add_image(url, file_path, direction, rotation_index)
-                    
-                    images.append({
-                        'url': url,
-                        'path': file_path,
-                        'angle': direction,
-                        'direction': direction,
-                        'index': rotation_index
-                    })
-                    
-                    rotation_index += 1
-                    success = True
-                    
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count > max_retries:
-                        logger.error(f"Failed to rotate image to {direction} after {max_retries + 1} attempts: {str(e)}")
-                        # Continue generating other directions, but don't increment index
-                        break
-                    else:
-                        # Wait before retry (exponential backoff)
-                        wait_time = 2 ** retry_count
-                        logger.warning(f"Rotation to {direction} failed, retrying in {wait_time}s...")
-                        time.sleep(wait_time)
+            rotated_bytes = rotated.get(direction)
+            if rotated_bytes is None:
+                continue
+            
+            # Save rotated image
+            file_path, url = self.file_manager.save_image(
+                rotated_bytes,
+                str(character.id),
+                direction,
+                rotation_index
+            )
+            
+            # Add to character
+            character.add_image(url, file_path, direction, rotation_index)
+            self.character_repo.add_image(str(character.id), url, file_path, direction, rotation_index)
+            asset = {'url': url, 'direction': direction}
+            if direction in mirrored_sources:
+                asset['mirrored_from'] = mirrored_sources[direction]
+            self._complete_steps(character, {rotation_step(direction): asset})
+            
+            images.append({
+                'url': url,
+                'path': file_path,
+                'angle': direction,
+                'direction': direction,
+                'index': rotation_index
+            })
         
-        character.save()
+        # Rotations finished before a cancellation are saved above, stop here
+        if deadline:
+            deadline.check_cancelled("finishing the images")
         
         if not images:
             raise GenerationError("Failed to generate any images")
@@ -296,24 +492,239 @@ class GenerationService:
         
         return images
     
-    def _generate_story(self, character: Character, form_data: Dict) -> str:
-        """Generate story"""
+    def _generate_base_image(
+        self,
+        character: Character,
+        form_data: Dict,
+        character_dna: str,
+        deadline: Optional[Deadline] = None
+    ) -> bytes:
+        """Generate, store and checkpoint the south-facing base image (Master Reference Image)"""
+        image_width = int(form_data.get('imageWidth', 64))
+        image_length = int(form_data.get('imageLength', 64))
+        detail = form_data.get('detail', 'medium detail')
+        no_background = form_data.get('noBackground', True)  # Default transparent background
+        
+        # Use fixed Character DNA to generate base image
+        # Only add necessary direction info, don't change DNA
+        pixel_prompt = f"{character_dna}, side view, facing south, 8-bit pixel art, no background"
+        logger.info(f"Generating base character image (south direction)...")
+        logger.info(f"Prompt: {pixel_prompt[:100]}...")
+        
+        start_time = time.time()
+        try:
+            # Transient failures are retried inside the client within the deadline
+            base_image_bytes = self.pixellab_client.generate_pixel_art(
+                description=pixel_prompt,
+                image_width=image_width,
+                image_length=image_length,
+                detail=detail,
+                direction="south",
+                no_background=no_background,
+                deadline=deadline
+            )
+        except RetryableAPIError as e:
+            logger.error(f"Base image generation failed after retries: {str(e)}")
+            raise GenerationError(f"Base image generation failed after retries. The PixelLab API may be slow or experiencing issues. Please try again later.")
+        elapsed_time = time.time() - start_time
+        logger.info(f"Base image generation completed in {elapsed_time:.2f} seconds")
+        
+        # Save base image
+        if not base_image_bytes:
+            raise GenerationError("Failed to generate base image after retries")
+        
+        base_file_path, base_url = self.file_manager.save_image(
+            base_image_bytes,
+            str(character.id),
+            "south",
+            0
+        )
+        
+        # Add to character (as base_image)
+        character.add_image(base_url, base_file_path, "south", 0)
+        self.character_repo.add_image(str(character.id), base_url, base_file_path, "south", 0)
+        
+        # Save Character DNA and Master Reference Image to character object
+        # Master Reference Image is the south direction image, all animations are based on this
+        if not hasattr(character, 'metadata') or character.metadata is None:
+            character.metadata = {}
+        character.metadata['character_dna'] = character_dna
+        character.metadata['master_reference_path'] = base_file_path
+        character.metadata['master_reference_direction'] = 'south'
+        self.character_repo.set_metadata(
+            str(character.id),
+            character_dna=character_dna,
+            master_reference_path=base_file_path,
+            master_reference_direction='south'
+        )
+        self._complete_steps(character, {BASE_IMAGE_STEP: {'url': base_url, 'direction': 'south'}})
+        logger.info(f"Character DNA and Master Reference Image saved (south direction)")
+        
+        logger.info(f"Base image generated successfully")
+        return base_image_bytes
+    
+    def _find_image(self, character: Character, direction: str) -> Optional[Dict]:
+        """Stored image of the character facing direction (matched by direction or angle)"""
+        return next(
+            (img for img in character.images
+             if img.get('direction') == direction or img.get('angle') == direction),
+            None
+        )
+    
+    def _completed_steps(self, character: Character) -> set:
+        """
+        Steps recorded as finished whose results are still stored
+        
+        A recorded step is dropped when its image/story/frames are gone (e.g. files were
+        cleaned up), so that step is generated again. Rotations are dropped together
+        with the base image: they were rotated from it and would not match a new one.
+        """
+        completed = set()
+        for step in character.completed_steps or []:
+            kind, _, target = step.partition(':')
+            if kind == 'story':
+                stored = bool(character.story and character.story.get('content'))
+            elif kind in ('base_image', 'rotation'):
+                image = self._find_image(character, target or 'south')
+                stored = bool(image and image.get('path') and Path(image['path']).exists())
+                if kind == 'base_image':
+                    master_path = (character.metadata or {}).get('master_reference_path')
+                    stored = stored and bool(master_path) and Path(master_path).exists()
+            elif kind == 'animation':
+                animation_type, _, direction = target.partition(':')
+                frames = (character.animations or {}).get(animation_type, {}).get(direction) or []
+                stored = bool(frames) and all(
+                    frame.get('path') and Path(frame['path']).exists() for frame in frames
+                )
+            else:
+                stored = False
+            if stored:
+                completed.add(step)
+        if BASE_IMAGE_STEP not in completed:
+            completed = {step for step in completed if not step.startswith('rotation:')}
+        return completed
+    
+    def _complete_steps(self, character: Character, steps: Dict[str, Optional[Dict]]):
+        """
+        Record finished steps (checkpoints) on the character and publish a progress event for each
+        
+        Args:
+            steps: Step name -> asset the step produced (URLs, story), sent to progress subscribers
+        """
+        for step in steps:
+            if step not in character.completed_steps:
+                character.completed_steps.append(step)
+        self.character_repo.mark_steps_completed(str(character.id), *steps)
+        for step, asset in steps.items():
+            self.progress.step(str(character.id), step, asset)
+    
+    def _rotate_directions(
+        self,
+        base_reference: ReferenceImage,
+        directions: List[str],
+        image_size: Dict,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, bytes]:
+        """
+        Rotate the base image to every direction concurrently
+        
+        At most ROTATION_MAX_WORKERS requests run at once (the endpoint rate
+        limit still applies). A failed direction is skipped; an open circuit
+        or exhausted deadline cancels directions that have not started yet.
+        
+        Args:
+            base_reference: South-facing base image
+            directions: Target directions
+            image_size: Image size {"width": int, "height": int}
+            deadline: Time budget for all rotations
+        
+        Returns:
+            Rotated image bytes by direction (failed directions are missing)
+        """
+        def rotate(direction: str) -> bytes:
+            logger.info(f"Rotating image to direction: {direction}")
+            return self.pixellab_client.rotate_image(
+                from_image_bytes=base_reference,
+                from_direction="south",
+                to_direction=direction,
+                image_size=image_size,
+                from_view="side",
+                to_view="side",
+                image_guidance_scale=7.5,  # Higher guidance scale for consistency
+                deadline=deadline
+            )
+        
+        results = {}
+        if not directions:
+            return results
+        
+        max_workers = max(1, min(config.ROTATION_MAX_WORKERS, len(directions)))
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='rotate')
         try:
-            # Build story prompt
-            story_prompt = f"Write a short backstory (about 100 words) for a character named {form_data.get('name')}"
-            if form_data.get('characterClass'):
-                story_prompt += f", who is a {form_data.get('characterClass')}"
-            if form_data.get('personality'):
-                story_prompt += f", with personality traits: {form_data.get('personality')}"
-            if form_data.get('appearance'):
-                story_prompt += f", and appearance: {form_data.get('appearance')}"
+            futures = {executor.submit(rotate, direction): direction for direction in directions}
             
-            logger.info("Generating story...")
-            story_content = self.llama_client.generate_story(story_prompt)
+            for future in _as_completed(futures, deadline):
+                direction = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    results[direction] = future.result()
+                except (CircuitOpenError, DeadlineExceededError) as e:
+                    # Remaining rotations would fail fast too, keep the images generated so far
+                    logger.error(f"Stopping rotations at {direction}: {str(e)}")
+                    for pending in futures:
+                        pending.cancel()
+                except Exception as e:
+                    logger.error(f"Failed to rotate image to {direction}: {str(e)}")
+        finally:
+            # A cancelled generation does not wait for rotations still in flight
+            executor.shutdown(wait=not (deadline and deadline.cancelled()), cancel_futures=True)
+        
+        logger.info(f"Rotations finished: {len(results)}/{len(directions)} directions succeeded")
+        return results
+    
+    def _mirror_directions(
+        self,
+        character: Character,
+        sources: Dict[str, str],
+        rotated: Dict[str, bytes]
+    ) -> Dict[str, bytes]:
+        """
+        Flip the images of source directions horizontally (no API calls)
+        
+        Args:
+            character: Character object (images of sources finished in an earlier run are read from storage)
+            sources: Source direction by mirrored direction, e.g. {"west": "east"}
+            rotated: Images generated in this run by direction
+        
+        Returns:
+            Mirrored image bytes by direction (directions whose source is missing are skipped)
+        """
+        mirrored = {}
+        for direction, source in sources.items():
+            source_bytes = rotated.get(source)
+            if source_bytes is None:
+                stored = self._find_image(character, source)
+                if stored and stored.get('path') and Path(stored['path']).exists():
+                    source_bytes = Path(stored['path']).read_bytes()
+            if source_bytes is None:
+                logger.warning(f"Cannot mirror {direction}: {source} image was not generated")
+                continue
+            try:
+                mirrored[direction] = mirror_image(source_bytes)
+            except Exception as e:
+                logger.error(f"Failed to mirror {source} image to {direction}: {str(e)}")
+        return mirrored
+    
+    def _generate_story(self, character: Character, form_data: Dict, deadline: Optional[Deadline] = None) -> str:
+        """Generate story"""
+        try:
+            story_content, story_prompt = self._request_story(form_data, deadline)
             
             # Set story
             character.set_story(story_content, story_prompt)
-            character.save()
+            self.character_repo.set_story(str(character.id), story_content, story_prompt)
+            self._complete_steps(character, {STORY_STEP: {'story': story_content}})
             
             return story_content
         
@@ -322,6 +733,50 @@ class GenerationService:
             # Story generation failure does not affect overall process
             return ""
     
+    def _request_story(self, form_data: Dict, deadline: Optional[Deadline] = None) -> Tuple[str, str]:
+        """
+        Request a story from the LLM (does not touch the character, safe to run in another thread)
+        
+        Returns:
+            (story content, prompt)
+        """
+        # Build story prompt
+        story_prompt = f"Write a short backstory (about 100 words) for a character named {form_data.get('name')}"
+        if form_data.get('characterClass'):
+            story_prompt += f", who is a {form_data.get('characterClass')}"
+        if form_data.get('personality'):
+            story_prompt += f", with personality traits: {form_data.get('personality')}"
+        if form_data.get('appearance'):
+            story_prompt += f", and appearance: {form_data.get('appearance')}"
+        
+        logger.info("Generating story...")
+        return self.llama_client.generate_story(story_prompt, deadline=deadline), story_prompt
+    
+    def _collect_story(self, character: Character, story_future: Future, story_deadline: Deadline) -> str:
+        """Wait for a story started with _request_story() and save it on the character"""
+        try:
+            # The story call is bounded by its own deadline, allow a moment for it to return
+            remaining = story_deadline.remaining()
+            for _ in _as_completed([story_future], story_deadline, remaining + 1.0 if remaining is not None else None):
+                pass
+            story_deadline.check_cancelled("saving the story")
+            story_content, story_prompt = story_future.result(timeout=0)
+        except GenerationCancelledError:
+            story_future.cancel()
+            raise
+        except Exception as e:
+            if isinstance(e, FutureTimeoutError):
+                story_future.cancel()
+                e = DeadlineExceededError("Story generation did not finish within its time budget")
+            logger.warning(f"Failed to generate story: {str(e)}")
+            # Story generation failure does not affect overall process
+            return ""
+        
+        character.set_story(story_content, story_prompt)
+        self.character_repo.set_story(str(character.id), story_content, story_prompt)
+        self._complete_steps(character, {STORY_STEP: {'story': story_content}})
+        return story_content
+    
     def _generate_animation_frames(
         self,
         character_id: str,
@@ -329,7 +784,9 @@ class GenerationService:
         direction: str,
         reference_image_path: str = None,  # Optional, if provided use reference image, otherwise prompt-only generation
         n_frames: int = 4,
-        use_prompt_only: bool = True  # Whether to use prompt only (not use reference image)
+        use_prompt_only: bool = True,  # Whether to use prompt only (not use reference image)
+        reference_image: Optional[ReferenceImage] = None,
+        deadline: Optional[Deadline] = None
     ) -> List[Dict]:
         """
         Generate animation frames
@@ -343,12 +800,17 @@ class GenerationService:
             direction: Direction
             reference_image_path: Reference image path (idle image for this direction)
             n_frames: Number of frames
+            reference_image: Already loaded reference image, skips reading reference_image_path from disk
+            deadline: Time budget for all API calls (defaults to GENERATION_DEADLINE_SECONDS from now)
         
         Returns:
             Frame data list [{"url": str, "path": str, "frame_index": int}, ...]
         """
         from pathlib import Path
         
+        if deadline is None:
+            deadline = Deadline.after(config.GENERATION_DEADLINE_SECONDS)
+        
         try:
             # Get character information (for building description)
             character = self.character_repo.get_by_id(character_id)
@@ -360,6 +822,13 @@ class GenerationService:
             
             # Prioritize using Master Reference Image (lock character consistency)
             # All actions use the same Master Reference Image (south direction standing pose)
+            if not use_prompt_only and reference_image is not None:
+                logger.info(f"Using Master Reference Image for {animation_type} - {direction} (locked consistency)")
+                return self._generate_frames_with_reference(
+                    character_id, character, form_data, animation_type, direction,
+                    reference_image, n_frames, deadline
+                )
+            
             if not use_prompt_only:
                 # Prioritize using Master Reference Image (from metadata)
                 master_reference_path = None
@@ -390,13 +859,12 @@ class GenerationService:
                     from pathlib import Path
                     ref_path = Path(master_reference_path)
                     if ref_path.exists():
-                        with open(ref_path, 'rb') as f:
-                            reference_image_bytes = f.read()
+                        reference_image = ReferenceImage.from_path(ref_path)
                         
                         logger.info(f"Using Master Reference Image for {animation_type} - {direction} (locked consistency)")
                         return self._generate_frames_with_reference(
                             character_id, character, form_data, animation_type, direction, 
-                            reference_image_bytes, n_frames
+                            reference_image, n_frames, deadline
                         )
                     else:
                         logger.warning(f"Master Reference Image not found at path: {master_reference_path}")
@@ -406,9 +874,11 @@ class GenerationService:
             # If use_prompt_only=True or reference image not found, use prompt-only generation
             logger.info(f"Using prompt-only generation for {animation_type} - {direction}")
             return self._generate_frames_with_prompts(
-                character_id, character, form_data, animation_type, direction, n_frames
+                character_id, character, form_data, animation_type, direction, n_frames, deadline
             )
         
+        except (CircuitOpenError, DeadlineExceededError):
+            raise
         except Exception as e:
             logger.error(f"Failed to generate animation frames: {str(e)}")
             raise GenerationError(f"Failed to generate animation frames: {str(e)}")
@@ -420,8 +890,9 @@ class GenerationService:
         form_data: Dict,
         animation_type: str,
         direction: str,
-        reference_image_bytes: bytes,
-        n_frames: int = 4
+        reference_image: ReferenceImage,
+        n_frames: int = 4,
+        deadline: Optional[Deadline] = None
     ) -> List[Dict]:
         """
         Generate animation frames using reference image (locked character consistency)
@@ -472,45 +943,8 @@ class GenerationService:
         logger.info(f"Generating {n_frames} frames for {animation_type} - {direction} using Master Reference Image with locked parameters")
         logger.debug(f"Description: {description[:150]}...")
         
-        # Call animate_with_text API (locked parameters)
-        max_retries = 3
-        retry_count = 0
-        frame_bytes_list = None
-        
-        while retry_count <= max_retries:
-            try:
-                # Use locked parameters to ensure consistency
-                # image_guidance_scale=2.2 (in range 2.0~2.4, ensure consistency with reference)
-                # init_image_strength=300 (fixed value, controls reference image influence)
-                frame_bytes_list = self.pixellab_client.animate_with_text(
-                    reference_image_bytes=reference_image_bytes,
-                    description=description,
-                    action=animation_type,
-                    direction=direction,
-                    image_size={"width": image_size, "height": image_size},  # Fixed 64x64
-                    view="side",
-                    n_frames=n_frames,
-                    image_guidance_scale=2.2,  # Locked in range 2.0~2.4, ensure consistency with reference
-                    init_image_strength=300.0  # Locked at 300, stable action transformation range
-                )
-                break
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str or "Rate limit" in error_str or "wait longer" in error_str:
-                    retry_count += 1
-                    if retry_count <= max_retries:
-                        wait_time = 5 * retry_count
-                        logger.warning(f"Rate limit hit, waiting {wait_time}s before retry {retry_count}/{max_retries}")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        raise GenerationError(f"Rate limit exceeded. Please wait a few minutes and try again.")
-                else:
-                    raise
-        
-        # Save each frame
-        frames = []
-        for frame_index, frame_bytes in enumerate(frame_bytes_list):
+        def save_frame(frame_index: int, frame_bytes: bytes) -> Dict:
+            # Frames are written as they are decoded from the response stream
             file_path, url = self.file_manager.save_animation_frame(
                 frame_bytes,
                 character_id,
@@ -518,12 +952,32 @@ class GenerationService:
                 direction,
                 frame_index
             )
-            
-            frames.append({
+            return {
                 'url': url,
                 'path': file_path,
                 'frame_index': frame_index
-            })
+            }
+        
+        # Call animate_with_text API (locked parameters), rate limits are retried inside the client
+        try:
+            # Use locked parameters to ensure consistency
+            # image_guidance_scale=2.2 (in range 2.0~2.4, ensure consistency with reference)
+            # init_image_strength=300 (fixed value, controls reference image influence)
+            frames = self.pixellab_client.animate_with_text(
+                reference_image_bytes=reference_image,
+                description=description,
+                action=animation_type,
+                direction=direction,
+                image_size={"width": image_size, "height": image_size},  # Fixed 64x64
+                view="side",
+                n_frames=n_frames,
+                image_guidance_scale=2.2,  # Locked in range 2.0~2.4, ensure consistency with reference
+                init_image_strength=300.0,  # Locked at 300, stable action transformation range
+                frame_sink=save_frame,
+                deadline=deadline
+            )
+        except RateLimitError:
+            raise GenerationError(f"Rate limit exceeded. Please wait a few minutes and try again.")
         
         # Sort frames by frame_index
         frames.sort(key=lambda f: f.get('frame_index', 0))
@@ -547,12 +1001,14 @@ class GenerationService:
         form_data: Dict,
         animation_type: str,
         direction: str,
-        n_frames: int = 4
+        n_frames: int = 4,
+        deadline: Optional[Deadline] = None
     ) -> List[Dict]:
         """
         Generate frames using pure prompts (similar to generating directional images)
         
         Define frame sequence description templates for each action type, then call generate_pixel_art API separately for each frame
+        (frames are generated concurrently, then ordered by frame_index)
         """
         # Get generation parameters
         image_width = int(form_data.get('imageWidth', 64))
@@ -591,8 +1047,8 @@ class GenerationService:
         # Define frame description templates for each action type (adjusted by direction)
         frame_descriptions = self._get_frame_descriptions(animation_type, direction, n_frames)
         
-        # Generate image for each frame
-        frames = []
+        # Build the prompt for each frame
+        frame_prompts = []
         for frame_index in range(n_frames):
             frame_desc = frame_descriptions[frame_index] if frame_index < len(frame_descriptions) else f"frame {frame_index + 1}"
             
@@ -631,37 +1087,27 @@ class GenerationService:
             prompt_parts = [p for p in prompt_parts if p]
             full_prompt = ", ".join(prompt_parts)
             
+            frame_prompts.append((frame_desc, full_prompt))
+        
+        def generate_frame(frame_index: int) -> Dict:
+            frame_desc, full_prompt = frame_prompts[frame_index]
             logger.info(f"Generating frame {frame_index + 1}/{n_frames} for {animation_type} - {direction}: {frame_desc}")
             
-            # Call generate_pixel_art API to generate single frame
-            max_retries = 3
-            retry_count = 0
-            frame_bytes = None
-            
-            while retry_count <= max_retries:
-                try:
-                    frame_bytes = self.pixellab_client.generate_pixel_art(
-                        description=full_prompt,
-                        image_width=image_width,
-                        image_length=image_length,
-                        detail=detail,
-                        direction=direction,  # Use original direction value
-                        no_background=no_background
-                    )
-                    break
-                except Exception as e:
-                    error_str = str(e)
-                    if "429" in error_str or "Rate limit" in error_str or "wait longer" in error_str:
-                        retry_count += 1
-                        if retry_count <= max_retries:
-                            wait_time = 5 * retry_count
-                            logger.warning(f"Rate limit hit for frame {frame_index + 1}, waiting {wait_time}s before retry")
-                            time.sleep(wait_time)
-                            continue
-                        else:
-                            raise GenerationError(f"Rate limit exceeded for frame {frame_index + 1}")
-                    else:
-                        raise
+            # Call generate_pixel_art API to generate single frame, failures are retried per frame inside the client
+            try:
+                frame_bytes = self.pixellab_client.generate_pixel_art(
+                    description=full_prompt,
+                    image_width=image_width,
+                    image_length=image_length,
+                    detail=detail,
+                    direction=direction,  # Use original direction value
+                    no_background=no_background,
+                    # Some frames share a prompt, they must still be separate requests (and cache entries)
+                    variant=f"{animation_type}:{direction}:frame:{frame_index}",
+                    deadline=deadline
+                )
+            except RateLimitError:
+                raise GenerationError(f"Rate limit exceeded for frame {frame_index + 1}")
             
             # Save frame
             file_path, url = self.file_manager.save_animation_frame(
@@ -672,11 +1118,30 @@ class GenerationService:
                 frame_index
             )
             
-            frames.append({
+            return {
                 'url': url,
                 'path': file_path,
                 'frame_index': frame_index
-            })
+            }
+        
+        # Frames do not depend on each other, generate up to FRAME_MAX_WORKERS at once
+        frames = []
+        max_workers = max(1, min(config.FRAME_MAX_WORKERS, n_frames))
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='frame')
+        try:
+            futures = [executor.submit(generate_frame, frame_index) for frame_index in range(n_frames)]
+            try:
+                for future in _as_completed(futures, deadline):
+                    frames.append(future.result())
+                if deadline:
+                    deadline.check_cancelled(f"finishing {animation_type} - {direction} frames")
+            except Exception:
+                # The animation needs every frame, do not start the remaining ones
+                for pending in futures:
+                    pending.cancel()
+                raise
+        finally:
+            executor.shutdown(wait=not (deadline and deadline.cancelled()), cancel_futures=True)
         
         # Sort frames by frame_index
         frames.sort(key=lambda f: f.get('frame_index', 0))
@@ -831,8 +1296,7 @@ class GenerationService:
             gif_path = animation_gif_dir / gif_filename
             
             # Write GIF file
-            with open(gif_path, 'wb') as f:
-                f.write(gif_data)
+            self.file_manager.write_file(gif_path, gif_data)
             
             # Generate URL
             url = f"{config.STATIC_URL_PREFIX}/generated/images/{character_id}/{animation_type}/{direction}/{gif_filename}"
@@ -976,94 +1440,226 @@ class GenerationService:
         logger.debug(f"Extracted Character DNA: {character_dna[:150]}...")
         return character_dna
     
-    def _generate_selected_animations(
+    def generate_animation(
         self,
         character: Character,
-        form_data: Dict,
-        selected_animations: List[str],
-        selected_directions: Dict[str, List[str]]
-    ):
+        animation_type: str,
+        directions: List[str],
+        mirror: Optional[bool] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, List[Dict]]:
         """
-        Generate user-selected animations
+        Generate directions of one animation type with prompt-only frames (animation endpoints)
+        
+        Directions run concurrently, are saved on the character in one update and
+        recorded as steps. Directions that already have frames are generated again.
         
         Args:
             character: Character object
-            form_data: Form data
-            selected_animations: List of selected action types, e.g., ["attack", "walk"]
-            selected_directions: Dictionary of directions for each action type, e.g., {"attack": ["east", "south"], "walk": ["east"]}
+            animation_type: Animation type (walk, run, jump, attack)
+            directions: Directions to generate
+            mirror: Flip west-facing directions from their east-facing counterpart (generated
+                now or stored) instead of generating them (defaults to the character's mirrorDirections)
+            deadline: Time budget for all API calls (defaults to GENERATION_DEADLINE_SECONDS from now)
+        
+        Returns:
+            Frames by direction (only directions that succeeded)
+        
+        Raises:
+            GenerationError: None of the directions could be generated
+            CircuitOpenError: Animation endpoint circuit is open
+            GenerationCancelledError: Deadline was cancelled
         """
-        try:
-            # Initialize animations field
-            if not hasattr(character, 'animations') or not character.animations:
-                character.animations = {}
-            
-            # Generate animations for each selected action type
-            for animation_type in selected_animations:
-                if animation_type not in ['walk', 'run', 'jump', 'attack']:
-                    logger.warning(f"Invalid animation type: {animation_type}, skipping")
-                    continue
-                
-                # Get direction list for this action type
-                directions = selected_directions.get(animation_type, [])
-                if not directions:
-                    logger.warning(f"No directions selected for {animation_type}, skipping")
-                    continue
-                
-                # Initialize animation type
-                if animation_type not in character.animations:
-                    character.animations[animation_type] = {
-                        'south': [],
-                        'north': [],
-                        'north-east': [],
-                        'east': [],
-                        'south-east': [],
-                        'south-west': [],
-                        'west': [],
-                        'north-west': []
-                    }
-                
-                logger.info(f"Generating {animation_type} animation for directions: {', '.join(directions)}")
-                
-                # Generate animation frames for each direction
-                # All directions use the same Master Reference Image (south direction)
-                master_reference_path = self._get_master_reference_path(character)
-                
-                if master_reference_path:
-                    logger.info(f"Using Master Reference Image for all directions: {master_reference_path}")
-                else:
-                    logger.warning(f"Master Reference Image not found, skipping {animation_type}")
-                    continue
+        if deadline is None:
+            deadline = Deadline.after(config.GENERATION_DEADLINE_SECONDS)
+        if not hasattr(character, 'animations') or not character.animations:
+            character.animations = {}
+        
+        results = self._run_animation_jobs(
+            character, [(animation_type, direction) for direction in directions], deadline, mirror=mirror
+        )
+        frames = {
+            direction: results[(animation_type, direction)]
+            for direction in directions if (animation_type, direction) in results
+        }
+        if not frames:
+            raise GenerationError(f"Failed to generate {animation_type} animation for {', '.join(directions)}")
+        return frames
+    
+    def _run_animation_jobs(
+        self,
+        character: Character,
+        animation_jobs: List[Tuple[str, str]],
+        deadline: Deadline,
+        mirror: Optional[bool] = None
+    ) -> Dict[Tuple[str, str], List[Dict]]:
+        """
+        Generate (animation type, direction) pairs concurrently and save them on the character
+        
+        Frames are generated from per-frame prompts.
+        A failed pair is skipped. An open circuit or exhausted deadline cancels the pairs
+        that have not started yet; the pairs generated so far are still saved before the
+        error is raised. In mirror mode, west-facing pairs whose east-facing counterpart
+        is generated (or stored) are flipped locally instead of requested; when the
+        counterpart fails, the pair is generated after all. Mirror mode follows the
+        character's mirrorDirections unless mirror is given.
+        
+        Returns:
+            Frames by (animation type, direction)
+        """
+        mirrored_jobs = {}
+        if mirror is None:
+            mirror = mirror_directions_enabled(character.input_params or {})
+        if mirror:
+            job_set = set(animation_jobs)
+            for animation_type, direction in animation_jobs:
+                source = MIRROR_SOURCES.get(direction)
+                if source and ((animation_type, source) in job_set or self._stored_frames(character, animation_type, source)):
+                    mirrored_jobs[(animation_type, direction)] = source
+        total_jobs = len(animation_jobs)
+        animation_jobs = [job for job in animation_jobs if job not in mirrored_jobs]
+        
+        def animate(animation_type: str, direction: str) -> List[Dict]:
+            logger.info(f"Generating {animation_type} animation for {direction} direction...")
+            return self._generate_animation_frames(
+                character_id=str(character.id),
+                animation_type=animation_type,
+                direction=direction,
+                n_frames=4,
+                use_prompt_only=True,
+                deadline=deadline
+            )
+        
+        results = {}
+        
+        def animate_all(jobs: List[Tuple[str, str]]) -> Optional[Exception]:
+            """Run jobs concurrently into results, returns the error that stopped them (if any)"""
+            stop_error = None
+            max_workers = max(1, min(config.ANIMATION_MAX_WORKERS, len(jobs)))
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='animate')
+            try:
+                futures = {executor.submit(animate, *job): job for job in jobs}
                 
-                for direction in directions:
+                for future in _as_completed(futures, deadline):
+                    animation_type, direction = futures[future]
+                    if future.cancelled():
+                        continue
                     try:
-                        logger.info(f"Generating {animation_type} animation for {direction} direction using Master Reference...")
-                        
-                        frames = self._generate_animation_frames(
-                            character_id=str(character.id),
-                            animation_type=animation_type,
-                            direction=direction,
-                            reference_image_path=master_reference_path,
-                            n_frames=4,
-                            use_prompt_only=False  # Use reference image method (locked consistency)
-                        )
-                        
-                        # Save animation frames
-                        character.animations[animation_type][direction] = frames
-                        character.save()
-                        
-                        logger.info(f"Successfully generated {len(frames)} frames for {animation_type} - {direction}")
-                        
+                        results[(animation_type, direction)] = future.result()
+                        logger.info(f"Successfully generated {len(results[(animation_type, direction)])} frames for {animation_type} - {direction}")
+                    except (CircuitOpenError, DeadlineExceededError) as e:
+                        # Remaining animations would fail fast too, keep the ones generated so far
+                        logger.error(f"Stopping animations at {animation_type} - {direction}: {str(e)}")
+                        stop_error = stop_error or e
+                        for pending in futures:
+                            pending.cancel()
                     except Exception as e:
                         logger.error(f"Failed to generate {animation_type} animation for {direction}: {str(e)}")
                         # Continue generating other directions, don't interrupt flow
-                        continue
-                
-                logger.info(f"Completed generating {animation_type} animation")
-            
-            logger.info(f"Successfully generated all selected animations")
-            
-        except Exception as e:
-            logger.error(f"Failed to generate selected animations: {str(e)}")
-            # Animation generation failure doesn't affect character generation
-            raise
+            finally:
+                # A cancelled generation does not wait for animations still in flight
+                executor.shutdown(wait=not deadline.cancelled(), cancel_futures=True)
+            return stop_error
+        
+        stop_error = animate_all(animation_jobs) if animation_jobs else None
+        
+        unmirrored = []
+        for (animation_type, direction), source in mirrored_jobs.items():
+            if deadline.cancelled():
+                break
+            source_frames = results.get((animation_type, source)) or self._stored_frames(character, animation_type, source)
+            if not source_frames:
+                logger.warning(f"Cannot mirror {animation_type} - {direction}: {source} frames were not generated")
+                unmirrored.append((animation_type, direction))
+                continue
+            try:
+                results[(animation_type, direction)] = self._mirror_animation_frames(
+                    str(character.id), animation_type, source_frames, direction
+                )
+            except Exception as e:
+                logger.error(f"Failed to mirror {animation_type} animation from {source} to {direction}: {str(e)}")
+                unmirrored.append((animation_type, direction))
+        
+        # A pair whose source could not be mirrored is generated like the others
+        for job in unmirrored:
+            del mirrored_jobs[job]
+        if unmirrored and stop_error is None and not deadline.cancelled():
+            logger.info(f"Generating animations that could not be mirrored: {unmirrored}")
+            stop_error = animate_all(unmirrored)
+        
+        # Save every generated direction at once (only these directions are written)
+        animations = {}
+        for (animation_type, direction), frames in results.items():
+            if animation_type not in character.animations:
+                character.animations[animation_type] = {d: [] for d in ANIMATION_DIRECTIONS}
+            character.animations[animation_type][direction] = frames
+            animations.setdefault(animation_type, {})[direction] = frames
+        if animations:
+            self.character_repo.set_animations(str(character.id), animations)
+            self._complete_steps(character, {
+                animation_step(animation_type, direction): {
+                    'animation_type': animation_type,
+                    'direction': direction,
+                    'frame_urls': [frame.get('url') for frame in frames],
+                    'gif_url': next((frame.get('gif_url') for frame in frames if frame.get('gif_url')), None),
+                    **({'mirrored_from': mirrored_jobs[(animation_type, direction)]}
+                       if (animation_type, direction) in mirrored_jobs else {})
+                }
+                for (animation_type, direction), frames in results.items()
+            })
+        
+        logger.info(f"Animations finished: {len(results)}/{total_jobs} directions succeeded ({len(mirrored_jobs)} mirrored)")
+        
+        if isinstance(stop_error, CircuitOpenError):
+            # Animation endpoint is failing, let the caller report it
+            raise stop_error
+        deadline.check_cancelled("finishing the animations")
+        return results
+    
+    def _stored_frames(self, character: Character, animation_type: str, direction: str) -> List[Dict]:
+        """Frames of an animation direction finished earlier whose files are still stored"""
+        frames = (character.animations or {}).get(animation_type, {}).get(direction) or []
+        if frames and all(frame.get('path') and Path(frame['path']).exists() for frame in frames):
+            return frames
+        return []
+    
+    def _mirror_animation_frames(
+        self,
+        character_id: str,
+        animation_type: str,
+        source_frames: List[Dict],
+        direction: str
+    ) -> List[Dict]:
+        """
+        Flip the frames of an animation direction horizontally and save them as another direction
+        
+        Args:
+            character_id: Character ID
+            animation_type: Animation type
+            source_frames: Frames of the source direction (with 'path' and 'frame_index')
+            direction: Mirrored direction
+        
+        Returns:
+            Saved frames (with GIF URL when there are multiple frames)
+        """
+        frames = []
+        for source_frame in sorted(source_frames, key=lambda f: f.get('frame_index', 0)):
+            frame_index = source_frame.get('frame_index', len(frames))
+            file_path, url = self.file_manager.save_animation_frame(
+                mirror_image(Path(source_frame['path']).read_bytes()),
+                character_id,
+                animation_type,
+                direction,
+                frame_index
+            )
+            frames.append({'url': url, 'path': file_path, 'frame_index': frame_index})
+        
+        if len(frames) > 1:
+            gif_url = self._generate_gif_from_frames(frames, character_id, animation_type, direction)
+            if gif_url:
+                for frame in frames:
+                    frame['gif_url'] = gif_url
+        
+        logger.info(f"Mirrored {len(frames)} frames for {animation_type} - {direction}")
+        return frames
 
@@ -1,2 +1 @@
-"""后台任务模块（预留，用于异步任务）"""
-
+"""后台任务模块（角色生成任务队列与worker）"""
@@ -0,0 +1,146 @@
+"""
+Job Queue
+Enqueue and look up background generation jobs
+
+Jobs are stored in MongoDB (generation_jobs), so queued work survives a
+restart of the web or worker processes. Workers in this process are woken up
+immediately when a job is enqueued; other processes pick it up on their next
+poll.
+
+Jobs are scheduled fair-share: each (priority, owner) pair gets a share of
+the workers proportional to JOB_PRIORITY_WEIGHTS[priority] *
+JOB_OWNER_WEIGHTS[owner], so interactive requests are served ahead of bulk
+work and one owner queueing many jobs does not starve the others.
+
+A queued job is cancelled right away. A running job is flagged, and the
+Deadline of its generation is cancelled by the worker holding it (directly
+when that worker runs in this process, on its next cancellation poll
+otherwise), which stops retry sleeps, rate limit waits and downloads.
+"""
+import threading
+from typing import Dict, List, Optional
+from config import config
+from database.models.generation_job_model import GenerationJob
+from database.repositories.character_repository import CharacterRepository
+from database.repositories.generation_job_repository import GenerationJobRepository
+from integrations.retry import Deadline
+from core.tasks.progress import get_progress_publisher
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+GENERATE_CHARACTER_JOB = 'generate_character'
+
+INTERACTIVE_PRIORITY = 'interactive'  # A user waiting on the page
+BULK_PRIORITY = 'bulk'  # Batch work, nobody waits on a single job
+
+_job_repo = GenerationJobRepository(config.JOB_FAIR_SHARE_COLLECTION)
+_character_repo = CharacterRepository()
+_work_available = threading.Event()
+
+# Deadlines of the jobs running in this process (job ID -> Deadline), cancelled by cancel_job()
+_running_deadlines: Dict[str, Deadline] = {}
+_running_deadlines_lock = threading.Lock()
+
+
+def enqueue_job(character_id: str, payload: dict = None, job_type: str = GENERATE_CHARACTER_JOB,
+                priority: str = INTERACTIVE_PRIORITY, owner: str = None, cost: float = 1.0,
+                deadline_seconds: float = None, batch_id: str = None, batch_index: int = None) -> GenerationJob:
+    """
+    Add a job to the queue
+    
+    Args:
+        character_id: Character the job works on
+        payload: Handler input
+        job_type: Handler name (see core.tasks.worker.JOB_HANDLERS)
+        priority: Priority class (interactive/bulk)
+        owner: Fair-share key (user ID or client address)
+        cost: Estimated work (external API calls), owners are charged by it
+        deadline_seconds: Job deadline from now, including time spent queued
+            (None uses JOB_DEADLINE_SECONDS, 0 means no job deadline)
+        batch_id: Bulk generation the job belongs to (optional)
+        batch_index: Position of the job in the batch request
+    
+    Returns:
+        Queued GenerationJob
+    """
+    weight = config.JOB_PRIORITY_WEIGHTS.get(priority, 1.0) * config.JOB_OWNER_WEIGHTS.get(owner or 'anonymous', 1.0)
+    job = _job_repo.enqueue(
+        character_id, payload, job_type=job_type, max_attempts=config.JOB_MAX_ATTEMPTS,
+        priority=priority, owner=owner, cost=cost, weight=weight,
+        deadline_seconds=deadline_seconds if deadline_seconds is not None else config.JOB_DEADLINE_SECONDS,
+        batch_id=batch_id, batch_index=batch_index
+    )
+    logger.info(f"Queued {job_type} job {job.id} for character {character_id} ({priority}, owner {job.owner})")
+    notify_workers()
+    return job
+
+
+def get_job(job_id: str) -> Optional[GenerationJob]:
+    """Get a job by ID"""
+    return _job_repo.get_by_id(job_id)
+
+
+def get_batch_jobs(batch_id: str) -> List[GenerationJob]:
+    """Get the jobs of a bulk generation, in request order"""
+    return _job_repo.get_by_batch_id(batch_id)
+
+
+def get_active_job(character_id: str) -> Optional[GenerationJob]:
+    """Get the queued or running job of a character (None if there is none)"""
+    return _job_repo.get_active_by_character_id(character_id)
+
+
+def cancel_job(job: GenerationJob, reason: str = "cancelled by user") -> Optional[GenerationJob]:
+    """
+    Cancel a queued or running job
+    
+    Returns:
+        Updated job (status "cancelled", or "running" with cancel_requested set),
+        None if the job already finished
+    """
+    job_id = str(job.id)
+    job = _job_repo.request_cancel(job_id)
+    if job is None:
+        return None
+    
+    if job.status == 'cancelled':
+        # Never started, no worker will report it
+        _character_repo.update_status(str(job.character_id), 'cancelled')
+        get_progress_publisher().cancelled(str(job.character_id), reason)
+        logger.info(f"Cancelled queued job {job_id}")
+    else:
+        with _running_deadlines_lock:
+            deadline = _running_deadlines.get(job_id)
+        if deadline is not None:
+            deadline.cancel(reason)
+        logger.info(f"Requested cancellation of running job {job_id}")
+    return job
+
+
+def register_running_job(job_id: str, deadline: Deadline):
+    """Make a job running in this process cancellable through cancel_job()"""
+    with _running_deadlines_lock:
+        _running_deadlines[str(job_id)] = deadline
+
+
+def unregister_running_job(job_id: str):
+    with _running_deadlines_lock:
+        _running_deadlines.pop(str(job_id), None)
+
+
+def get_queue_metrics(window_seconds: float = 900) -> dict:
+    """Queue depth and wait time per priority class, queued jobs per owner"""
+    return _job_repo.queue_metrics(window_seconds)
+
+
+def notify_workers():
+    """Wake up idle workers in this process"""
+    _work_available.set()
+
+
+def wait_for_work(timeout: float) -> bool:
+    """Block until a job is enqueued in this process or timeout passes"""
+    woken = _work_available.wait(timeout)
+    _work_available.clear()
+    return woken
@@ -0,0 +1,273 @@
+"""
+Generation Progress
+Structured progress events for character generation, streamed to clients (SSE)
+
+GenerationService publishes an event when a generation starts, for every
+finished step (base image, each rotation, story, each animation direction)
+and when it completes, fails or is cancelled. Clients subscribe to the events of one
+character instead of polling the character document.
+
+Events live in a pluggable backend: the in-memory backend serves subscribers
+in the process that runs the generation (JOB_WORKER_MODE=inprocess), the
+MongoDB backend writes events to a capped collection that web processes tail,
+so it also works with external workers.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+from config import config
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+STARTED = 'started'
+STEP = 'step'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TERMINAL_EVENTS = (COMPLETED, FAILED, CANCELLED)
+
+
+class ProgressBackend:
+    """Progress event storage backend"""
+
+    def append(self, character_id: str, event: Dict) -> str:
+        """
+        Store an event
+
+        Returns:
+            Event ID (increasing per character, used as SSE id / Last-Event-ID)
+        """
+        raise NotImplementedError
+
+    def subscribe(self, character_id: str, after: Optional[str] = None,
+                  idle_timeout: float = 15) -> Iterator[Optional[Dict]]:
+        """
+        Yield events of a character newer than `after` as they are published
+
+        Each event carries its 'id'. None is yielded whenever idle_timeout seconds
+        pass without an event (callers use it to send keep-alives or stop).
+        """
+        raise NotImplementedError
+
+
+class InMemoryProgressBackend(ProgressBackend):
+    """Per-process backend, subscribers wait on a condition instead of polling"""
+
+    def __init__(self, max_events: int = 200, retention_seconds: float = None):
+        self.max_events = max_events
+        self.retention_seconds = retention_seconds if retention_seconds is not None else config.PROGRESS_RETENTION_SECONDS
+        self._events: Dict[str, deque] = {}  # character_id -> events
+        self._sequence = 0
+        self._finished_at: Dict[str, float] = {}  # character_id -> time of its terminal event
+        self._condition = threading.Condition()
+
+    def append(self, character_id: str, event: Dict) -> str:
+        with self._condition:
+            self._sequence += 1
+            event = {**event, 'id': str(self._sequence)}
+            if event.get('type') == STARTED:
+                # A new run replaces the events of an earlier (finished or interrupted) one
+                self._events.pop(character_id, None)
+                self._finished_at.pop(character_id, None)
+            self._events.setdefault(character_id, deque(maxlen=self.max_events)).append(event)
+            if event.get('type') in TERMINAL_EVENTS:
+                self._finished_at[character_id] = time.monotonic()
+            self._expire()
+            self._condition.notify_all()
+            return event['id']
+
+    def subscribe(self, character_id: str, after: Optional[str] = None,
+                  idle_timeout: float = 15) -> Iterator[Optional[Dict]]:
+        last_sequence = int(after) if after and after.isdigit() else 0
+        while True:
+            with self._condition:
+                events = self._newer(character_id, last_sequence)
+                if not events:
+                    self._condition.wait(idle_timeout)
+                    events = self._newer(character_id, last_sequence)
+            if not events:
+                yield None
+                continue
+            for event in events:
+                last_sequence = int(event['id'])
+                yield event
+
+    def _newer(self, character_id: str, sequence: int) -> List[Dict]:
+        return [event for event in self._events.get(character_id, ()) if int(event['id']) > sequence]
+
+    def _expire(self):
+        """Drop events of generations that finished more than retention_seconds ago"""
+        now = time.monotonic()
+        for character_id, finished_at in list(self._finished_at.items()):
+            if now - finished_at > self.retention_seconds:
+                self._events.pop(character_id, None)
+                del self._finished_at[character_id]
+
+
+class MongoProgressBackend(ProgressBackend):
+    """
+    Backend shared across processes through a capped MongoDB collection
+
+    Subscribers hold a tailable await cursor, so the server pushes new events
+    to them instead of the subscriber re-querying. Old events are discarded by
+    the collection size cap.
+    """
+
+    def __init__(self, collection_name: str = None, size_bytes: int = None):
+        self.collection_name = collection_name or config.PROGRESS_COLLECTION
+        self.size_bytes = size_bytes or config.PROGRESS_COLLECTION_BYTES
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _collection(self):
+        from mongoengine import get_db
+        from pymongo.errors import CollectionInvalid
+
+        db = get_db()
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    try:
+                        db.create_collection(self.collection_name, capped=True, size=self.size_bytes)
+                    except CollectionInvalid:
+                        pass  # Already exists
+                    self._ready = True
+        return db[self.collection_name]
+
+    def append(self, character_id: str, event: Dict) -> str:
+        result = self._collection().insert_one({**event, 'character_id': character_id})
+        return str(result.inserted_id)
+
+    def subscribe(self, character_id: str, after: Optional[str] = None,
+                  idle_timeout: float = 15) -> Iterator[Optional[Dict]]:
+        from bson import ObjectId
+        from pymongo import CursorType
+
+        last_id = ObjectId(after) if after and ObjectId.is_valid(after) else None
+        if last_id is None:
+            # Start at the latest run, events of earlier runs are not replayed
+            latest_start = self._collection().find_one(
+                {'character_id': character_id, 'type': STARTED}, sort=[('$natural', -1)]
+            )
+            if latest_start is not None:
+                last_id = ObjectId.from_datetime(latest_start['_id'].generation_time)
+        cursor = None
+        try:
+            while True:
+                if cursor is None or not cursor.alive:
+                    if cursor is not None:
+                        # The server closes a tailable cursor on an empty collection, retry shortly
+                        cursor.close()
+                        time.sleep(min(1.0, idle_timeout))
+                    query = {'character_id': character_id}
+                    if last_id is not None:
+                        query['_id'] = {'$gt': last_id}
+                    cursor = self._collection().find(
+                        query,
+                        cursor_type=CursorType.TAILABLE_AWAIT,
+                        max_await_time_ms=int(idle_timeout * 1000)
+                    )
+                try:
+                    document = next(cursor)
+                except StopIteration:
+                    # Nothing new within max_await_time_ms (or the cursor died)
+                    yield None
+                    continue
+                last_id = document['_id']
+                event = {key: value for key, value in document.items() if key not in ('_id', 'character_id')}
+                event['id'] = str(last_id)
+                yield event
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+
+class ProgressPublisher:
+    """Publishes progress events and tracks start time and step counts per running generation"""
+
+    def __init__(self, backend: ProgressBackend = None):
+        self.backend = backend or InMemoryProgressBackend()
+        self._runs: Dict[str, Dict] = {}  # character_id -> {'started_at', 'total_steps', 'completed_steps'}
+        self._lock = threading.Lock()
+
+    def started(self, character_id: str, total_steps: int, completed_steps: List[str] = None):
+        """A generation (or resumed generation) started"""
+        completed_steps = list(completed_steps or [])
+        with self._lock:
+            self._runs[character_id] = {
+                'started_at': time.time(),
+                'total_steps': total_steps,
+                'completed_steps': len(completed_steps)
+            }
+        self._publish(character_id, STARTED, {
+            'total_steps': total_steps,
+            'completed_steps': completed_steps
+        })
+
+    def step(self, character_id: str, step: str, asset: Dict = None):
+        """A step finished, asset holds the URL(s) of what it produced"""
+        with self._lock:
+            run = self._runs.get(character_id)
+            if run is not None:
+                run['completed_steps'] += 1
+        self._publish(character_id, STEP, {'step': step, 'asset': asset or {}})
+
+    def completed(self, character_id: str, character: Dict = None):
+        """The generation finished, character is the API representation of the result"""
+        self._publish(character_id, COMPLETED, {'character': character}, finish=True)
+
+    def failed(self, character_id: str, error: str):
+        """The generation failed"""
+        self._publish(character_id, FAILED, {'error': error}, finish=True)
+
+    def cancelled(self, character_id: str, reason: str = None):
+        """The generation was cancelled (steps finished so far are kept and can be resumed)"""
+        self._publish(character_id, CANCELLED, {'reason': reason}, finish=True)
+
+    def _publish(self, character_id: str, event_type: str, data: Dict, finish: bool = False):
+        now = time.time()
+        with self._lock:
+            run = self._runs.pop(character_id, None) if finish else self._runs.get(character_id)
+            progress = {}
+            if run is not None:
+                progress = {
+                    'elapsed': round(now - run['started_at'], 3),
+                    'progress': min(run['completed_steps'] / run['total_steps'], 1.0) if run['total_steps'] else None
+                }
+        event = {'type': event_type, 'timestamp': now, **progress, **data}
+        if finish:
+            event['progress'] = 1.0 if event_type == COMPLETED else event.get('progress')
+        try:
+            self.backend.append(character_id, event)
+        except Exception as e:
+            # Progress reporting must never fail the generation
+            logger.warning(f"Failed to publish {event_type} progress event for {character_id}: {str(e)}")
+
+    def subscribe(self, character_id: str, after: Optional[str] = None,
+                  idle_timeout: float = None) -> Iterator[Optional[Dict]]:
+        """Yield events of a character as they are published (see ProgressBackend.subscribe)"""
+        if idle_timeout is None:
+            idle_timeout = config.SSE_HEARTBEAT_SECONDS
+        return self.backend.subscribe(character_id, after, idle_timeout)
+
+
+_progress_publisher: Optional[ProgressPublisher] = None
+_progress_publisher_lock = threading.Lock()
+
+
+def get_progress_publisher() -> ProgressPublisher:
+    """Get the process-wide progress publisher (backend selected by PROGRESS_BACKEND)"""
+    global _progress_publisher
+
+    if _progress_publisher is None:
+        with _progress_publisher_lock:
+            if _progress_publisher is None:
+                if config.PROGRESS_BACKEND == 'mongo':
+                    backend = MongoProgressBackend()
+                else:
+                    backend = InMemoryProgressBackend()
+                _progress_publisher = ProgressPublisher(backend)
+                logger.info(f"Progress publisher initialized (backend: {config.PROGRESS_BACKEND})")
+    return _progress_publisher
@@ -0,0 +1,283 @@
+"""
+Job Worker
+Runs queued generation jobs in background threads
+
+A worker claims jobs from MongoDB with a lease and renews it while the job
+runs. If the process dies, the lease expires and another worker (or this one
+after a restart) claims the job again, up to JOB_MAX_ATTEMPTS times.
+
+Every job runs with a Deadline (the job's deadline_at, if any). The worker
+polls for cancellation requests and cancels the Deadline of a cancelled job,
+which stops its generation.
+
+Runs inside the web process (JOB_WORKER_MODE=inprocess, started by create_app)
+or as separate processes:
+    python -m core.tasks.worker --concurrency 4
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from config import config
+from database.models.generation_job_model import GenerationJob
+from database.repositories.character_repository import CharacterRepository
+from database.repositories.generation_job_repository import GenerationJobRepository
+from core.tasks.job_queue import (
+    GENERATE_CHARACTER_JOB, wait_for_work, notify_workers, register_running_job, unregister_running_job
+)
+from integrations.retry import Deadline
+from utils.logger import setup_logger
+from utils.exceptions import NotFoundError, GenerationCancelledError
+
+logger = setup_logger(__name__)
+
+# Job type -> handler(job, deadline), a handler raises to fail the job
+# (GenerationCancelledError marks it cancelled)
+JOB_HANDLERS: Dict[str, Callable[[GenerationJob, Deadline], None]] = {}
+
+
+def job_handler(job_type: str):
+    """Register a handler for a job type"""
+    def decorator(fn):
+        JOB_HANDLERS[job_type] = fn
+        return fn
+    return decorator
+
+
+_generation_service = None
+_generation_service_lock = threading.Lock()
+
+
+def _get_generation_service():
+    """Shared GenerationService (clients hold connection pools, create once)"""
+    global _generation_service
+    with _generation_service_lock:
+        if _generation_service is None:
+            from core.services.generation_service import GenerationService
+            _generation_service = GenerationService()
+        return _generation_service
+
+
+@job_handler(GENERATE_CHARACTER_JOB)
+def run_character_generation(job: GenerationJob, deadline: Deadline):
+    """
+    Generate images and story for the job's character
+
+    Steps finished by an earlier attempt (worker crash, restart, resume request) are
+    kept, only the missing ones are generated.
+    """
+    service = _get_generation_service()
+    character = service.character_repo.get_by_id(str(job.character_id))
+    if not character:
+        raise NotFoundError(f"Character not found: {job.character_id}")
+    service.run_generation(character, resume=True, deadline=deadline)
+
+
+class JobWorker:
+    """Pool of threads claiming and running jobs, plus a lease heartbeat"""
+
+    def __init__(self, concurrency: int = None, poll_interval: float = None, lease_seconds: float = None,
+                 cancel_poll_interval: float = None):
+        self.concurrency = max(1, concurrency or config.JOB_WORKER_CONCURRENCY)
+        self.poll_interval = poll_interval if poll_interval is not None else config.JOB_POLL_INTERVAL
+        self.lease_seconds = lease_seconds or config.JOB_LEASE_SECONDS
+        self.cancel_poll_interval = cancel_poll_interval or config.JOB_CANCEL_POLL_INTERVAL
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.job_repo = GenerationJobRepository()
+        self.character_repo = CharacterRepository()
+
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._active: Dict[str, Deadline] = {}  # job ID -> deadline of the running job
+        self._active_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads) and not self._stopping.is_set()
+
+    def start(self):
+        """Start the worker threads"""
+        if self._threads:
+            return
+        self._stopping.clear()
+        for index in range(self.concurrency):
+            self._threads.append(threading.Thread(
+                target=self._run_loop, name=f"job-worker-{index}", daemon=True
+            ))
+        self._threads.append(threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Job worker {self.worker_id} started with {self.concurrency} threads")
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop claiming jobs and wait for running ones to finish
+
+        Args:
+            timeout: Maximum seconds to wait per thread (None waits indefinitely).
+                Jobs still running afterwards are re-queued once their lease expires.
+        """
+        self._stopping.set()
+        notify_workers()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    def active_jobs(self) -> List[str]:
+        with self._active_lock:
+            return list(self._active)
+
+    def _run_loop(self):
+        while not self._stopping.is_set():
+            try:
+                job = self.job_repo.claim_next(self.worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Failed to claim job: {str(e)}")
+                job = None
+
+            if job is None:
+                wait_for_work(self.poll_interval)
+                continue
+
+            self._execute(job)
+
+    def _execute(self, job: GenerationJob):
+        job_id = str(job.id)
+
+        if job.attempts > job.max_attempts:
+            # Claimed again after its worker died too many times, give up
+            self._fail(job, f"Job abandoned after {job.max_attempts} attempts")
+            return
+
+        handler = JOB_HANDLERS.get(job.job_type)
+        if handler is None:
+            self._fail(job, f"Unknown job type: {job.job_type}")
+            return
+
+        deadline = Deadline()
+        if job.deadline_at is not None:
+            remaining = (job.deadline_at - datetime.utcnow()).total_seconds()
+            if remaining <= 0:
+                self._fail(job, "Job deadline passed before it started")
+                return
+            deadline = Deadline(remaining)
+        if job.cancel_requested:
+            deadline.cancel("cancelled by user")
+
+        with self._active_lock:
+            self._active[job_id] = deadline
+        register_running_job(job_id, deadline)
+        logger.info(f"Running {job.job_type} job {job_id} (attempt {job.attempts}/{job.max_attempts})")
+
+        try:
+            handler(job, deadline)
+        except GenerationCancelledError as e:
+            logger.info(f"Job {job_id} cancelled: {str(e)}")
+            self.job_repo.mark_cancelled(job_id, self.worker_id)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self.job_repo.mark_failed(job_id, self.worker_id, str(e))
+        else:
+            if self.job_repo.mark_succeeded(job_id, self.worker_id):
+                logger.info(f"Job {job_id} succeeded")
+            else:
+                logger.warning(f"Job {job_id} finished after its lease was taken over")
+        finally:
+            unregister_running_job(job_id)
+            with self._active_lock:
+                self._active.pop(job_id, None)
+
+    def _fail(self, job: GenerationJob, error: str):
+        """Fail a job that never ran and mark its character failed"""
+        logger.error(f"Job {job.id} failed: {error}")
+        self.job_repo.mark_failed(str(job.id), self.worker_id, error)
+        try:
+            self.character_repo.update_status(str(job.character_id), 'failed')
+        except Exception as e:
+            logger.warning(f"Failed to update character {job.character_id} status: {str(e)}")
+
+    def _heartbeat_loop(self):
+        renew_interval = self.lease_seconds / 3
+        last_renewal = time.monotonic()
+        while not self._stopping.wait(min(self.cancel_poll_interval, renew_interval)):
+            self._check_cancellations()
+            if time.monotonic() - last_renewal < renew_interval:
+                continue
+            last_renewal = time.monotonic()
+            for job_id in self.active_jobs():
+                try:
+                    if not self.job_repo.renew_lease(job_id, self.worker_id, self.lease_seconds):
+                        logger.warning(f"Lost lease on job {job_id}")
+                except Exception as e:
+                    logger.error(f"Failed to renew lease on job {job_id}: {str(e)}")
+
+    def _check_cancellations(self):
+        """Cancel the deadline of running jobs whose cancellation was requested (possibly by another process)"""
+        try:
+            cancelled = self.job_repo.get_cancel_requested(self.active_jobs())
+        except Exception as e:
+            logger.error(f"Failed to check job cancellations: {str(e)}")
+            return
+        for job_id in cancelled:
+            with self._active_lock:
+                deadline = self._active.get(job_id)
+            if deadline is not None and not deadline.cancelled():
+                logger.info(f"Cancelling job {job_id}")
+                deadline.cancel("cancelled by user")
+
+
+_job_worker: Optional[JobWorker] = None
+_job_worker_lock = threading.Lock()
+
+
+def get_job_worker() -> JobWorker:
+    """Get the process-wide job worker (not started)"""
+    global _job_worker
+    with _job_worker_lock:
+        if _job_worker is None:
+            _job_worker = JobWorker()
+        return _job_worker
+
+
+def start_job_worker() -> JobWorker:
+    """Start the process-wide job worker (no-op if already running)"""
+    worker = get_job_worker()
+    worker.start()
+    return worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run background generation jobs')
+    parser.add_argument('--concurrency', type=int, default=None, help='Jobs run concurrently (default: JOB_WORKER_CONCURRENCY)')
+    args = parser.parse_args()
+
+    from database.connection import init_db, close_db
+    config.init_directories()
+    init_db()
+
+    worker = JobWorker(concurrency=args.concurrency)
+    stop_requested = threading.Event()
+
+    def request_stop(signum, frame):
+        logger.info(f"Received signal {signum}, finishing running jobs...")
+        stop_requested.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    worker.start()
+    while not stop_requested.wait(1):
+        pass
+    worker.stop()
+    close_db()
+
+
+if __name__ == '__main__':
+    main()
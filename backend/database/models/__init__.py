@@ -1,6 +1,6 @@
 """数据库模型模块"""
 from .user_model import User
 from .character_model import Character
+from .generation_job_model import GenerationJob
 
-__all__ = ['User', 'Character']
-
+__all__ = ['User', 'Character', 'GenerationJob']
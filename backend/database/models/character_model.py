@@ -15,15 +15,18 @@ class Character(Document):
     name = StringField(required=True, max_length=100)
     description = StringField(max_length=500, default='')
     
-    # Status: pending, generating, pending_save, completed, failed
+    # Status: pending, generating, pending_save, completed, failed, cancelled
     status = StringField(
         required=True,
         default='pending',
-        choices=['pending', 'generating', 'pending_save', 'completed', 'failed']
+        choices=['pending', 'generating', 'pending_save', 'completed', 'failed', 'cancelled']
     )
     
     # Input parameters (for regeneration)
     input_params = DictField(default=dict)
+    # Hash of the normalized input parameters that determine the generated assets,
+    # identical forms can reuse an earlier character's assets instead of generating again
+    fingerprint = StringField(default=None, null=True)
     
     # Metadata (for storing Character DNA, Master Reference Image, etc.)
     metadata = DictField(default=dict)
@@ -57,6 +60,10 @@ class Character(Document):
     #   ...
     # }
     
+    # Finished generation steps (checkpoints), a resumed generation only runs the missing steps
+    completed_steps = ListField(StringField(), default=list)
+    # Format: ["base_image", "rotation:east", "story", "animation:walk:east", ...]
+    
     # Metadata
     created_at = DateTimeField(default=datetime.utcnow)
     updated_at = DateTimeField(default=datetime.utcnow)
@@ -69,7 +76,8 @@ class Character(Document):
             'user_id',
             'status',
             'created_at',
-            ('user_id', 'created_at')  # Composite index
+            ('user_id', 'created_at'),  # Composite index
+            ('fingerprint', 'status', '-created_at')  # Reusable characters for a form
         ]
     }
     
@@ -111,9 +119,9 @@ class Character(Document):
         self.updated_at = datetime.utcnow()
     
     def increment_view(self):
-        """Increment view count"""
+        """Increment view count (atomic $inc, does not rewrite the document)"""
+        self.update(inc__view_count=1)
         self.view_count += 1
-        self.save()
     
     def to_dict(self, include_paths=False):
         """
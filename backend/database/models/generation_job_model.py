@@ -0,0 +1,94 @@
+"""
+Generation Job Model
+Persistent queue entry for background character generation
+"""
+from mongoengine import Document, StringField, DateTimeField, ObjectIdField, DictField, IntField, FloatField, BooleanField
+from datetime import datetime
+
+
+class GenerationJob(Document):
+    """Generation Job Model"""
+
+    # Job type, selects the handler that runs it (see core.tasks.worker.JOB_HANDLERS)
+    job_type = StringField(required=True, default='generate_character')
+
+    # Character being generated
+    character_id = ObjectIdField(required=True)
+
+    # Status: queued, running, succeeded, failed, cancelled
+    status = StringField(
+        required=True,
+        default='queued',
+        choices=['queued', 'running', 'succeeded', 'failed', 'cancelled']
+    )
+
+    # Handler input (validated form data)
+    payload = DictField(default=dict)
+
+    # Bulk generation: batch the job belongs to and its position in the batch request
+    batch_id = StringField(default=None, null=True)
+    batch_index = IntField(default=None, null=True)
+
+    # Scheduling: priority class and owner (user ID or client address) for fair-share queuing
+    priority = StringField(required=True, default='interactive', choices=['interactive', 'bulk'])
+    owner = StringField(default='anonymous')
+    cost = FloatField(default=1.0)  # Estimated external calls
+    # Weighted fair queuing tags, jobs are claimed in virtual_finish order
+    virtual_start = FloatField(default=0.0)
+    virtual_finish = FloatField(default=0.0)
+
+    # Attempts (incremented on every claim, including re-claims after a worker crash)
+    attempts = IntField(default=0)
+    max_attempts = IntField(default=3)
+    error = StringField(default=None, null=True)
+
+    # Lease: a running job whose lease expired is considered abandoned and re-queued
+    lease_owner = StringField(default=None, null=True)
+    lease_expires_at = DateTimeField(default=None, null=True)
+
+    # Cancellation: set on a running job, the worker holding it stops the generation
+    cancel_requested = BooleanField(default=False)
+    # Per-job deadline (counted from enqueue, includes time spent queued), None = GENERATION_DEADLINE_SECONDS only
+    deadline_at = DateTimeField(default=None, null=True)
+
+    # Metadata
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
+    started_at = DateTimeField(default=None, null=True)
+    finished_at = DateTimeField(default=None, null=True)
+
+    meta = {
+        'collection': 'generation_jobs',
+        'indexes': [
+            'character_id',
+            ('batch_id', 'batch_index'),  # Batch progress
+            ('status', 'virtual_finish', 'created_at'),  # Claim order
+            ('status', 'priority', 'created_at'),  # Queue metrics
+            ('status', 'lease_expires_at'),  # Abandoned job recovery
+            ('status', 'cancel_requested')  # Cancellation checks by workers
+        ]
+    }
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('succeeded', 'failed', 'cancelled')
+
+    def to_dict(self):
+        """Convert to dictionary (for frontend use)"""
+        return {
+            'id': str(self.id),
+            'job_type': self.job_type,
+            'character_id': str(self.character_id),
+            'status': self.status,
+            'priority': self.priority,
+            'batch_id': self.batch_id,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'error': self.error,
+            'cancel_requested': self.cancel_requested,
+            'deadline_at': self.deadline_at.isoformat() if self.deadline_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -2,6 +2,6 @@
 from .base_repository import BaseRepository
 from .user_repository import UserRepository
 from .character_repository import CharacterRepository
+from .generation_job_repository import GenerationJobRepository
 
-__all__ = ['BaseRepository', 'UserRepository', 'CharacterRepository']
-
+__all__ = ['BaseRepository', 'UserRepository', 'CharacterRepository', 'GenerationJobRepository']
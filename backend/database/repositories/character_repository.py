@@ -1,56 +1,188 @@
 """
 角色Repository
 """
-from typing import Optional, List
+from typing import Optional, List, Dict
 from .base_repository import BaseRepository
 from database.models.character_model import Character
 from bson import ObjectId
 from datetime import datetime
 
+# 动画的方向列表（新建动画类型时每个方向初始化为空列表）
+ANIMATION_DIRECTIONS = ['south', 'north', 'north-east', 'east', 'south-east', 'south-west', 'west', 'north-west']
+
 
 class CharacterRepository(BaseRepository):
-    """角色数据访问层"""
-    
+    """
+    角色数据访问层
+
+    生成流程中的写入使用针对单个字段的原子更新（$set/$push），不再读取并重写整个文档：
+    写入量不随文档大小增长，同一角色的并发更新也不会互相覆盖。
+    """
+
     def __init__(self):
         super().__init__(Character)
-    
+
     def get_by_user_id(self, user_id: str, limit: int = None, skip: int = 0) -> List[Character]:
         """获取用户的所有角色"""
         filters = {'user_id': ObjectId(user_id)} if user_id else {}
         return self.get_all(limit=limit, skip=skip, **filters)
-    
+
     def get_completed(self, limit: int = None, skip: int = 0) -> List[Character]:
         """获取所有已完成生成的角色（用于Gallery）"""
         return self.get_all(limit=limit, skip=skip, status='completed')
-    
-    def update_status(self, character_id: str, status: str) -> Optional[Character]:
-        """更新角色状态"""
-        valid_statuses = ['pending', 'generating', 'pending_save', 'completed', 'failed']
+
+    def get_by_ids(self, character_ids: List[str], *fields: str) -> List[Character]:
+        """批量获取角色（可只加载指定字段）"""
+        query = self.model.objects(id__in=[ObjectId(str(character_id)) for character_id in character_ids])
+        return list(query.only(*fields) if fields else query)
+
+    def get_by_fingerprint(self, fingerprint: str, statuses: List[str], limit: int = 5) -> List[Character]:
+        """获取输入参数指纹相同、处于给定状态的角色（最新的在前）"""
+        return list(
+            self.model.objects(fingerprint=fingerprint, status__in=statuses).order_by('-created_at').limit(limit)
+        )
+
+    def get_status(self, character_id: str) -> Optional[str]:
+        """只读取角色状态（不加载整个文档），角色不存在时返回None"""
+        document = self.model._get_collection().find_one({'_id': ObjectId(str(character_id))}, {'status': 1})
+        return document.get('status') if document else None
+
+    def update_status(self, character_id: str, status: str, **fields) -> bool:
+        """
+        更新角色状态（可同时设置其他顶层字段，如generation_time），返回是否找到角色
+        """
+        valid_statuses = ['pending', 'generating', 'pending_save', 'completed', 'failed', 'cancelled']
         if status not in valid_statuses:
             raise ValueError(f"Invalid status: {status}")
-        return self.update(character_id, status=status)
-    
-    def add_image(self, character_id: str, url: str, path: str, angle: str, index: int) -> Optional[Character]:
-        """添加图片到角色"""
-        character = self.get_by_id(character_id)
-        if character:
-            character.add_image(url, path, angle, index)
-            return character
-        return None
-    
-    def set_story(self, character_id: str, content: str, prompt: str = None) -> Optional[Character]:
+        return self._set(character_id, {'status': status, **fields})
+
+    def reset_generation(self, character_id: str) -> bool:
+        """开始（重新）生成：状态设为generating，清空之前生成的图片、故事和已完成步骤"""
+        return self._set(character_id, {'status': 'generating', 'images': [], 'story': {}, 'completed_steps': []})
+
+    def reset_images(self, character_id: str, completed_steps: List[str]) -> bool:
+        """重新生成基础图片时：状态设为generating，清空之前生成的图片，已完成步骤只保留completed_steps"""
+        return self._set(character_id, {'status': 'generating', 'images': [], 'completed_steps': list(completed_steps)})
+
+    def mark_steps_completed(self, character_id: str, *steps: str) -> bool:
+        """记录已完成的生成步骤（检查点），恢复生成时跳过这些步骤"""
+        if not steps:
+            return False
+        result = self.model._get_collection().update_one(
+            {'_id': ObjectId(str(character_id))},
+            {'$addToSet': {'completed_steps': {'$each': list(steps)}}, '$set': {'updated_at': datetime.utcnow()}}
+        )
+        return result.matched_count > 0
+
+    def add_image(self, character_id: str, url: str, path: str, angle: str, index: int) -> bool:
+        """
+        添加图片到角色（相同index的图片会被替换），返回是否找到角色
+        """
+        image_data = {
+            'url': url,
+            'path': path,
+            'angle': angle,
+            'index': index
+        }
+        collection = self.model._get_collection()
+        _id = ObjectId(str(character_id))
+        while True:
+            now = datetime.utcnow()
+            # 已有相同index的图片：原地替换
+            result = collection.update_one(
+                {'_id': _id, 'images.index': index},
+                {'$set': {'images.$': image_data, 'updated_at': now}}
+            )
+            if result.matched_count:
+                return True
+            # 没有相同index的图片：追加（过滤条件保证并发追加时不会出现重复index）
+            result = collection.update_one(
+                {'_id': _id, 'images.index': {'$ne': index}},
+                {'$push': {'images': image_data}, '$set': {'updated_at': now}}
+            )
+            if result.matched_count:
+                return True
+            # 两次都未匹配：角色不存在，或其他写入刚好追加了相同index（重试替换）
+            if not collection.count_documents({'_id': _id}, limit=1):
+                return False
+
+    def set_story(self, character_id: str, content: str, prompt: str = None) -> bool:
         """设置角色故事"""
-        character = self.get_by_id(character_id)
-        if character:
-            character.set_story(content, prompt)
-            return character
-        return None
-    
-    def set_gif(self, character_id: str, url: str, path: str, duration: int, frame_count: int) -> Optional[Character]:
+        return self._set(character_id, {
+            'story': {
+                'content': content,
+                'generated_at': datetime.utcnow(),
+                'prompt': prompt or ''
+            }
+        })
+
+    def set_gif(self, character_id: str, url: str, path: str, duration: int, frame_count: int) -> bool:
         """设置角色GIF"""
-        character = self.get_by_id(character_id)
-        if character:
-            character.set_gif(url, path, duration, frame_count)
-            return character
-        return None
+        return self._set(character_id, {
+            'gif': {
+                'url': url,
+                'path': path,
+                'duration': duration,
+                'frame_count': frame_count,
+                'created_at': datetime.utcnow()
+            }
+        })
+
+    def set_metadata(self, character_id: str, **values) -> bool:
+        """设置metadata中的字段（其他字段保持不变）"""
+        return self._set(character_id, {f'metadata.{key}': value for key, value in values.items()})
+
+    def set_animation_direction(self, character_id: str, animation_type: str, direction: str,
+                                frames: List[Dict]) -> bool:
+        """设置某个动画类型某个方向的帧"""
+        return self.set_animations(character_id, {animation_type: {direction: frames}})
+
+    def set_animations(self, character_id: str, animations: Dict[str, Dict[str, List[Dict]]]) -> bool:
+        """
+        一次设置多个动画方向的帧，其他动画和方向保持不变
+
+        Args:
+            animations: {animation_type: {direction: frames}}
+        """
+        collection = self.model._get_collection()
+        _id = ObjectId(str(character_id))
+
+        # 新的动画类型先初始化所有方向（仅当该类型不存在时）
+        for animation_type in animations:
+            self.init_animation(character_id, animation_type)
+
+        values = {
+            f'animations.{animation_type}.{direction}': frames
+            for animation_type, directions in animations.items()
+            for direction, frames in directions.items()
+        }
+        if not values:
+            return collection.count_documents({'_id': _id}, limit=1) > 0
+        return self._set(character_id, values)
+
+    def init_animation(self, character_id: str, animation_type: str) -> bool:
+        """添加动画类型（每个方向为空列表），已存在时不修改，返回是否新添加"""
+        result = self.model._get_collection().update_one(
+            {'_id': ObjectId(str(character_id)), f'animations.{animation_type}': {'$exists': False}},
+            {'$set': {
+                f'animations.{animation_type}': {direction: [] for direction in ANIMATION_DIRECTIONS},
+                'updated_at': datetime.utcnow()
+            }}
+        )
+        return result.modified_count > 0
+
+    def remove_animation(self, character_id: str, animation_type: str) -> bool:
+        """删除动画类型"""
+        result = self.model._get_collection().update_one(
+            {'_id': ObjectId(str(character_id))},
+            {'$unset': {f'animations.{animation_type}': ''}, '$set': {'updated_at': datetime.utcnow()}}
+        )
+        return result.matched_count > 0
 
+    def _set(self, character_id: str, values: Dict) -> bool:
+        """原子地设置字段（点号路径），同时更新updated_at，返回是否找到角色"""
+        result = self.model._get_collection().update_one(
+            {'_id': ObjectId(str(character_id))},
+            {'$set': {**values, 'updated_at': datetime.utcnow()}}
+        )
+        return result.matched_count > 0
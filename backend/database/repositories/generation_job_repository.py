@@ -0,0 +1,232 @@
+"""
+生成任务Repository
+"""
+from typing import Optional, List, Dict
+from datetime import datetime, timedelta
+from mongoengine import get_db
+from mongoengine.queryset.visitor import Q
+from pymongo import ReturnDocument
+from .base_repository import BaseRepository
+from database.models.generation_job_model import GenerationJob
+from bson import ObjectId
+
+
+# 公平调度集合中的虚拟时钟文档
+CLOCK_ID = 'clock'
+
+
+class GenerationJobRepository(BaseRepository):
+    """
+    生成任务数据访问层（任务队列持久化在MongoDB中，进程重启后不会丢失）
+
+    任务按加权公平队列（WFQ）调度：每个（优先级, 所有者）是一个流，入队时按
+    cost / (优先级权重 * 所有者权重) 计算虚拟完成时间，领取时取虚拟完成时间最小的任务。
+    提交大量任务的所有者只会排在自己的任务后面，不会饿死其他用户；interactive任务
+    按权重比例优先于bulk任务，但bulk任务仍会持续得到执行。
+    """
+
+    def __init__(self, fair_share_collection: str = 'job_fair_share'):
+        super().__init__(GenerationJob)
+        self.fair_share_collection = fair_share_collection
+
+    def enqueue(self, character_id: str, payload: dict = None, job_type: str = 'generate_character',
+                max_attempts: int = 3, priority: str = 'interactive', owner: str = None,
+                cost: float = 1.0, weight: float = 1.0, deadline_seconds: float = None,
+                batch_id: str = None, batch_index: int = None) -> GenerationJob:
+        """
+        创建排队中的任务
+
+        Args:
+            priority: 优先级（interactive/bulk）
+            owner: 所有者（用户ID或客户端地址），同一所有者的任务共享一份配额
+            cost: 任务的预计开销（外部API调用次数）
+            weight: 该流的权重（优先级权重 * 所有者权重）
+            deadline_seconds: 任务截止时间（从现在起的秒数，包括排队时间），为空时不设置
+            batch_id: 所属批量生成的ID（可选）
+            batch_index: 在批量请求中的位置
+        """
+        owner = owner or 'anonymous'
+        virtual_start, virtual_finish = self._assign_virtual_time(f'{priority}:{owner}', cost / max(weight, 1e-6))
+        return self.create(
+            job_type=job_type,
+            character_id=ObjectId(str(character_id)),
+            payload=payload or {},
+            max_attempts=max_attempts,
+            priority=priority,
+            owner=owner,
+            cost=cost,
+            virtual_start=virtual_start,
+            virtual_finish=virtual_finish,
+            deadline_at=datetime.utcnow() + timedelta(seconds=deadline_seconds) if deadline_seconds else None,
+            batch_id=batch_id,
+            batch_index=batch_index
+        )
+
+    def _assign_virtual_time(self, flow: str, length: float) -> tuple:
+        """
+        为流的新任务分配虚拟开始/完成时间：开始 = max(该流上一个任务的完成时间, 当前虚拟时钟)
+
+        在数据库中原子更新，多个Web进程同时入队时同一个流的任务不会得到相同的时间。
+        """
+        collection = get_db()[self.fair_share_collection]
+        clock = collection.find_one({'_id': CLOCK_ID}) or {}
+        virtual_time = clock.get('vt', 0.0)
+        flow_state = collection.find_one_and_update(
+            {'_id': f'flow:{flow}'},
+            [
+                {'$set': {'start': {'$max': [{'$ifNull': ['$last_finish', 0.0]}, virtual_time]}}},
+                {'$set': {'last_finish': {'$add': ['$start', length]}, 'updated_at': '$$NOW'}}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return flow_state['start'], flow_state['last_finish']
+
+    def claim_next(self, worker_id: str, lease_seconds: float) -> Optional[GenerationJob]:
+        """
+        原子地领取下一个任务（虚拟完成时间最小的任务，相同时按创建时间）
+
+        可领取的任务：排队中的任务，或租约已过期的运行中任务（所属worker已崩溃或重启）。
+        领取时attempts加1，并设置新的租约，虚拟时钟前进到该任务的虚拟开始时间。
+        """
+        now = datetime.utcnow()
+        claimable = Q(status='queued') | Q(status='running', lease_expires_at__lt=now)
+        job = self.model.objects(claimable).order_by('virtual_finish', 'created_at').modify(
+            new=True,
+            set__status='running',
+            set__lease_owner=worker_id,
+            set__lease_expires_at=now + timedelta(seconds=lease_seconds),
+            set__started_at=now,
+            set__updated_at=now,
+            inc__attempts=1
+        )
+        if job is not None:
+            # 空闲一段时间的流重新入队时从当前虚拟时钟开始，不能用攒下的额度插队
+            get_db()[self.fair_share_collection].update_one(
+                {'_id': CLOCK_ID}, {'$max': {'vt': job.virtual_start or 0.0}}, upsert=True
+            )
+        return job
+
+    def renew_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """续约（仅当任务仍由该worker持有时），返回是否成功"""
+        now = datetime.utcnow()
+        updated = self.model.objects(id=ObjectId(str(job_id)), status='running', lease_owner=worker_id).update(
+            set__lease_expires_at=now + timedelta(seconds=lease_seconds),
+            set__updated_at=now
+        )
+        return updated > 0
+
+    def mark_succeeded(self, job_id: str, worker_id: str) -> bool:
+        """标记任务成功"""
+        return self._finish(job_id, worker_id, 'succeeded')
+
+    def mark_failed(self, job_id: str, worker_id: str, error: str) -> bool:
+        """标记任务失败"""
+        return self._finish(job_id, worker_id, 'failed', error)
+
+    def mark_cancelled(self, job_id: str, worker_id: str) -> bool:
+        """标记运行中的任务已取消"""
+        return self._finish(job_id, worker_id, 'cancelled', 'Cancelled')
+
+    def request_cancel(self, job_id: str) -> Optional[GenerationJob]:
+        """
+        取消任务：排队中的任务直接标记为cancelled，运行中的任务设置cancel_requested，
+        由持有租约的worker停止生成
+
+        Returns:
+            更新后的任务（任务已结束或不存在时返回None）
+        """
+        now = datetime.utcnow()
+        job = self.model.objects(id=ObjectId(str(job_id)), status='queued').modify(
+            new=True,
+            set__status='cancelled',
+            set__error='Cancelled',
+            set__finished_at=now,
+            set__updated_at=now
+        )
+        if job is not None:
+            return job
+        return self.model.objects(id=ObjectId(str(job_id)), status='running').modify(
+            new=True,
+            set__cancel_requested=True,
+            set__updated_at=now
+        )
+
+    def get_cancel_requested(self, job_ids: List[str]) -> List[str]:
+        """在给定的运行中任务里，返回已请求取消的任务ID"""
+        if not job_ids:
+            return []
+        jobs = self.model.objects(
+            id__in=[ObjectId(str(job_id)) for job_id in job_ids], status='running', cancel_requested=True
+        ).only('id')
+        return [str(job.id) for job in jobs]
+
+    def _finish(self, job_id: str, worker_id: str, status: str, error: str = None) -> bool:
+        """结束任务并释放租约（租约已被其他worker接管时不修改）"""
+        now = datetime.utcnow()
+        updated = self.model.objects(id=ObjectId(str(job_id)), status='running', lease_owner=worker_id).update(
+            set__status=status,
+            set__error=error,
+            set__lease_owner=None,
+            set__lease_expires_at=None,
+            set__finished_at=now,
+            set__updated_at=now
+        )
+        return updated > 0
+
+    def get_by_character_id(self, character_id: str) -> List[GenerationJob]:
+        """获取角色的所有任务（最新的在前）"""
+        return list(self.model.objects(character_id=ObjectId(str(character_id))).order_by('-created_at'))
+
+    def get_active_by_character_id(self, character_id: str) -> Optional[GenerationJob]:
+        """获取角色排队中或运行中的任务（没有则返回None）"""
+        return self.model.objects(
+            character_id=ObjectId(str(character_id)), status__in=['queued', 'running']
+        ).order_by('-created_at').first()
+
+    def get_by_batch_id(self, batch_id: str) -> List[GenerationJob]:
+        """获取批量生成的所有任务（按请求中的顺序）"""
+        return list(self.model.objects(batch_id=batch_id).order_by('batch_index'))
+
+    def count_by_status(self) -> dict:
+        """按状态统计任务数量"""
+        return {status: self.count(status=status) for status in ('queued', 'running', 'succeeded', 'failed', 'cancelled')}
+
+    def queue_metrics(self, window_seconds: float = 900, top_owners: int = 10) -> Dict:
+        """
+        队列指标：每个优先级的排队数、运行数、最早排队任务的等待时长，
+        以及最近window_seconds内开始执行的任务的等待时间（created_at到started_at，平均值/p95/最大值）；
+        另外返回排队任务最多的所有者
+        """
+        now = datetime.utcnow()
+        since = now - timedelta(seconds=window_seconds)
+        priorities = {}
+        for priority in ('interactive', 'bulk'):
+            oldest = self.model.objects(status='queued', priority=priority).order_by('created_at').only('created_at').first()
+            waits = sorted(
+                (job.started_at - job.created_at).total_seconds()
+                for job in self.model.objects(priority=priority, started_at__gte=since).only('created_at', 'started_at')
+            )
+            priorities[priority] = {
+                'queued': self.count(status='queued', priority=priority),
+                'running': self.count(status='running', priority=priority),
+                'oldest_queued_seconds': round((now - oldest.created_at).total_seconds(), 3) if oldest else 0.0,
+                'started_in_window': len(waits),
+                'wait_seconds': {
+                    'avg': round(sum(waits) / len(waits), 3),
+                    'p95': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3),
+                    'max': round(waits[-1], 3)
+                } if waits else None
+            }
+
+        owners = self.model._get_collection().aggregate([
+            {'$match': {'status': 'queued'}},
+            {'$group': {'_id': '$owner', 'queued': {'$sum': 1}}},
+            {'$sort': {'queued': -1}},
+            {'$limit': top_owners}
+        ])
+        return {
+            'window_seconds': window_seconds,
+            'priorities': priorities,
+            'queued_by_owner': {document['_id'] or 'anonymous': document['queued'] for document in owners}
+        }
@@ -0,0 +1,169 @@
+"""
+Circuit Breaker
+Fails fast on external endpoints that are currently failing
+
+Each endpoint (pixflux, rotate, animate-with-text, animate-with-skeleton,
+hf-router) has its own breaker:
+
+- closed: calls pass through, outcomes are recorded in a sliding window.
+  When the window holds at least `minimum_calls` outcomes and the failure
+  rate reaches `failure_rate_threshold`, the breaker opens.
+- open: calls fail immediately with CircuitOpenError until `open_seconds`
+  have passed, then the breaker moves to half-open.
+- half-open: up to `half_open_max_calls` probe calls are let through. A
+  successful probe closes the breaker, a failed probe opens it again.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict
+from config import config
+from utils.logger import setup_logger
+from utils.exceptions import CircuitOpenError
+
+logger = setup_logger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Failure-rate based circuit breaker for a single endpoint"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = None,
+        minimum_calls: int = None,
+        window_size: int = None,
+        open_seconds: float = None,
+        half_open_max_calls: int = None
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold or config.CIRCUIT_FAILURE_RATE
+        self.minimum_calls = minimum_calls or config.CIRCUIT_MIN_CALLS
+        self.open_seconds = open_seconds or config.CIRCUIT_OPEN_SECONDS
+        self.half_open_max_calls = half_open_max_calls or config.CIRCUIT_HALF_OPEN_CALLS
+
+        self._outcomes = deque(maxlen=window_size or config.CIRCUIT_WINDOW_SIZE)  # True = failure
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state (an expired open state is reported as half-open)"""
+        with self._lock:
+            if self._state == OPEN and self._open_remaining() <= 0:
+                return HALF_OPEN
+            return self._state
+
+    def _open_remaining(self) -> float:
+        return self.open_seconds - (time.monotonic() - self._opened_at)
+
+    def _transition(self, state: str):
+        if state != self._state:
+            logger.warning(f"Circuit breaker {self.name}: {self._state} -> {state}")
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._half_open_calls = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+
+    def before_call(self):
+        """
+        Check whether a call may proceed
+
+        Raises:
+            CircuitOpenError: Breaker is open (or half-open with all probe slots taken)
+        """
+        with self._lock:
+            if self._state == OPEN:
+                remaining = self._open_remaining()
+                if remaining > 0:
+                    raise CircuitOpenError(self.name, retry_after=remaining)
+                self._transition(HALF_OPEN)
+
+            if self._state == HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    raise CircuitOpenError(self.name, retry_after=self.open_seconds)
+                self._half_open_calls += 1
+
+    def release(self):
+        """Give back a half-open probe slot for a call that was never sent"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_success(self):
+        """Record a successful call"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+            elif self._state == CLOSED:
+                self._outcomes.append(False)
+
+    def record_failure(self):
+        """Record a failed call (connection error, timeout or 5xx)"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            if self._state != CLOSED:
+                return
+
+            self._outcomes.append(True)
+            if len(self._outcomes) >= self.minimum_calls:
+                failure_rate = sum(self._outcomes) / len(self._outcomes)
+                if failure_rate >= self.failure_rate_threshold:
+                    logger.error(f"Circuit breaker {self.name} opening: failure rate {failure_rate:.0%} over last {len(self._outcomes)} calls")
+                    self._transition(OPEN)
+
+    def snapshot(self) -> dict:
+        """Current state and window statistics (for health checks)"""
+        state = self.state
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(self._outcomes)
+        return {
+            'state': state,
+            'window_calls': calls,
+            'failure_rate': failures / calls if calls else 0.0
+        }
+
+
+class _DisabledCircuitBreaker(CircuitBreaker):
+    """Breaker that never opens (CIRCUIT_BREAKER_ENABLED=False)"""
+
+    def before_call(self):
+        pass
+
+    def record_failure(self):
+        pass
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """Get the process-wide breaker for an endpoint"""
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(endpoint)
+            if breaker is None:
+                breaker_class = CircuitBreaker if config.CIRCUIT_BREAKER_ENABLED else _DisabledCircuitBreaker
+                breaker = _breakers[endpoint] = breaker_class(endpoint)
+    return breaker
+
+
+def get_circuit_states() -> Dict[str, dict]:
+    """Snapshot of every breaker created so far"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,449 @@
+"""
+Async PixelLab API Client
+asyncio-native counterpart of PixelLabClient with bounded concurrency
+"""
+import asyncio
+import inspect
+import json
+import time
+from typing import Any, Awaitable, Callable, Optional, Union
+import aiohttp
+from config import config
+from integrations.clients.reference_image import ReferenceImage
+from integrations.clients.frame_stream import FrameStreamDecoder, STREAM_CHUNK_SIZE
+from integrations.clients.pixellab_payloads import (
+    ENDPOINT_PATHS, RETRYABLE_STATUS_CODES, PIXFLUX_ENDPOINT, ROTATE_ENDPOINT,
+    ANIMATE_WITH_TEXT_ENDPOINT, ANIMATE_WITH_SKELETON_ENDPOINT,
+    build_pixflux_payload, build_rotate_payload, build_animate_text_payload,
+    build_animate_skeleton_payload, parse_image
+)
+from integrations.rate_limiter import get_rate_limiter
+from integrations.circuit_breaker import get_circuit_breaker
+from integrations.concurrency_limiter import get_concurrency_limiter
+from integrations.single_flight import single_flight
+from integrations.retry import Deadline, RetryPolicy, parse_retry_after
+from integrations.response_cache import get_response_cache, normalize_pixflux_request, cache_key
+from utils.logger import setup_logger
+from utils.exceptions import (
+    APIError, RateLimitError, ServiceUnavailableError, APITimeoutError,
+    APIConnectionError, DeadlineExceededError
+)
+
+logger = setup_logger(__name__)
+
+
+class AsyncPixelLabClient:
+    """
+    Async PixelLab API Client
+
+    Exposes the same operations as PixelLabClient as coroutines. In-flight
+    requests are limited by a semaphore, so callers can schedule many
+    operations with asyncio.gather without overloading the API.
+
+    An instance is bound to the event loop it is first used in. Use it as an
+    async context manager, or call close() when done:
+
+        async with AsyncPixelLabClient() as client:
+            images = await asyncio.gather(*[client.rotate_image(...) for ...])
+    """
+
+    def __init__(self, max_concurrency: int = None):
+        self.api_key = config.PIXELLAB_API_KEY
+        self.api_base = config.PIXELLAB_BASE_URL
+        self.max_concurrency = max_concurrency or config.PIXELLAB_MAX_CONCURRENCY
+        self.retry_policy = RetryPolicy()
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        if not self.api_key:
+            logger.warning("PixelLab API key not configured")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the pooled session inside the running event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=config.HTTP_POOL_MAXSIZE,
+                force_close=not config.HTTP_KEEP_ALIVE
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                }
+            )
+        return self._session
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Lazily create the concurrency semaphore inside the running event loop"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _post(
+        self,
+        endpoint: str,
+        data: dict,
+        read_timeout: float,
+        api_name: str,
+        deadline: Optional[Deadline] = None
+    ) -> dict:
+        """
+        Send a POST request and return the parsed JSON body
+
+        Fails fast while the endpoint's circuit breaker is open, then waits for
+        the endpoint's rate limit budget before taking a concurrency slot.
+        Retryable failures (429, 5xx, timeouts, connection errors) are retried
+        by the client's RetryPolicy within the optional deadline.
+
+        Args:
+            endpoint: Endpoint name (see pixellab_payloads.ENDPOINT_PATHS)
+            data: JSON request body
+            read_timeout: Read timeout in seconds
+            api_name: API name used in error messages
+            deadline: Overall time budget for all attempts (optional)
+
+        Returns:
+            Parsed response JSON
+
+        Raises:
+            CircuitOpenError: Endpoint circuit breaker is open
+            DeadlineExceededError: Time budget ran out
+            APIError: API call failed
+        """
+        async def read_json(response: aiohttp.ClientResponse) -> dict:
+            text = await response.text()
+            try:
+                return json.loads(text)
+            except ValueError as e:
+                logger.error(f"Failed to parse {api_name} response JSON: {str(e)}")
+                raise APIError(f"{api_name} returned invalid JSON: {str(e)}. Response: {text[:200] if text else 'Empty'}")
+
+        return await self._request(endpoint, data, read_timeout, api_name, read_json, deadline)
+
+    async def _post_frames(
+        self,
+        endpoint: str,
+        data: dict,
+        read_timeout: float,
+        api_name: str,
+        frame_sink: Optional[Callable[[int, bytes], Any]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> list:
+        """
+        Send an animation request and decode frames while the body downloads
+
+        Each frame is passed to frame_sink(index, frame_bytes) as soon as it is
+        complete (the sink may be a coroutine function). Without a sink the
+        frames are collected in a list.
+
+        Returns:
+            Frame binary data, or the sink's return values when frame_sink is given
+
+        Raises:
+            CircuitOpenError: Endpoint circuit breaker is open
+            APIError: API call failed or response had no frames
+        """
+        async def read_frames(response: aiohttp.ClientResponse) -> list:
+            decoder = FrameStreamDecoder()
+            results = []
+
+            async def emit(frames: list):
+                for frame in frames:
+                    if frame_sink is None:
+                        results.append(frame)
+                        continue
+                    result = frame_sink(len(results), frame)
+                    if inspect.isawaitable(result):
+                        result = await result
+                    results.append(result)
+
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                await emit(decoder.feed(chunk))
+            await emit(decoder.close())
+            return results
+
+        return await self._request(endpoint, data, read_timeout, api_name, read_frames, deadline)
+
+    async def _request(
+        self,
+        endpoint: str,
+        data: dict,
+        read_timeout: float,
+        api_name: str,
+        read_body: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+        deadline: Optional[Deadline] = None
+    ) -> Any:
+        """Shared request pipeline with retries, read_body consumes successful (200) responses"""
+        if not self.api_key:
+            raise APIError("PixelLab API key not configured")
+
+        return await self.retry_policy.call_async(
+            lambda: self._attempt(endpoint, data, read_timeout, api_name, read_body, deadline),
+            deadline=deadline,
+            description=api_name
+        )
+
+    async def _attempt(
+        self,
+        endpoint: str,
+        data: dict,
+        read_timeout: float,
+        api_name: str,
+        read_body: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+        deadline: Optional[Deadline]
+    ) -> Any:
+        """
+        Single attempt of _request(), retryable failures raise RetryableAPIError subclasses
+
+        Every call admitted by the circuit breaker ends in exactly one of
+        record_success(), record_failure() or release() (the call was never
+        answered, e.g. the task was cancelled while waiting), so a half-open
+        probe slot is never leaked.
+        """
+        breaker = get_circuit_breaker(endpoint)
+        breaker.before_call()
+        recorded = False
+        try:
+            limiter = get_concurrency_limiter(endpoint)
+            if not await limiter.acquire_async(
+                timeout=deadline.remaining() if deadline else None,
+                cancellation=deadline.cancellation if deadline else None
+            ):
+                if deadline:
+                    deadline.check_cancelled(f"{api_name} request")
+                raise DeadlineExceededError(f"{api_name} time budget exhausted while waiting for a concurrency slot")
+            # The slot is held from here on, every exit path (including cancellation) frees it
+            started = None
+            status = None
+            timed_out = False
+            try:
+                if not await get_rate_limiter().acquire_async(
+                    endpoint,
+                    timeout=deadline.remaining() if deadline else None,
+                    cancellation=deadline.cancellation if deadline else None
+                ):
+                    if deadline:
+                        deadline.check_cancelled(f"{api_name} request")
+                    raise DeadlineExceededError(f"{api_name} time budget exhausted while waiting for rate limit")
+
+                if deadline:
+                    read_timeout = deadline.cap(read_timeout)
+                timeout = aiohttp.ClientTimeout(sock_connect=config.HTTP_CONNECT_TIMEOUT, sock_read=read_timeout)
+
+                async with self._get_semaphore():
+                    started = time.monotonic()
+                    try:
+                        async with self._get_session().post(f"{self.api_base}{ENDPOINT_PATHS[endpoint]}", json=data, timeout=timeout) as response:
+                            status = response.status
+                            if response.status == 200:
+                                # Success is only recorded once the body has been read
+                                try:
+                                    body = await read_body(response)
+                                except (asyncio.TimeoutError, aiohttp.ClientError):
+                                    raise
+                                except Exception:
+                                    # The endpoint answered, but the body was unusable
+                                    breaker.record_success()
+                                    recorded = True
+                                    raise
+                                breaker.record_success()
+                                recorded = True
+                                return body
+
+                            if response.status >= 500:
+                                breaker.record_failure()
+                            else:
+                                breaker.record_success()
+                            recorded = True
+
+                            text = await response.text()
+                            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                            if response.status == 429:
+                                logger.warning(f"{api_name} rate limit exceeded: {text[:200]}")
+                                raise RateLimitError(f"Rate limit exceeded. Please wait a moment and try again. {text[:200]}", retry_after=retry_after)
+                            elif response.status in RETRYABLE_STATUS_CODES:
+                                logger.warning(f"{api_name} unavailable (status {response.status}): {text[:200]}")
+                                raise ServiceUnavailableError(f"{api_name} unavailable (status {response.status}): {text[:200]}", retry_after=retry_after)
+                            else:
+                                error_msg = text[:500] if text else f"HTTP {response.status}"
+                                logger.error(f"{api_name} error (status {response.status}): {error_msg}")
+                                raise APIError(f"{api_name} error (status {response.status}): {error_msg}")
+
+                    except asyncio.TimeoutError:
+                        timed_out = True
+                        if not recorded:
+                            breaker.record_failure()
+                            recorded = True
+                        logger.error(f"{api_name} timeout after {read_timeout:.0f} seconds")
+                        raise APITimeoutError(f"{api_name} timeout: Request took longer than {read_timeout:.0f} seconds")
+                    except aiohttp.ClientError as e:
+                        if not recorded:
+                            breaker.record_failure()
+                            recorded = True
+                        logger.error(f"{api_name} request failed: {str(e)}")
+                        raise APIConnectionError(f"{api_name} request failed: {str(e)}")
+            finally:
+                limiter.release(started, status, timed_out)
+        except BaseException:
+            if not recorded:
+                breaker.release()
+            raise
+
+    @single_flight(PIXFLUX_ENDPOINT)
+    async def generate_pixel_art(
+        self,
+        description: str,
+        image_width: int = 128,
+        image_length: int = 128,
+        detail: str = "medium detail",
+        direction: Optional[str] = None,
+        no_background: bool = False,
+        use_cache: Optional[bool] = None,
+        variant: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> bytes:
+        """
+        Generate pixel art image (see PixelLabClient.generate_pixel_art)
+
+        Returns:
+            Image binary data
+
+        Raises:
+            APIError: API call failed
+        """
+        if use_cache is None:
+            use_cache = config.PIXELLAB_CACHE_ENABLED
+
+        key = None
+        if use_cache:
+            key = cache_key(PIXFLUX_ENDPOINT, normalize_pixflux_request(
+                description, image_width, image_length, detail, direction, no_background, variant
+            ))
+            cached = await asyncio.to_thread(get_response_cache().get, key)
+            if cached is not None:
+                logger.info(f"Pixel art served from cache: {description[:50]}... (size: {len(cached)} bytes)")
+                return cached
+
+        data = build_pixflux_payload(description, image_width, image_length, detail, direction, no_background)
+        resp_json = await self._post(PIXFLUX_ENDPOINT, data, config.PIXELLAB_READ_TIMEOUT, "PixelLab API", deadline)
+
+        img_bytes = parse_image(resp_json)
+        logger.info(f"Successfully generated pixel art: {description[:50]}... (size: {len(img_bytes)} bytes)")
+        if key:
+            await asyncio.to_thread(get_response_cache().set, key, img_bytes)
+        return img_bytes
+
+    @single_flight(ROTATE_ENDPOINT)
+    async def rotate_image(
+        self,
+        from_image_bytes: Union[bytes, ReferenceImage],
+        from_direction: str = "south",
+        to_direction: str = "north",
+        image_size: dict = None,
+        from_view: str = "side",
+        to_view: str = "side",
+        image_guidance_scale: float = 3.0,
+        deadline: Optional[Deadline] = None
+    ) -> bytes:
+        """
+        Rotate character image to specified direction (see PixelLabClient.rotate_image)
+
+        Returns:
+            Rotated image binary data
+
+        Raises:
+            APIError: API call failed
+        """
+        data = build_rotate_payload(
+            from_image_bytes, from_direction, to_direction, image_size,
+            from_view, to_view, image_guidance_scale
+        )
+        resp_json = await self._post(ROTATE_ENDPOINT, data, config.PIXELLAB_ROTATE_READ_TIMEOUT, "PixelLab Rotate API", deadline)
+
+        img_bytes = parse_image(resp_json)
+        logger.info(f"Successfully rotated image from {from_direction} to {to_direction}")
+        return img_bytes
+
+    @single_flight(ANIMATE_WITH_TEXT_ENDPOINT, bypass_if_set=('frame_sink',))
+    async def animate_with_text(
+        self,
+        reference_image_bytes: Union[bytes, ReferenceImage],
+        description: str,
+        action: str,
+        direction: str,
+        image_size: dict = None,
+        view: str = "side",
+        n_frames: int = 4,
+        image_guidance_scale: float = 5.0,
+        init_image_strength: float = 300.0,
+        frame_sink: Optional[Callable[[int, bytes], Any]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> list:
+        """
+        Generate animation frames using text description (see PixelLabClient.animate_with_text)
+
+        Returns:
+            List of animation frame binary data [bytes, bytes, ...], or the
+            frame_sink return values when a sink is given
+
+        Raises:
+            APIError: API call failed
+        """
+        data = build_animate_text_payload(
+            reference_image_bytes, description, action, direction, image_size,
+            view, n_frames, image_guidance_scale, init_image_strength
+        )
+        frames = await self._post_frames(
+            ANIMATE_WITH_TEXT_ENDPOINT, data, config.PIXELLAB_ANIMATE_READ_TIMEOUT, "PixelLab Animate API", frame_sink, deadline
+        )
+        logger.info(f"Successfully generated {len(frames)} animation frames for {action} - {direction}")
+        return frames
+
+    @single_flight(ANIMATE_WITH_SKELETON_ENDPOINT, bypass_if_set=('frame_sink',))
+    async def animate_with_skeleton(
+        self,
+        reference_image_bytes: Union[bytes, ReferenceImage],
+        direction: str,
+        image_size: dict = None,
+        view: str = "side",
+        skeleton_keypoints: list = None,
+        guidance_scale: float = 6.0,
+        init_image_strength: float = 350.0,
+        inpainting_images: list = None,
+        mask_images: list = None,
+        frame_sink: Optional[Callable[[int, bytes], Any]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> list:
+        """
+        Generate animation frames using skeleton keypoints (see PixelLabClient.animate_with_skeleton)
+
+        Returns:
+            List of animation frame binary data [bytes, bytes, ...], or the
+            frame_sink return values when a sink is given
+
+        Raises:
+            APIError: API call failed
+        """
+        data = build_animate_skeleton_payload(
+            reference_image_bytes, direction, image_size, view, skeleton_keypoints,
+            guidance_scale, init_image_strength, inpainting_images, mask_images
+        )
+        frames = await self._post_frames(
+            ANIMATE_WITH_SKELETON_ENDPOINT, data, config.PIXELLAB_ANIMATE_READ_TIMEOUT, "PixelLab Skeleton Animation API", frame_sink, deadline
+        )
+        logger.info(f"Successfully generated {len(frames)} animation frames using skeleton for {direction}")
+        return frames
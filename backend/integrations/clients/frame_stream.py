@@ -0,0 +1,294 @@
+"""
+Streaming Frame Decoder
+Decodes PixelLab animation responses ({"images": [...]}) one frame at a time
+
+Chunks of the HTTP body are fed in as they arrive. Every complete element of
+the "images" array is decoded and returned straight away, and the text it
+occupied is dropped, so only the frame currently being received is buffered
+instead of the whole JSON document, its parsed form and every decoded frame.
+"""
+import base64
+import codecs
+import json
+import re
+from typing import Iterable, Iterator, List, Optional
+from utils.exceptions import APIError
+
+# Characters that change nesting or string state while scanning a value
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+# End of a scalar value (number, true, false, null)
+_SCALAR_END = re.compile(r'[,}\]\s]')
+
+_WHITESPACE = ' \t\r\n'
+
+# Chunk size used when reading streamed response bodies
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Parser states
+_START = 'start'
+_KEY = 'key'
+_VALUE = 'value'
+_AFTER_VALUE = 'after_value'
+_ELEMENT = 'element'
+_DONE = 'done'
+
+
+class FrameStreamDecoder:
+    """
+    Incremental decoder for {"images": [{"base64": "..."}, ...]} bodies
+
+    Usage:
+        decoder = FrameStreamDecoder()
+        for chunk in response.iter_content(65536):
+            for frame in decoder.feed(chunk):
+                ...
+        decoder.close()
+    """
+
+    def __init__(self):
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0  # Everything before this offset has been consumed
+        self._state = _START
+        self._key = None
+        self._seen_images = False
+        self.frame_count = 0
+
+        # Resumable value scan, so long base64 strings are scanned only once
+        self._scan_pos = None
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """
+        Feed the next body chunk
+
+        Returns:
+            Frames completed by this chunk (possibly empty)
+
+        Raises:
+            APIError: Body is not a valid animation response
+        """
+        text = self._text_decoder.decode(chunk)
+        if self._pos:
+            # Drop consumed text before appending
+            self._buf = self._buf[self._pos:]
+            if self._scan_pos is not None:
+                self._scan_pos -= self._pos
+            self._pos = 0
+        self._buf += text
+        return self._parse(eof=False)
+
+    def close(self) -> List[bytes]:
+        """
+        Signal the end of the body
+
+        Returns:
+            Frames completed by the remaining buffered text
+
+        Raises:
+            APIError: Body ended early or had no images field
+        """
+        self._buf += self._text_decoder.decode(b'', final=True)
+        frames = self._parse(eof=True)
+
+        if self._state != _DONE:
+            raise APIError("PixelLab API response ended before all animation frames were received")
+        if not self._seen_images:
+            raise APIError("PixelLab API returned unexpected format: missing 'images' field")
+        return frames
+
+    def _skip_whitespace(self) -> Optional[str]:
+        """Advance past whitespace, return the next character (None if more data is needed)"""
+        buf = self._buf
+        pos = self._pos
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return buf[pos] if pos < len(buf) else None
+
+    def _read_key(self) -> Optional[str]:
+        """Read '"key" :' at the current position (None if more data is needed)"""
+        end = self._buf.find('"', self._pos + 1)
+        while end != -1 and self._escaped(end):
+            end = self._buf.find('"', end + 1)
+        if end == -1:
+            return None
+
+        colon = end + 1
+        while colon < len(self._buf) and self._buf[colon] in _WHITESPACE:
+            colon += 1
+        if colon >= len(self._buf):
+            return None
+        if self._buf[colon] != ':':
+            raise APIError("PixelLab API returned invalid JSON: expected ':' after object key")
+
+        key = json.loads(self._buf[self._pos:end + 1])
+        self._pos = colon + 1
+        return key
+
+    def _escaped(self, quote_pos: int) -> bool:
+        """Whether the quote at quote_pos is preceded by an odd number of backslashes"""
+        backslashes = 0
+        pos = quote_pos - 1
+        while pos >= 0 and self._buf[pos] == '\\':
+            backslashes += 1
+            pos -= 1
+        return backslashes % 2 == 1
+
+    def _scan_value(self, eof: bool) -> Optional[str]:
+        """
+        Scan the JSON value starting at the current position
+
+        Returns:
+            Raw value text, or None if more data is needed (scan state is kept)
+        """
+        buf = self._buf
+        if self._scan_pos is None:
+            first = buf[self._pos]
+            if first == '"':
+                self._in_string = True
+                self._depth = 0
+            elif first in '{[':
+                self._in_string = False
+                self._depth = 1
+            else:
+                match = _SCALAR_END.search(buf, self._pos)
+                if match is None and not eof:
+                    return None
+                end = match.start() if match else len(buf)
+                return self._take_value(end)
+            self._scan_pos = self._pos + 1
+
+        pos = self._scan_pos
+        while True:
+            if self._in_string:
+                end = buf.find('"', pos)
+                if end == -1:
+                    self._scan_pos = len(buf)
+                    return None
+                pos = end + 1
+                if self._escaped(end):
+                    continue
+                self._in_string = False
+                if self._depth == 0:
+                    return self._take_value(pos)
+            else:
+                match = _STRUCTURAL.search(buf, pos)
+                if match is None:
+                    self._scan_pos = len(buf)
+                    return None
+                char = match.group()
+                pos = match.end()
+                if char == '"':
+                    self._in_string = True
+                elif char in '{[':
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        return self._take_value(pos)
+
+    def _take_value(self, end: int) -> str:
+        raw = self._buf[self._pos:end]
+        self._pos = end
+        self._scan_pos = None
+        return raw
+
+    def _decode_element(self, raw: str) -> Optional[bytes]:
+        """Decode one element of the images array (object with base64 field or bare string)"""
+        if raw.startswith('"'):
+            # Base64 never needs escaping, skip the JSON parser for the common case
+            encoded = raw[1:-1] if '\\' not in raw else json.loads(raw)
+        else:
+            try:
+                element = json.loads(raw)
+            except ValueError as e:
+                raise APIError(f"PixelLab API returned invalid JSON: {str(e)}")
+            if not isinstance(element, dict) or 'base64' not in element:
+                return None
+            encoded = element['base64']
+        return base64.b64decode(encoded)
+
+    def _parse(self, eof: bool) -> List[bytes]:
+        frames = []
+        while self._state != _DONE:
+            char = self._skip_whitespace()
+            if char is None:
+                break
+
+            if self._state == _START:
+                if char != '{':
+                    raise APIError("PixelLab API returned unexpected format: expected a JSON object")
+                self._pos += 1
+                self._state = _KEY
+
+            elif self._state == _KEY:
+                if char == '}':
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                if char != '"':
+                    raise APIError("PixelLab API returned invalid JSON: expected object key")
+                key = self._read_key()
+                if key is None:
+                    break
+                self._key = key
+                self._state = _VALUE
+
+            elif self._state == _VALUE:
+                if self._key == 'images' and self._scan_pos is None:
+                    if char != '[':
+                        raise APIError("PixelLab API returned unexpected format: 'images' is not a list")
+                    self._pos += 1
+                    self._seen_images = True
+                    self._state = _ELEMENT
+                    continue
+                # Other fields are small, skip them
+                if self._scan_value(eof) is None:
+                    break
+                self._state = _AFTER_VALUE
+
+            elif self._state == _AFTER_VALUE:
+                self._pos += 1
+                if char == ',':
+                    self._state = _KEY
+                elif char == '}':
+                    self._state = _DONE
+                else:
+                    raise APIError("PixelLab API returned invalid JSON: expected ',' or '}'")
+
+            elif self._state == _ELEMENT:
+                if self._scan_pos is None:
+                    if char == ',':
+                        self._pos += 1
+                        continue
+                    if char == ']':
+                        self._pos += 1
+                        self._state = _AFTER_VALUE
+                        continue
+                raw = self._scan_value(eof)
+                if raw is None:
+                    break
+                frame = self._decode_element(raw)
+                if frame is not None:
+                    self.frame_count += 1
+                    frames.append(frame)
+
+        return frames
+
+
+def iter_frames(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Decode animation frames from an iterable of body chunks
+
+    Yields:
+        Frame binary data, in response order
+
+    Raises:
+        APIError: Body is not a valid animation response
+    """
+    decoder = FrameStreamDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
@@ -0,0 +1,90 @@
+"""
+Shared HTTP Session
+Process-wide pooled keep-alive session used by the external API clients
+"""
+import os
+import threading
+from typing import Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from config import config
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+def _create_session() -> requests.Session:
+    """Create a session with a mounted connection pool"""
+    session = requests.Session()
+
+    # Retries are handled by the callers, the adapter only manages connections
+    adapter = HTTPAdapter(
+        pool_connections=config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=config.HTTP_POOL_MAXSIZE,
+        pool_block=config.HTTP_POOL_BLOCK,
+        max_retries=0
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    if not config.HTTP_KEEP_ALIVE:
+        session.headers['Connection'] = 'close'
+
+    logger.info(
+        f"Created pooled HTTP session (pool_connections={config.HTTP_POOL_CONNECTIONS}, "
+        f"pool_maxsize={config.HTTP_POOL_MAXSIZE}, keep_alive={config.HTTP_KEEP_ALIVE})"
+    )
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide pooled session
+
+    The session is created lazily and re-created after a fork, so worker
+    processes never share sockets with their parent. Callers must pass
+    headers per request instead of mutating the shared session state.
+
+    Returns:
+        Shared requests.Session
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            _session = _create_session()
+            _session_pid = pid
+        return _session
+
+
+def close_session():
+    """Close the shared session and release pooled connections"""
+    global _session, _session_pid
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            logger.info("Closed pooled HTTP session")
+        _session = None
+        _session_pid = None
+
+
+def build_timeout(read_timeout: float) -> Tuple[float, float]:
+    """
+    Build a (connect, read) timeout tuple
+
+    Args:
+        read_timeout: Read timeout in seconds
+
+    Returns:
+        (connect timeout, read timeout) tuple
+    """
+    return (config.HTTP_CONNECT_TIMEOUT, read_timeout)
@@ -2,13 +2,30 @@
 Meta Llama API Client
 Uses HuggingFace Inference API
 """
+import time
 import requests
+from typing import Optional
 from config import config
+from integrations.clients.http_session import get_session, build_timeout
+from integrations.rate_limiter import get_rate_limiter
+from integrations.circuit_breaker import get_circuit_breaker
+from integrations.concurrency_limiter import get_concurrency_limiter
+from integrations.single_flight import single_flight
+from integrations.retry import Deadline, RetryPolicy, parse_retry_after
 from utils.logger import setup_logger
-from utils.exceptions import APIError
+from utils.exceptions import (
+    APIError, RateLimitError, ServiceUnavailableError,
+    APITimeoutError, APIConnectionError, DeadlineExceededError
+)
 
 logger = setup_logger(__name__)
 
+# Endpoint name, used as key for rate limits and other per-endpoint policies
+HF_ROUTER_ENDPOINT = "hf-router"
+
+# Request timeout (seconds)
+HF_READ_TIMEOUT = 30
+
 
 class MetaLlamaClient:
     """Meta Llama API Client"""
@@ -16,14 +33,113 @@ class MetaLlamaClient:
     def __init__(self):
         self.token = config.META_LLAMA_TOKEN
         # Use HuggingFace Router API endpoint (new version)
-        self.api_url = "https://router.huggingface.co/v1/chat/completions"
+        self.api_url = f"{config.HF_BASE_URL}/chat/completions"
         self.model = "meta-llama/Meta-Llama-3-8B-Instruct"
+        self.retry_policy = RetryPolicy()
         
         if not self.token:
             logger.warning("Meta Llama token not configured - story generation will be disabled")
             self.token = None
     
-    def generate_story(self, prompt: str, max_tokens: int = 150, temperature: float = 0.7) -> str:
+    def _post(self, headers: dict, payload: dict, deadline: Optional[Deadline] = None) -> requests.Response:
+        """
+        Send a chat completion request, retrying 429/5xx/timeouts/connection errors
+        
+        Returns:
+            HTTP response (status 200 or a non-retryable error status)
+        
+        Raises:
+            CircuitOpenError: Endpoint circuit breaker is open
+            RetryableAPIError: Still failing after the last attempt
+            DeadlineExceededError: Time budget ran out
+        """
+        return self.retry_policy.call(
+            lambda: self._send(headers, payload, deadline),
+            deadline=deadline,
+            description="HuggingFace API"
+        )
+    
+    def _send(self, headers: dict, payload: dict, deadline: Optional[Deadline]) -> requests.Response:
+        """Single attempt of _post()"""
+        breaker = get_circuit_breaker(HF_ROUTER_ENDPOINT)
+        breaker.before_call()
+        limiter = get_concurrency_limiter(HF_ROUTER_ENDPOINT)
+        if not limiter.acquire(
+            timeout=deadline.remaining() if deadline else None,
+            cancellation=deadline.cancellation if deadline else None
+        ):
+            breaker.release()
+            if deadline:
+                deadline.check_cancelled("HuggingFace API request")
+            raise DeadlineExceededError("HuggingFace API time budget exhausted while waiting for a concurrency slot")
+        if not get_rate_limiter().acquire(
+            HF_ROUTER_ENDPOINT,
+            timeout=deadline.remaining() if deadline else None,
+            cancellation=deadline.cancellation if deadline else None
+        ):
+            limiter.release()
+            breaker.release()
+            if deadline:
+                deadline.check_cancelled("HuggingFace API request")
+            raise DeadlineExceededError("HuggingFace API time budget exhausted while waiting for rate limit")
+        
+        read_timeout = deadline.cap(HF_READ_TIMEOUT) if deadline else HF_READ_TIMEOUT
+        started = time.monotonic()
+        try:
+            response = get_session().post(
+                self.api_url,
+                headers=headers,
+                json=payload,
+                timeout=build_timeout(read_timeout)
+            )
+        except requests.exceptions.Timeout:
+            limiter.release(started, timed_out=True)
+            breaker.record_failure()
+            logger.error("HuggingFace API request timeout")
+            raise APITimeoutError("HuggingFace API request timeout")
+        except requests.exceptions.ConnectionError as e:
+            limiter.release()
+            breaker.record_failure()
+            logger.error(f"HuggingFace API connection failed: {str(e)}")
+            raise APIConnectionError(f"HuggingFace API connection failed: {str(e)}")
+        except requests.exceptions.RequestException:
+            limiter.release()
+            breaker.record_failure()
+            raise
+        
+        limiter.release(started, response.status_code)
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if response.status_code == 503:
+            # Model is loading, the body may carry an estimated wait time
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            if retry_after is None and isinstance(body, dict) and body.get("estimated_time"):
+                retry_after = float(body["estimated_time"])
+            logger.warning(f"Model is loading: {body.get('error', 'Model is loading') if isinstance(body, dict) else body}")
+            raise ServiceUnavailableError("Model is currently loading. Please try again in a few moments.", retry_after=retry_after)
+        if response.status_code == 429:
+            logger.warning(f"HuggingFace API rate limit exceeded: {response.text[:200]}")
+            raise RateLimitError(f"Rate limit exceeded. Please wait a moment and try again. {response.text[:200]}", retry_after=retry_after)
+        if response.status_code >= 500:
+            logger.warning(f"HuggingFace API unavailable (status {response.status_code}): {response.text[:200]}")
+            raise ServiceUnavailableError(f"HuggingFace API unavailable (status {response.status_code}): {response.text[:200]}", retry_after=retry_after)
+        return response
+    
+    @single_flight(HF_ROUTER_ENDPOINT)
+    def generate_story(
+        self,
+        prompt: str,
+        max_tokens: int = 150,
+        temperature: float = 0.7,
+        deadline: Optional[Deadline] = None
+    ) -> str:
         """
         Generate story
         
@@ -31,6 +147,7 @@ class MetaLlamaClient:
             prompt: Prompt text
             max_tokens: Maximum number of tokens
             temperature: Temperature parameter (controls creativity)
+            deadline: Overall time budget including retries (optional)
         
         Returns:
             Generated story text
@@ -71,12 +188,7 @@ Write a creative and engaging backstory:"""
                 "temperature": temperature
             }
             
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+            response = self._post(headers, payload, deadline)
             
             if response.status_code == 200:
                 result = response.json()
@@ -90,16 +202,13 @@ Write a creative and engaging backstory:"""
                         raise APIError("Empty response from HuggingFace API")
                 else:
                     raise APIError(f"Unexpected response format: {result}")
-            elif response.status_code == 503:
-                # Model is loading, need to wait
-                error_msg = response.json().get("error", "Model is loading")
-                logger.warning(f"Model is loading: {error_msg}")
-                raise APIError(f"Model is currently loading. Please try again in a few moments.")
             else:
                 error_msg = response.json() if response.content else response.text
                 logger.error(f"HuggingFace API error (status {response.status_code}): {error_msg}")
                 raise APIError(f"HuggingFace API error (status {response.status_code}): {error_msg}")
         
+        except APIError:
+            raise
         except requests.exceptions.Timeout:
             logger.error("HuggingFace API request timeout")
             raise APIError("HuggingFace API request timeout")
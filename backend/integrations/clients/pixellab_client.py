@@ -2,11 +2,31 @@
 PixelLab API Client
 """
 import base64
+import time
 import requests
-from typing import Optional
+from typing import Any, Callable, Optional, Union
 from config import config
+from integrations.clients.http_session import get_session, build_timeout
+from integrations.rate_limiter import get_rate_limiter
+from integrations.circuit_breaker import get_circuit_breaker
+from integrations.concurrency_limiter import get_concurrency_limiter
+from integrations.single_flight import single_flight
+from integrations.hedging import hedged
+from integrations.retry import Deadline, RetryPolicy, parse_retry_after
+from integrations.response_cache import get_response_cache, normalize_pixflux_request, cache_key
+from integrations.clients.reference_image import ReferenceImage
+from integrations.clients.frame_stream import iter_frames, STREAM_CHUNK_SIZE
+from integrations.clients.pixellab_payloads import (
+    ENDPOINT_PATHS, API_NAMES, RETRYABLE_STATUS_CODES, PIXFLUX_ENDPOINT, ROTATE_ENDPOINT,
+    ANIMATE_WITH_TEXT_ENDPOINT, ANIMATE_WITH_SKELETON_ENDPOINT,
+    build_pixflux_payload, build_rotate_payload, build_animate_text_payload,
+    build_animate_skeleton_payload
+)
 from utils.logger import setup_logger
-from utils.exceptions import APIError
+from utils.exceptions import (
+    APIError, RateLimitError, ServiceUnavailableError, APITimeoutError,
+    APIConnectionError, DeadlineExceededError
+)
 
 logger = setup_logger(__name__)
 
@@ -16,11 +36,179 @@ class PixelLabClient:
     
     def __init__(self):
         self.api_key = config.PIXELLAB_API_KEY
-        self.base_url = "https://api.pixellab.ai/v1/generate-image-pixflux"
+        self.api_base = config.PIXELLAB_BASE_URL
+        self.retry_policy = RetryPolicy()
         
         if not self.api_key:
             logger.warning("PixelLab API key not configured")
     
+    def _post(
+        self,
+        endpoint: str,
+        data: dict,
+        read_timeout: float,
+        stream: bool = False,
+        deadline: Optional[Deadline] = None
+    ) -> requests.Response:
+        """
+        Send a POST request through the shared pooled session
+        
+        Rate limited (429), unavailable (5xx) and timed out or dropped
+        requests are retried by the client's RetryPolicy, honoring
+        Retry-After and never sleeping past the deadline.
+        
+        Args:
+            endpoint: Endpoint name (see pixellab_payloads.ENDPOINT_PATHS)
+            data: JSON request body
+            read_timeout: Read timeout in seconds
+            stream: Return as soon as headers arrive, the body is read by the caller
+            deadline: Overall time budget for all attempts (optional)
+        
+        Returns:
+            HTTP response (status 200 or a non-retryable error status)
+        
+        Raises:
+            CircuitOpenError: Endpoint circuit breaker is open
+            RetryableAPIError: Still failing after the last attempt
+            DeadlineExceededError: Time budget ran out
+        """
+        return self.retry_policy.call(
+            lambda: self._send(endpoint, data, read_timeout, stream, deadline),
+            deadline=deadline,
+            description=API_NAMES[endpoint]
+        )
+    
+    def _send(
+        self,
+        endpoint: str,
+        data: dict,
+        read_timeout: float,
+        stream: bool,
+        deadline: Optional[Deadline]
+    ) -> requests.Response:
+        """
+        Single attempt of _post()
+        
+        Fails fast while the endpoint's circuit breaker is open, then waits
+        for a slot under the endpoint's adaptive concurrency limit and for its
+        rate limit budget before sending. Connection errors, timeouts and 5xx
+        responses count as breaker failures and are raised as
+        RetryableAPIError subclasses.
+        """
+        api_name = API_NAMES[endpoint]
+        breaker = get_circuit_breaker(endpoint)
+        breaker.before_call()
+        limiter = get_concurrency_limiter(endpoint)
+        if not limiter.acquire(
+            timeout=deadline.remaining() if deadline else None,
+            cancellation=deadline.cancellation if deadline else None
+        ):
+            breaker.release()
+            if deadline:
+                deadline.check_cancelled(f"{api_name} request")
+            raise DeadlineExceededError(f"{api_name} time budget exhausted while waiting for a concurrency slot")
+        if not get_rate_limiter().acquire(
+            endpoint,
+            timeout=deadline.remaining() if deadline else None,
+            cancellation=deadline.cancellation if deadline else None
+        ):
+            limiter.release()
+            breaker.release()
+            if deadline:
+                deadline.check_cancelled(f"{api_name} request")
+            raise DeadlineExceededError(f"{api_name} time budget exhausted while waiting for rate limit")
+        
+        if deadline:
+            read_timeout = deadline.cap(read_timeout)
+        
+        started = time.monotonic()
+        try:
+            response = get_session().post(
+                f"{self.api_base}{ENDPOINT_PATHS[endpoint]}",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json=data,
+                timeout=build_timeout(read_timeout),
+                stream=stream
+            )
+        except requests.exceptions.Timeout as e:
+            limiter.release(started, timed_out=True)
+            breaker.record_failure()
+            logger.error(f"{api_name} request timeout: {str(e)}")
+            raise APITimeoutError(f"{api_name} timeout: Request took longer than {read_timeout:.0f} seconds")
+        except requests.exceptions.ConnectionError as e:
+            limiter.release()
+            breaker.record_failure()
+            logger.error(f"{api_name} connection failed: {str(e)}")
+            raise APIConnectionError(f"{api_name} connection failed: {str(e)}")
+        except Exception:
+            limiter.release()
+            breaker.record_failure()
+            raise
+        
+        limiter.release(started, response.status_code)
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        
+        if response.status_code == 429:
+            detail = response.text[:200]
+            response.close()
+            logger.warning(f"{api_name} rate limit exceeded: {detail}")
+            raise RateLimitError(
+                f"Rate limit exceeded. Please wait a moment and try again. {detail}",
+                retry_after=parse_retry_after(response.headers.get('Retry-After'))
+            )
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            detail = response.text[:200]
+            response.close()
+            logger.warning(f"{api_name} unavailable (status {response.status_code}): {detail}")
+            raise ServiceUnavailableError(
+                f"{api_name} unavailable (status {response.status_code}): {detail}",
+                retry_after=parse_retry_after(response.headers.get('Retry-After'))
+            )
+        return response
+    
+    def _read_frames(
+        self,
+        response: requests.Response,
+        frame_sink: Optional[Callable[[int, bytes], Any]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> list:
+        """
+        Decode animation frames while the response body downloads
+        
+        Each frame is passed to frame_sink(index, frame_bytes) as soon as it is
+        complete, so only one frame is held in memory at a time. Without a
+        sink the frames are collected in a list. Cancelling the deadline closes
+        the response, which aborts the download.
+        
+        Returns:
+            Frame binary data, or the sink's return values when frame_sink is given
+        
+        Raises:
+            APIError: Response is not a valid animation response
+            GenerationCancelledError: Deadline was cancelled during the download
+        """
+        results = []
+        remove_cancel_callback = deadline.on_cancel(response.close) if deadline else None
+        try:
+            for frame in iter_frames(response.iter_content(chunk_size=STREAM_CHUNK_SIZE)):
+                results.append(frame_sink(len(results), frame) if frame_sink else frame)
+        except Exception:
+            if deadline:
+                deadline.check_cancelled("reading animation frames")
+            raise
+        finally:
+            if remove_cancel_callback:
+                remove_cancel_callback()
+            response.close()
+        return results
+    
+    @single_flight(PIXFLUX_ENDPOINT)
     def generate_pixel_art(
         self,
         description: str,
@@ -28,7 +216,10 @@ class PixelLabClient:
         image_length: int = 128,
         detail: str = "medium detail",
         direction: Optional[str] = None,
-        no_background: bool = False
+        no_background: bool = False,
+        use_cache: Optional[bool] = None,
+        variant: Optional[str] = None,
+        deadline: Optional[Deadline] = None
     ) -> bytes:
         """
         Generate pixel art image
@@ -40,6 +231,12 @@ class PixelLabClient:
             detail: Detail level
             direction: Direction (optional)
             no_background: Whether to have no background
+            use_cache: Serve identical requests from the response cache
+                (None uses PIXELLAB_CACHE_ENABLED)
+            variant: Tells apart identical requests that must produce separate
+                images (e.g. animation frames), part of the coalescing and cache
+                key but not sent to the API
+            deadline: Overall time budget including retries (optional)
         
         Returns:
             Image binary data
@@ -50,27 +247,27 @@ class PixelLabClient:
         if not self.api_key:
             raise APIError("PixelLab API key not configured")
         
-        data = {
-            "description": description,
-            "image_size": {"width": image_width, "height": image_length},
-            "detail": detail,
-            "direction": direction,
-            "no_background": no_background,
-        }
+        if use_cache is None:
+            use_cache = config.PIXELLAB_CACHE_ENABLED
+        
+        key = None
+        if use_cache:
+            key = cache_key(PIXFLUX_ENDPOINT, normalize_pixflux_request(
+                description, image_width, image_length, detail, direction, no_background, variant
+            ))
+            cached = get_response_cache().get(key)
+            if cached is not None:
+                logger.info(f"Pixel art served from cache: {description[:50]}... (size: {len(cached)} bytes)")
+                return cached
+        
+        data = build_pixflux_payload(description, image_width, image_length, detail, direction, no_background)
         
         try:
-            logger.info(f"Sending request to PixelLab API: {self.base_url}")
+            logger.info(f"Sending request to PixelLab API: {self.api_base}{ENDPOINT_PATHS[PIXFLUX_ENDPOINT]}")
             logger.debug(f"Request data: image_size={data.get('image_size')}, detail={data.get('detail')}, direction={data.get('direction')}")
             
-            response = requests.post(
-                self.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=data,
-                timeout=180  # Increase timeout to 180 seconds (3 minutes), generation may take longer
-            )
+            # Generation may take several minutes, see PIXELLAB_READ_TIMEOUT
+            response = self._post(PIXFLUX_ENDPOINT, data, config.PIXELLAB_READ_TIMEOUT, deadline=deadline)
             
             logger.info(f"Received response from PixelLab API: status={response.status_code}")
             
@@ -81,6 +278,8 @@ class PixelLabClient:
                         base64_img = resp_json["image"]["base64"]
                         img_bytes = base64.b64decode(base64_img)
                         logger.info(f"Successfully generated pixel art: {description[:50]}... (size: {len(img_bytes)} bytes)")
+                        if key:
+                            get_response_cache().set(key, img_bytes)
                         return img_bytes
                     else:
                         logger.error(f"Unexpected response format: {resp_json}")
@@ -103,34 +302,38 @@ class PixelLabClient:
         
         except requests.exceptions.Timeout as e:
             logger.error(f"PixelLab API request timeout: {str(e)}")
-            logger.error(f"Request took longer than 180 seconds. This may indicate API is slow or overloaded.")
-            raise APIError(f"PixelLab API request timeout: The request took longer than 180 seconds. The API may be slow or overloaded. Please try again later.")
+            logger.error(f"Request took longer than {config.PIXELLAB_READ_TIMEOUT:.0f} seconds. This may indicate API is slow or overloaded.")
+            raise APIError(f"PixelLab API request timeout: The request took longer than {config.PIXELLAB_READ_TIMEOUT:.0f} seconds. The API may be slow or overloaded. Please try again later.")
         except requests.exceptions.RequestException as e:
             logger.error(f"PixelLab API request failed: {str(e)}")
             logger.error(f"Request exception type: {type(e).__name__}")
             raise APIError(f"PixelLab API request failed: {str(e)}")
     
+    @single_flight(ROTATE_ENDPOINT)
+    @hedged(ROTATE_ENDPOINT)
     def rotate_image(
         self,
-        from_image_bytes: bytes,
+        from_image_bytes: Union[bytes, ReferenceImage],
         from_direction: str = "south",
         to_direction: str = "north",
         image_size: dict = None,
         from_view: str = "side",
         to_view: str = "side",
-        image_guidance_scale: float = 3.0
+        image_guidance_scale: float = 3.0,
+        deadline: Optional[Deadline] = None
     ) -> bytes:
         """
         Rotate character image to specified direction
         
         Args:
-            from_image_bytes: Source image binary data
+            from_image_bytes: Source image binary data or ReferenceImage (encoded once, reusable)
             from_direction: Source direction (north, north-east, east, south-east, south, south-west, west, north-west)
             to_direction: Target direction
             image_size: Image size {"width": int, "height": int}
             from_view: Source view (side, low top-down, high top-down)
             to_view: Target view
             image_guidance_scale: Image guidance scale (1-20)
+            deadline: Overall time budget including retries (optional)
         
         Returns:
             Rotated image binary data
@@ -141,35 +344,14 @@ class PixelLabClient:
         if not self.api_key:
             raise APIError("PixelLab API key not configured")
         
-        # Convert image bytes to base64
-        image_base64 = base64.b64encode(from_image_bytes).decode('utf-8')
-        
-        # Build request data
-        data = {
-            "from_image": {
-                "type": "base64",
-                "base64": image_base64
-            },
-            "from_direction": from_direction,
-            "to_direction": to_direction,
-            "from_view": from_view,
-            "to_view": to_view,
-            "image_guidance_scale": image_guidance_scale
-        }
-        
-        if image_size:
-            data["image_size"] = image_size
+        # Build request data (image bytes are sent as base64)
+        data = build_rotate_payload(
+            from_image_bytes, from_direction, to_direction, image_size,
+            from_view, to_view, image_guidance_scale
+        )
         
         try:
-            response = requests.post(
-                "https://api.pixellab.ai/v1/rotate",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=data,
-                timeout=120  # Increase timeout to 120 seconds, rotation may take longer
-            )
+            response = self._post(ROTATE_ENDPOINT, data, config.PIXELLAB_ROTATE_READ_TIMEOUT, deadline=deadline)  # Rotation may take longer
             
             if response.status_code == 200:
                 try:
@@ -201,18 +383,22 @@ class PixelLabClient:
         
         except requests.exceptions.Timeout:
             logger.error(f"PixelLab Rotate API timeout: from {from_direction} to {to_direction}")
-            raise APIError(f"PixelLab Rotate API timeout: Request took longer than 60 seconds")
+            raise APIError(f"PixelLab Rotate API timeout: Request took longer than {config.PIXELLAB_ROTATE_READ_TIMEOUT:.0f} seconds")
         except requests.exceptions.RequestException as e:
             logger.error(f"PixelLab Rotate API request failed: {str(e)}")
             logger.error(f"Request details: from_direction={from_direction}, to_direction={to_direction}")
             raise APIError(f"PixelLab Rotate API request failed: {str(e)}")
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error in rotate_image: {str(e)}", exc_info=True)
             raise APIError(f"Unexpected error in rotate_image: {str(e)}")
     
+    @single_flight(ANIMATE_WITH_TEXT_ENDPOINT, bypass_if_set=('frame_sink',))
+    @hedged(ANIMATE_WITH_TEXT_ENDPOINT, bypass_if_set=('frame_sink',))
     def animate_with_text(
         self,
-        reference_image_bytes: bytes,
+        reference_image_bytes: Union[bytes, ReferenceImage],
         description: str,
         action: str,
         direction: str,
@@ -220,13 +406,15 @@ class PixelLabClient:
         view: str = "side",
         n_frames: int = 4,
         image_guidance_scale: float = 5.0,
-        init_image_strength: float = 300.0
+        init_image_strength: float = 300.0,
+        frame_sink: Optional[Callable[[int, bytes], Any]] = None,
+        deadline: Optional[Deadline] = None
     ) -> list:
         """
         Generate animation frames using text description
         
         Args:
-            reference_image_bytes: Reference image binary data (idle image for this direction)
+            reference_image_bytes: Reference image binary data or ReferenceImage (idle image for this direction)
             description: Character description
             action: Action type (walk, run, jump, attack)
             direction: Direction (north, north-east, east, etc.)
@@ -235,9 +423,12 @@ class PixelLabClient:
             n_frames: Number of animation frames (2-20, default 4, model always generates 4 frames)
             image_guidance_scale: Reference image guidance scale (1-20, default 5.0, higher = closer to reference)
             init_image_strength: Initial image strength (1-999, default 300.0, controls initial image influence)
+            frame_sink: Optional callback(index, frame_bytes) called for each frame as it is decoded
+            deadline: Overall time budget including retries (optional)
         
         Returns:
-            List of animation frame binary data [bytes, bytes, ...]
+            List of animation frame binary data [bytes, bytes, ...], or the
+            frame_sink return values when a sink is given
         
         Raises:
             APIError: API call failed
@@ -245,69 +436,21 @@ class PixelLabClient:
         if not self.api_key:
             raise APIError("PixelLab API key not configured")
         
-        # Convert reference image bytes to base64
-        reference_base64 = base64.b64encode(reference_image_bytes).decode('utf-8')
-        
-        # Build request data
-        data = {
-            "reference_image": {
-                "type": "base64",
-                "base64": reference_base64
-            },
-            "description": description,
-            "action": action,
-            "direction": direction,
-            "view": view,
-            "n_frames": n_frames,
-            "image_guidance_scale": image_guidance_scale,  # Control reference image consistency (1-20)
-            "init_image_strength": init_image_strength  # Control initial image influence strength (1-999)
-        }
-        
-        if image_size:
-            data["image_size"] = image_size
+        # Build request data (reference image is sent as base64)
+        data = build_animate_text_payload(
+            reference_image_bytes, description, action, direction, image_size,
+            view, n_frames, image_guidance_scale, init_image_strength
+        )
         
         try:
-            response = requests.post(
-                "https://api.pixellab.ai/v1/animate-with-text",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=data,
-                timeout=120  # Animation generation may take longer
-            )
+            # Animation generation may take longer, the body is decoded frame by frame
+            response = self._post(ANIMATE_WITH_TEXT_ENDPOINT, data, config.PIXELLAB_ANIMATE_READ_TIMEOUT, stream=True, deadline=deadline)
             
             if response.status_code == 200:
-                try:
-                    resp_json = response.json()
-                    # Return format: {"images": [{"base64": "..."}, ...]}
-                    if "images" in resp_json:
-                        frames = []
-                        for img_data in resp_json["images"]:
-                            if isinstance(img_data, dict) and "base64" in img_data:
-                                img_bytes = base64.b64decode(img_data["base64"])
-                                frames.append(img_bytes)
-                            elif isinstance(img_data, str):
-                                # If directly a base64 string
-                                img_bytes = base64.b64decode(img_data)
-                                frames.append(img_bytes)
-                        logger.info(f"Successfully generated {len(frames)} animation frames for {action} - {direction}")
-                        return frames
-                    else:
-                        raise APIError(f"Unexpected response format: {resp_json}")
-                except (KeyError, ValueError) as e:
-                    logger.error(f"Failed to parse animation response: {str(e)}")
-                    logger.error(f"Response content: {response.text[:500]}")
-                    raise APIError(f"Failed to parse animation API response: {str(e)}")
-            elif response.status_code == 503:
-                error_msg = response.json().get("error", "Model is loading") if response.content else "Model is loading"
-                logger.warning(f"Model is loading: {error_msg}")
-                raise APIError(f"Model is currently loading. Please try again in a few moments.")
-            elif response.status_code == 429:
-                # Rate limit exceeded
-                error_msg = response.json().get("detail", "Rate limit exceeded") if response.content else "Rate limit exceeded"
-                logger.warning(f"Rate limit exceeded: {error_msg}")
-                raise APIError(f"Rate limit exceeded. Please wait a moment and try again. {error_msg}")
+                # Return format: {"images": [{"base64": "..."}, ...]}
+                frames = self._read_frames(response, frame_sink, deadline)
+                logger.info(f"Successfully generated {len(frames)} animation frames for {action} - {direction}")
+                return frames
             else:
                 error_msg = "Unknown error"
                 try:
@@ -324,17 +467,21 @@ class PixelLabClient:
         
         except requests.exceptions.Timeout:
             logger.error(f"PixelLab Animate API timeout: {action} - {direction}")
-            raise APIError(f"PixelLab Animate API timeout: Request took longer than 120 seconds")
+            raise APIError(f"PixelLab Animate API timeout: Request took longer than {config.PIXELLAB_ANIMATE_READ_TIMEOUT:.0f} seconds")
         except requests.exceptions.RequestException as e:
             logger.error(f"PixelLab Animate API request failed: {str(e)}")
             raise APIError(f"PixelLab Animate API request failed: {str(e)}")
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error in animate_with_text: {str(e)}", exc_info=True)
             raise APIError(f"Unexpected error in animate_with_text: {str(e)}")
     
+    @single_flight(ANIMATE_WITH_SKELETON_ENDPOINT, bypass_if_set=('frame_sink',))
+    @hedged(ANIMATE_WITH_SKELETON_ENDPOINT, bypass_if_set=('frame_sink',))
     def animate_with_skeleton(
         self,
-        reference_image_bytes: bytes,
+        reference_image_bytes: Union[bytes, ReferenceImage],
         direction: str,
         image_size: dict = None,
         view: str = "side",
@@ -342,13 +489,15 @@ class PixelLabClient:
         guidance_scale: float = 6.0,
         init_image_strength: float = 350.0,
         inpainting_images: list = None,
-        mask_images: list = None
+        mask_images: list = None,
+        frame_sink: Optional[Callable[[int, bytes], Any]] = None,
+        deadline: Optional[Deadline] = None
     ) -> list:
         """
         Generate animation frames using skeleton keypoints (more precise control)
         
         Args:
-            reference_image_bytes: Reference image binary data
+            reference_image_bytes: Reference image binary data or ReferenceImage
             direction: Direction (north, north-east, east, etc.)
             image_size: Image size {"width": int, "height": int}
             view: View (side, low top-down, high top-down)
@@ -357,9 +506,12 @@ class PixelLabClient:
             init_image_strength: Initial image strength (1-999, default 350.0)
             inpainting_images: Existing animation frames for inpainting (optional)
             mask_images: Mask image list (optional)
+            frame_sink: Optional callback(index, frame_bytes) called for each frame as it is decoded
+            deadline: Overall time budget including retries (optional)
         
         Returns:
-            List of animation frame binary data [bytes, bytes, ...]
+            List of animation frame binary data [bytes, bytes, ...], or the
+            frame_sink return values when a sink is given
         
         Raises:
             APIError: API call failed
@@ -367,64 +519,19 @@ class PixelLabClient:
         if not self.api_key:
             raise APIError("PixelLab API key not configured")
         
-        # Convert reference image bytes to base64
-        reference_base64 = base64.b64encode(reference_image_bytes).decode('utf-8')
-        
-        # Build request data
-        data = {
-            "reference_image": {
-                "type": "base64",
-                "base64": reference_base64
-            },
-            "direction": direction,
-            "view": view,
-            "guidance_scale": guidance_scale,
-            "init_image_strength": init_image_strength
-        }
-        
-        if image_size:
-            data["image_size"] = image_size
-        
-        if skeleton_keypoints:
-            data["skeleton_keypoints"] = skeleton_keypoints
-        
-        if inpainting_images:
-            data["inpainting_images"] = inpainting_images
-        
-        if mask_images:
-            data["mask_images"] = mask_images
+        # Build request data (reference image is sent as base64)
+        data = build_animate_skeleton_payload(
+            reference_image_bytes, direction, image_size, view, skeleton_keypoints,
+            guidance_scale, init_image_strength, inpainting_images, mask_images
+        )
         
         try:
-            response = requests.post(
-                "https://api.pixellab.ai/v1/animate-with-skeleton",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=data,
-                timeout=120
-            )
+            response = self._post(ANIMATE_WITH_SKELETON_ENDPOINT, data, config.PIXELLAB_ANIMATE_READ_TIMEOUT, stream=True, deadline=deadline)
             
             if response.status_code == 200:
-                try:
-                    resp_json = response.json()
-                    if "images" in resp_json:
-                        frames = []
-                        for img_data in resp_json["images"]:
-                            if isinstance(img_data, dict) and "base64" in img_data:
-                                img_bytes = base64.b64decode(img_data["base64"])
-                                frames.append(img_bytes)
-                            elif isinstance(img_data, str):
-                                img_bytes = base64.b64decode(img_data)
-                                frames.append(img_bytes)
-                        logger.info(f"Successfully generated {len(frames)} animation frames using skeleton for {direction}")
-                        return frames
-                    else:
-                        raise APIError(f"Unexpected response format: {resp_json}")
-                except (KeyError, ValueError) as e:
-                    logger.error(f"Failed to parse skeleton animation response: {str(e)}")
-                    logger.error(f"Response content: {response.text[:500]}")
-                    raise APIError(f"Failed to parse skeleton animation API response: {str(e)}")
+                frames = self._read_frames(response, frame_sink, deadline)
+                logger.info(f"Successfully generated {len(frames)} animation frames using skeleton for {direction}")
+                return frames
             else:
                 error_msg = "Unknown error"
                 try:
@@ -441,10 +548,12 @@ class PixelLabClient:
         
         except requests.exceptions.Timeout:
             logger.error(f"PixelLab Skeleton Animation API timeout: {direction}")
-            raise APIError(f"PixelLab Skeleton Animation API timeout: Request took longer than 120 seconds")
+            raise APIError(f"PixelLab Skeleton Animation API timeout: Request took longer than {config.PIXELLAB_ANIMATE_READ_TIMEOUT:.0f} seconds")
         except requests.exceptions.RequestException as e:
             logger.error(f"PixelLab Skeleton Animation API request failed: {str(e)}")
             raise APIError(f"PixelLab Skeleton Animation API request failed: {str(e)}")
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error in animate_with_skeleton: {str(e)}", exc_info=True)
             raise APIError(f"Unexpected error in animate_with_skeleton: {str(e)}")
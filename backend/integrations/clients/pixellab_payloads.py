@@ -0,0 +1,153 @@
+"""
+PixelLab Request/Response Helpers
+Shared by the sync and async PixelLab clients
+"""
+import base64
+from typing import Optional, Union
+from integrations.clients.reference_image import ReferenceImage
+from utils.exceptions import APIError
+
+# Endpoint names, used as keys for rate limits and other per-endpoint policies
+PIXFLUX_ENDPOINT = "pixflux"
+ROTATE_ENDPOINT = "rotate"
+ANIMATE_WITH_TEXT_ENDPOINT = "animate-with-text"
+ANIMATE_WITH_SKELETON_ENDPOINT = "animate-with-skeleton"
+
+# API names used in log and error messages
+API_NAMES = {
+    PIXFLUX_ENDPOINT: "PixelLab API",
+    ROTATE_ENDPOINT: "PixelLab Rotate API",
+    ANIMATE_WITH_TEXT_ENDPOINT: "PixelLab Animate API",
+    ANIMATE_WITH_SKELETON_ENDPOINT: "PixelLab Skeleton Animation API",
+}
+
+# Endpoint paths (relative to config.PIXELLAB_BASE_URL)
+ENDPOINT_PATHS = {
+    PIXFLUX_ENDPOINT: "/generate-image-pixflux",
+    ROTATE_ENDPOINT: "/rotate",
+    ANIMATE_WITH_TEXT_ENDPOINT: "/animate-with-text",
+    ANIMATE_WITH_SKELETON_ENDPOINT: "/animate-with-skeleton",
+}
+
+# Statuses retried as ServiceUnavailableError (429 is retried as RateLimitError)
+RETRYABLE_STATUS_CODES = (500, 502, 503, 504)
+
+
+def build_pixflux_payload(
+    description: str,
+    image_width: int,
+    image_length: int,
+    detail: str,
+    direction: Optional[str],
+    no_background: bool
+) -> dict:
+    """Build request body for generate-image-pixflux"""
+    return {
+        "description": description,
+        "image_size": {"width": image_width, "height": image_length},
+        "detail": detail,
+        "direction": direction,
+        "no_background": no_background,
+    }
+
+
+def build_rotate_payload(
+    from_image_bytes: Union[bytes, ReferenceImage],
+    from_direction: str,
+    to_direction: str,
+    image_size: dict,
+    from_view: str,
+    to_view: str,
+    image_guidance_scale: float
+) -> dict:
+    """Build request body for rotate"""
+    data = {
+        "from_image": ReferenceImage.coerce(from_image_bytes).to_payload(),
+        "from_direction": from_direction,
+        "to_direction": to_direction,
+        "from_view": from_view,
+        "to_view": to_view,
+        "image_guidance_scale": image_guidance_scale
+    }
+
+    if image_size:
+        data["image_size"] = image_size
+
+    return data
+
+
+def build_animate_text_payload(
+    reference_image_bytes: Union[bytes, ReferenceImage],
+    description: str,
+    action: str,
+    direction: str,
+    image_size: dict,
+    view: str,
+    n_frames: int,
+    image_guidance_scale: float,
+    init_image_strength: float
+) -> dict:
+    """Build request body for animate-with-text"""
+    data = {
+        "reference_image": ReferenceImage.coerce(reference_image_bytes).to_payload(),
+        "description": description,
+        "action": action,
+        "direction": direction,
+        "view": view,
+        "n_frames": n_frames,
+        "image_guidance_scale": image_guidance_scale,  # Control reference image consistency (1-20)
+        "init_image_strength": init_image_strength  # Control initial image influence strength (1-999)
+    }
+
+    if image_size:
+        data["image_size"] = image_size
+
+    return data
+
+
+def build_animate_skeleton_payload(
+    reference_image_bytes: Union[bytes, ReferenceImage],
+    direction: str,
+    image_size: dict,
+    view: str,
+    skeleton_keypoints: list,
+    guidance_scale: float,
+    init_image_strength: float,
+    inpainting_images: list,
+    mask_images: list
+) -> dict:
+    """Build request body for animate-with-skeleton"""
+    data = {
+        "reference_image": ReferenceImage.coerce(reference_image_bytes).to_payload(),
+        "direction": direction,
+        "view": view,
+        "guidance_scale": guidance_scale,
+        "init_image_strength": init_image_strength
+    }
+
+    if image_size:
+        data["image_size"] = image_size
+
+    if skeleton_keypoints:
+        data["skeleton_keypoints"] = skeleton_keypoints
+
+    if inpainting_images:
+        data["inpainting_images"] = inpainting_images
+
+    if mask_images:
+        data["mask_images"] = mask_images
+
+    return data
+
+
+def parse_image(resp_json: dict) -> bytes:
+    """
+    Decode single image response: {"image": {"base64": "..."}}
+
+    Raises:
+        APIError: Response is missing the image field
+    """
+    if "image" in resp_json and "base64" in resp_json["image"]:
+        return base64.b64decode(resp_json["image"]["base64"])
+    raise APIError("PixelLab API returned unexpected format: missing 'image.base64' field")
+
@@ -0,0 +1,71 @@
+"""
+Reference Image Handle
+Holds an image that is sent to PixelLab repeatedly (rotation source, animation reference)
+"""
+import base64
+import hashlib
+import threading
+from pathlib import Path
+from typing import Union
+
+
+class ReferenceImage:
+    """
+    Raw image bytes with a cached base64 form and digest
+
+    The base64 encoding and request fragment are computed once and reused by
+    every rotate/animate request built from this handle, instead of encoding
+    the same bytes again for each direction.
+    """
+
+    def __init__(self, data: bytes):
+        if not isinstance(data, (bytes, bytearray)):
+            raise TypeError(f"ReferenceImage expects bytes, got {type(data).__name__}")
+        self.data = bytes(data)
+        self._base64 = None
+        self._digest = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_path(cls, path: Union[str, Path]) -> 'ReferenceImage':
+        """Load a reference image from disk"""
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    @classmethod
+    def coerce(cls, image: Union[bytes, 'ReferenceImage']) -> 'ReferenceImage':
+        """Wrap raw bytes, pass existing handles through unchanged"""
+        if isinstance(image, cls):
+            return image
+        return cls(image)
+
+    @property
+    def base64(self) -> str:
+        """Base64 form (encoded on first access)"""
+        if self._base64 is None:
+            with self._lock:
+                if self._base64 is None:
+                    self._base64 = base64.b64encode(self.data).decode('utf-8')
+        return self._base64
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 hex digest of the raw bytes"""
+        if self._digest is None:
+            with self._lock:
+                if self._digest is None:
+                    self._digest = hashlib.sha256(self.data).hexdigest()
+        return self._digest
+
+    def to_payload(self) -> dict:
+        """Image object in PixelLab request format"""
+        return {
+            "type": "base64",
+            "base64": self.base64
+        }
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"ReferenceImage({len(self.data)} bytes, sha256={self.digest[:12]})"
@@ -0,0 +1,210 @@
+"""
+Adaptive Concurrency Limiter
+AIMD (additive increase, multiplicative decrease) limit on in-flight requests per external endpoint
+
+A fixed parallelism limit is wrong whenever the provider's capacity changes.
+Each endpoint instead has a limit that follows what the provider can take:
+
+- A request that succeeds at normal latency while the limit is in use raises
+  the limit by 1/limit (about +1 per round of requests).
+- A 429/503/504 response, a timeout, or a latency spike (latency above
+  ADAPTIVE_LATENCY_SPIKE_RATIO times the smoothed baseline) multiplies the
+  limit by ADAPTIVE_CONCURRENCY_BACKOFF. Requests sent before the last
+  decrease do not decrease it again, so one burst of failures counts once.
+
+Requests wait for a free slot before the rate limiter (which still bounds
+requests per second). A slot is held until the response headers arrive, the
+expensive part of a PixelLab call. Limits are per process.
+"""
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+from config import config
+from utils.logger import setup_logger
+
+if TYPE_CHECKING:
+    from integrations.retry import Cancellation
+
+logger = setup_logger(__name__)
+
+OVERLOAD_STATUS_CODES = (429, 503, 504)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit of a single endpoint"""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float = None,
+        min_limit: float = None,
+        max_limit: float = None,
+        backoff: float = None,
+        latency_spike_ratio: float = None,
+        enabled: bool = None
+    ):
+        self.name = name
+        self.min_limit = min_limit or config.ADAPTIVE_CONCURRENCY_MIN
+        self.max_limit = max_limit or config.ADAPTIVE_CONCURRENCY_MAX
+        self.backoff = backoff or config.ADAPTIVE_CONCURRENCY_BACKOFF
+        self.latency_spike_ratio = latency_spike_ratio or config.ADAPTIVE_LATENCY_SPIKE_RATIO
+        self.enabled = enabled if enabled is not None else config.ADAPTIVE_CONCURRENCY_ENABLED
+
+        self._limit = float(min(max(initial_limit or config.ADAPTIVE_CONCURRENCY_INITIAL, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._baseline: Optional[float] = None  # Smoothed latency of healthy requests
+        self._samples = 0
+        self._decreased_at = 0.0
+        self._condition = threading.Condition()
+
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return max(1, int(self._limit))
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free (never waits)"""
+        if not self.enabled:
+            return True
+        with self._condition:
+            if self._in_flight < self.limit:
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self, timeout: float = None, cancellation: 'Cancellation' = None) -> bool:
+        """
+        Block until a slot is free
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+            cancellation: Stop waiting as soon as it is cancelled (optional)
+
+        Returns:
+            True if a slot was taken, False if the timeout expired or the wait was cancelled first
+        """
+        if not self.enabled:
+            return True
+        remove_callback = cancellation.add_callback(self._wake) if cancellation is not None else None
+        start = time.monotonic()
+        try:
+            with self._condition:
+                while self._in_flight >= self.limit:
+                    if cancellation is not None and cancellation.is_set():
+                        return False
+                    wait_time = None
+                    if timeout is not None:
+                        wait_time = timeout - (time.monotonic() - start)
+                        if wait_time <= 0:
+                            return False
+                    logger.debug(f"Concurrency limit {self.limit} reached for {self.name}, waiting")
+                    self._condition.wait(wait_time)
+                if cancellation is not None and cancellation.is_set():
+                    return False
+                self._in_flight += 1
+                return True
+        finally:
+            if remove_callback:
+                remove_callback()
+
+    async def acquire_async(self, timeout: float = None, cancellation: 'Cancellation' = None,
+                            poll_interval: float = 0.05) -> bool:
+        """Async version of acquire(), polls without blocking the event loop"""
+        start = time.monotonic()
+        while not self.try_acquire():
+            if cancellation is not None and cancellation.is_set():
+                return False
+            if timeout is not None and time.monotonic() - start >= timeout:
+                return False
+            await asyncio.sleep(poll_interval)
+        return True
+
+    def release(self, started: float = None, status_code: int = None, timed_out: bool = False):
+        """
+        Free a slot and adjust the limit from the outcome
+
+        Args:
+            started: time.monotonic() when the request was sent (None: no latency signal)
+            status_code: Response status (None if no response arrived)
+            timed_out: The request timed out (counts as overload)
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            if timed_out or status_code in OVERLOAD_STATUS_CODES:
+                self._decrease(started, now, f"status {status_code}" if status_code else "timeout")
+            elif started is not None and status_code is not None and status_code < 400:
+                self._observe_latency(started, now)
+            self._condition.notify_all()
+
+    def _observe_latency(self, started: float, now: float):
+        latency = now - started
+        spike = (
+            self._baseline is not None
+            and self._samples >= config.ADAPTIVE_LATENCY_MIN_SAMPLES
+            and latency > self._baseline * self.latency_spike_ratio
+        )
+        if spike:
+            self._decrease(started, now, f"latency {latency:.1f}s vs baseline {self._baseline:.1f}s")
+            return
+
+        self._samples += 1
+        self._baseline = latency if self._baseline is None else self._baseline * 0.9 + latency * 0.1
+        # Only grow while the limit is actually being used
+        if self._in_flight + 1 >= self.limit and self._limit < self.max_limit:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self.increases += 1
+
+    def _decrease(self, started: Optional[float], now: float, reason: str):
+        if started is not None and started < self._decreased_at:
+            return  # Sent before the last decrease, already accounted for
+        previous = self.limit
+        self._limit = max(self.min_limit, self._limit * self.backoff)
+        self._decreased_at = now
+        self.decreases += 1
+        if self.limit != previous:
+            logger.warning(f"Concurrency limit for {self.name} lowered {previous} -> {self.limit} ({reason})")
+
+    def _wake(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'in_flight': self._in_flight,
+                'baseline_latency': round(self._baseline, 3) if self._baseline is not None else None,
+                'increases': self.increases,
+                'decreases': self.decreases
+            }
+
+
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_concurrency_limiter(endpoint: str) -> AdaptiveConcurrencyLimiter:
+    """Get the process-wide concurrency limiter of an endpoint"""
+    limiter = _limiters.get(endpoint)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(endpoint)
+            if limiter is None:
+                limiter = _limiters[endpoint] = AdaptiveConcurrencyLimiter(endpoint)
+    return limiter
+
+
+def get_concurrency_limits() -> Optional[Dict[str, Dict]]:
+    """Current limit and counters per endpoint (None when disabled, for health checks)"""
+    if not config.ADAPTIVE_CONCURRENCY_ENABLED:
+        return None
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
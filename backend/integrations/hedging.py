@@ -0,0 +1,266 @@
+"""
+Hedged Requests
+Cut tail latency by racing a duplicate of a request that is slower than usual
+
+Each hedged endpoint (rotate, animate-with-text, animate-with-skeleton by
+default) keeps a sliding window of recent successful latencies. A call that
+has not answered once it is slower than HEDGE_PERCENTILE of that window gets
+a duplicate (the hedge), and whichever attempt succeeds first wins. The
+other attempt's deadline is cancelled, which stops its retries and rate
+limit waits and aborts a streaming download.
+
+Hedges cost upstream quota, so they are capped by a budget: every request
+adds HEDGE_BUDGET_RATIO tokens (up to HEDGE_BUDGET_BURST) and a hedge spends
+one, i.e. at most ~10% extra requests with the default ratio. Until the
+window holds HEDGE_MIN_SAMPLES latencies, calls run unhedged. Animation calls
+that stream frames into a frame_sink are not hedged either.
+"""
+import functools
+import inspect
+import math
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+from config import config
+from integrations.retry import Deadline
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar('T')
+
+PRIMARY = 'primary'
+HEDGE = 'hedge'
+_CANCELLED = object()  # Queued when the caller's deadline is cancelled
+
+
+def _attempt_deadline(deadline: Optional[Deadline]) -> Tuple[Deadline, Callable[[], None]]:
+    """
+    Deadline for one attempt: same expiry as the caller's, own cancellation
+
+    Cancelling the caller's deadline cancels the attempt, cancelling the
+    attempt (it lost the race) leaves the caller's deadline untouched.
+
+    Returns:
+        (attempt deadline, function unlinking it from the caller's deadline)
+    """
+    if deadline is None:
+        return Deadline(), lambda: None
+    attempt = Deadline(deadline.remaining())
+    unlink = deadline.on_cancel(lambda: attempt.cancel(deadline.cancellation.reason or "cancelled"))
+    return attempt, unlink
+
+
+class Hedger:
+    """Latency window, hedge budget and counters of a single endpoint"""
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = None,
+        min_samples: int = None,
+        window_size: int = None,
+        min_delay: float = None,
+        budget_ratio: float = None,
+        budget_burst: float = None
+    ):
+        self.name = name
+        self.percentile = percentile or config.HEDGE_PERCENTILE
+        self.min_samples = min_samples or config.HEDGE_MIN_SAMPLES
+        self.min_delay = min_delay if min_delay is not None else config.HEDGE_MIN_DELAY
+        self.budget_ratio = budget_ratio if budget_ratio is not None else config.HEDGE_BUDGET_RATIO
+        self.budget_burst = budget_burst if budget_burst is not None else config.HEDGE_BUDGET_BURST
+
+        self._latencies = deque(maxlen=window_size or config.HEDGE_WINDOW_SIZE)
+        self._tokens = self.budget_burst
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging (None while the window holds too few samples)"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(self.percentile / 100 * len(samples)) - 1))
+        return max(self.min_delay, samples[index])
+
+    def call(self, fn: Callable[[Deadline], T], deadline: Optional[Deadline] = None) -> T:
+        """
+        Run fn(attempt_deadline), hedging it with a second call when it is slow
+
+        Args:
+            fn: Makes one attempt, bounded by the deadline it is given
+            deadline: Caller's time budget (optional), cancelling it cancels every attempt
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            GenerationCancelledError: Caller's deadline was cancelled
+            Exception: Error of the primary attempt when no attempt succeeded
+        """
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.budget_burst, self._tokens + self.budget_ratio)
+
+        delay = self.hedge_delay()
+        if delay is None:
+            started = time.monotonic()
+            result = fn(deadline)
+            self._record_latency(time.monotonic() - started)
+            return result
+
+        outcomes = queue.Queue()
+        attempts = []
+
+        def launch(label: str):
+            attempt, unlink = _attempt_deadline(deadline)
+            attempts.append(attempt)
+            started = time.monotonic()
+
+            def run():
+                try:
+                    result = fn(attempt)
+                except BaseException as e:
+                    outcomes.put((label, None, e))
+                else:
+                    self._record_latency(time.monotonic() - started)
+                    outcomes.put((label, result, None))
+                finally:
+                    unlink()
+
+            threading.Thread(target=run, name=f"hedge-{self.name}-{label}", daemon=True).start()
+
+        remove_cancel_callback = deadline.on_cancel(lambda: outcomes.put(_CANCELLED)) if deadline else None
+        launch(PRIMARY)
+        pending = 1
+        timeout = delay
+        errors = {}
+        try:
+            while pending:
+                try:
+                    outcome = outcomes.get(timeout=timeout)
+                except queue.Empty:
+                    # The primary is slower than the hedge percentile
+                    timeout = None
+                    if self._take_budget(deadline):
+                        logger.info(f"Hedging {self.name} request after {delay:.1f}s")
+                        launch(HEDGE)
+                        pending += 1
+                    continue
+                if outcome is _CANCELLED:
+                    deadline.check_cancelled(f"{self.name} request")
+                    continue
+                label, result, error = outcome
+                pending -= 1
+                if error is None:
+                    if label == HEDGE:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return result
+                errors[label] = error
+            raise errors.get(PRIMARY) or errors[HEDGE]
+        finally:
+            if remove_cancel_callback:
+                remove_cancel_callback()
+            # Stop whichever attempt is still running (a no-op for finished ones)
+            for attempt in attempts:
+                attempt.cancel("hedged request already answered")
+
+    def _take_budget(self, deadline: Optional[Deadline]) -> bool:
+        """Spend a hedge token, False when the budget is exhausted or the deadline is over"""
+        if deadline is not None and (deadline.cancelled() or deadline.expired()):
+            return False
+        with self._lock:
+            if self._tokens < 1:
+                self.budget_denied += 1
+                return False
+            self._tokens -= 1
+            self.hedges += 1
+            return True
+
+    def _record_latency(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def stats(self) -> Dict:
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'budget_denied': self.budget_denied,
+                'budget_tokens': round(self._tokens, 2),
+                'samples': len(self._latencies),
+                'hedge_delay': round(delay, 3) if delay is not None else None
+            }
+
+
+_hedgers: Dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(endpoint: str) -> Optional[Hedger]:
+    """Get the process-wide hedger of an endpoint (None when hedging is off for it)"""
+    if not config.HEDGING_ENABLED or endpoint not in config.HEDGE_ENDPOINTS:
+        return None
+    hedger = _hedgers.get(endpoint)
+    if hedger is None:
+        with _hedgers_lock:
+            hedger = _hedgers.get(endpoint)
+            if hedger is None:
+                hedger = _hedgers[endpoint] = Hedger(endpoint)
+    return hedger
+
+
+def hedged(endpoint: str, bypass_if_set: tuple = ()):
+    """
+    Hedge calls of a client method (which must accept a `deadline` argument)
+
+    Every attempt gets its own deadline linked to the caller's.
+
+    Args:
+        endpoint: Endpoint name, hedging applies when it is listed in HEDGE_ENDPOINTS
+        bypass_if_set: Arguments with per-caller side effects (e.g. frame_sink, which
+            streams frames to disk one at a time); calls where any of them is not
+            None are never hedged, two attempts would have to buffer every frame
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            hedger = get_hedger(endpoint)
+            if hedger is None:
+                return method(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            if any(arguments.get(name) is not None for name in bypass_if_set):
+                return method(*args, **kwargs)
+
+            return hedger.call(
+                lambda deadline: method(**{**arguments, 'deadline': deadline}),
+                arguments.get('deadline')
+            )
+        return wrapper
+
+    return decorator
+
+
+def get_hedging_stats() -> Optional[Dict[str, Dict]]:
+    """Hedging counters per endpoint (None when hedging is disabled, for health checks)"""
+    if not config.HEDGING_ENABLED:
+        return None
+    with _hedgers_lock:
+        hedgers = dict(_hedgers)
+    return {name: hedger.stats() for name, hedger in hedgers.items()}
@@ -0,0 +1,212 @@
+"""
+Rate Limiter
+Proactive token-bucket limiting for external API calls (PixelLab, HuggingFace)
+
+Every external call acquires a token for its endpoint before the request is
+sent. Budgets are configured per endpoint in config.RATE_LIMITS as requests
+per second (rate) and bucket size (burst). Bucket state lives in a pluggable
+backend: the in-memory backend is shared by all threads of a process, the
+MongoDB backend is shared by every worker process using the same database.
+"""
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+from config import config
+from utils.logger import setup_logger
+
+if TYPE_CHECKING:
+    from integrations.retry import Cancellation
+
+logger = setup_logger(__name__)
+
+
+class RateLimitBackend:
+    """Token bucket storage backend"""
+
+    # Whether try_acquire performs blocking I/O (async callers run it in a thread)
+    io_bound = False
+
+    def try_acquire(self, key: str, rate: float, burst: int) -> float:
+        """
+        Try to take one token from the bucket
+
+        Args:
+            key: Bucket key (endpoint name)
+            rate: Refill rate in tokens per second
+            burst: Bucket capacity
+
+        Returns:
+            0 if a token was taken, otherwise seconds until the next token is available
+        """
+        raise NotImplementedError
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process backend, shared by all threads"""
+
+    def __init__(self):
+        self._buckets: Dict[str, list] = {}  # key -> [tokens, last refill timestamp]
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(burst), now]
+
+            # Refill based on elapsed time, capped at burst
+            tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+
+            bucket[0] = tokens
+            return (1 - tokens) / rate
+
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """
+    Backend shared across worker processes through MongoDB
+
+    The refill and take are done in a single atomic pipeline update using the
+    server clock ($$NOW), so workers on different hosts agree on elapsed time.
+    Requires MongoDB 4.2+.
+    """
+
+    io_bound = True
+
+    def __init__(self, collection_name: str = None):
+        self.collection_name = collection_name or config.RATE_LIMIT_COLLECTION
+
+    def _collection(self):
+        from mongoengine import get_db
+        return get_db()[self.collection_name]
+
+    def try_acquire(self, key: str, rate: float, burst: int) -> float:
+        from pymongo import ReturnDocument
+
+        elapsed_seconds = {
+            '$divide': [{'$subtract': ['$$NOW', {'$ifNull': ['$updated_at', '$$NOW']}]}, 1000]
+        }
+        pipeline = [
+            {'$set': {
+                'tokens': {'$min': [
+                    burst,
+                    {'$add': [{'$ifNull': ['$tokens', burst]}, {'$multiply': [elapsed_seconds, rate]}]}
+                ]},
+                'updated_at': '$$NOW'
+            }},
+            {'$set': {'granted': {'$gte': ['$tokens', 1]}}},
+            {'$set': {'tokens': {'$cond': ['$granted', {'$subtract': ['$tokens', 1]}, '$tokens']}}},
+        ]
+
+        bucket = self._collection().find_one_and_update(
+            {'_id': key},
+            pipeline,
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        if bucket.get('granted'):
+            return 0.0
+        return (1 - bucket.get('tokens', 0)) / rate
+
+
+class RateLimiter:
+    """Token bucket rate limiter with per-endpoint budgets"""
+
+    def __init__(self, backend: RateLimitBackend = None, limits: Dict[str, dict] = None):
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.limits = limits if limits is not None else config.RATE_LIMITS
+
+    def _budget(self, endpoint: str) -> Optional[dict]:
+        """Get the budget for an endpoint (None if unlimited)"""
+        budget = self.limits.get(endpoint)
+        if not budget or budget.get('rate', 0) <= 0:
+            return None
+        return budget
+
+    def acquire(self, endpoint: str, timeout: float = None, cancellation: 'Cancellation' = None) -> bool:
+        """
+        Block until a token is available for the endpoint
+
+        Args:
+            endpoint: Endpoint name, e.g. "rotate"
+            timeout: Maximum seconds to wait (None waits indefinitely)
+            cancellation: Stop waiting as soon as it is cancelled (optional)
+
+        Returns:
+            True if a token was taken, False if the timeout expired or the wait was cancelled first
+        """
+        budget = self._budget(endpoint)
+        if budget is None:
+            return True
+
+        start = time.monotonic()
+        while True:
+            wait_time = self.backend.try_acquire(endpoint, budget['rate'], max(int(budget['burst']), 1))
+            if wait_time <= 0:
+                return True
+
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+
+            logger.debug(f"Rate limit budget exhausted for {endpoint}, waiting {wait_time:.2f}s")
+            if cancellation is None:
+                time.sleep(wait_time)
+            elif cancellation.wait(wait_time):
+                return False
+
+    async def acquire_async(self, endpoint: str, timeout: float = None, cancellation: 'Cancellation' = None) -> bool:
+        """Async version of acquire(), sleeps without blocking the event loop"""
+        budget = self._budget(endpoint)
+        if budget is None:
+            return True
+
+        start = time.monotonic()
+        while True:
+            if cancellation is not None and cancellation.is_set():
+                return False
+            args = (endpoint, budget['rate'], max(int(budget['burst']), 1))
+            if self.backend.io_bound:
+                wait_time = await asyncio.to_thread(self.backend.try_acquire, *args)
+            else:
+                wait_time = self.backend.try_acquire(*args)
+            if wait_time <= 0:
+                return True
+
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+
+            logger.debug(f"Rate limit budget exhausted for {endpoint}, waiting {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter (backend selected by RATE_LIMIT_BACKEND)"""
+    global _rate_limiter
+
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                if config.RATE_LIMIT_BACKEND == 'mongo':
+                    backend = MongoRateLimitBackend()
+                else:
+                    backend = InMemoryRateLimitBackend()
+                _rate_limiter = RateLimiter(backend)
+                logger.info(f"Rate limiter initialized (backend: {config.RATE_LIMIT_BACKEND})")
+    return _rate_limiter
@@ -0,0 +1,206 @@
+"""
+Response Cache
+Content-addressed on-disk cache for deterministic-input PixelLab requests
+
+Entries are keyed by the SHA-256 of the normalized request, stored as one
+file per entry and evicted least-recently-used once the total size exceeds
+the configured bound. Recency is tracked in memory and persisted through
+file mtimes, so the LRU order survives restarts and is shared (best effort)
+by processes using the same directory.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from config import config
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def normalize_pixflux_request(
+    description: str,
+    image_width: int,
+    image_length: int,
+    detail: str,
+    direction: Optional[str],
+    no_background: bool,
+    variant: Optional[str] = None
+) -> dict:
+    """
+    Normalize generate_pixel_art arguments for cache keys
+
+    Whitespace runs in the description collapse to single spaces and enum-like
+    fields are lower-cased, so trivially different forms share an entry. The
+    variant is only part of the key when given, so existing entries stay valid.
+    """
+    request = {
+        'description': ' '.join((description or '').split()),
+        'image_size': [int(image_width), int(image_length)],
+        'detail': (detail or '').strip().lower(),
+        'direction': (direction or '').strip().lower() or None,
+        'no_background': bool(no_background),
+    }
+    if variant is not None:
+        request['variant'] = str(variant)
+    return request
+
+
+def cache_key(namespace: str, request: dict) -> str:
+    """Hash a normalized request into a cache key"""
+    canonical = json.dumps({'ns': namespace, 'request': request}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of binary responses stored on disk"""
+
+    def __init__(self, cache_dir: Path = None, max_bytes: int = None):
+        self.cache_dir = Path(cache_dir or config.PIXELLAB_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else config.PIXELLAB_CACHE_MAX_BYTES
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: OrderedDict = OrderedDict()  # key -> size, oldest first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        # Two-level fan-out keeps directories small
+        return self.cache_dir / key[:2] / f"{key}.bin"
+
+    def _load_index(self):
+        """Rebuild the LRU index from files on disk (oldest mtime first)"""
+        files = []
+        for path in self.cache_dir.glob('*/*.bin'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        if files:
+            logger.info(f"Response cache loaded {len(files)} entries ({self._total_bytes} bytes) from {self.cache_dir}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get cached data
+
+        Returns:
+            Cached bytes, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # Persist recency for other processes and restarts
+        except OSError:
+            with self._lock:
+                self.misses += 1
+                size = self._entries.pop(key, None)
+                if size is not None:
+                    self._total_bytes -= size
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                # Written by another process
+                self._entries[key] = len(data)
+                self._total_bytes += len(data)
+        return data
+
+    def set(self, key: str, data: bytes):
+        """Store data and evict least-recently-used entries over the size bound"""
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see partial entries
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write response cache entry {key[:12]}: {str(e)}")
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            evicted = self._evict_locked()
+
+        for evicted_key in evicted:
+            try:
+                self._path(evicted_key).unlink()
+            except OSError:
+                pass
+
+    def _evict_locked(self) -> list:
+        evicted = []
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+        for key in keys:
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide PixelLab response cache"""
+    global _response_cache
+
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
@@ -0,0 +1,291 @@
+"""
+Retry Policy
+Shared retry engine for external API clients
+
+Only RetryableAPIError subclasses (rate limited, service unavailable, timeout,
+connection failure) are retried. Delays use exponential backoff with full
+jitter, a Retry-After value sent by the server takes precedence (a request
+asked to wait longer than max_delay fails instead of holding its thread), and an
+optional Deadline bounds the total time spent across all attempts, so a
+request never sleeps past the caller's budget.
+
+A Deadline can also be cancelled (the user cancelled the job): retry sleeps
+and rate limit waits wake up immediately and the next check raises
+GenerationCancelledError, so abandoned work stops using API quota.
+"""
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Awaitable, Callable, List, Optional, TypeVar
+from config import config
+from utils.logger import setup_logger
+from utils.exceptions import RetryableAPIError, DeadlineExceededError, GenerationCancelledError
+
+logger = setup_logger(__name__)
+
+T = TypeVar('T')
+
+
+class Cancellation:
+    """Cancel signal shared by a deadline and every deadline derived from it"""
+
+    def __init__(self):
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def cancel(self, reason: str = "cancelled"):
+        """Set the signal and run the registered callbacks (only the first call has an effect)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancel callback failed: {str(e)}")
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled or timeout passes, returns whether cancelled"""
+        return self._event.wait(timeout)
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run callback once cancelled (immediately if already cancelled)
+
+        Returns:
+            Function removing the callback again
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+class Deadline:
+    """Absolute time budget shared by every call made on behalf of one job, can be cancelled"""
+
+    def __init__(self, seconds: Optional[float] = None, cancellation: Optional[Cancellation] = None):
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        self.cancellation = cancellation or Cancellation()
+
+    @classmethod
+    def after(cls, seconds: Optional[float], cancellation: Optional[Cancellation] = None) -> 'Deadline':
+        """Deadline expiring `seconds` from now (None or <= 0 means unbounded)"""
+        return cls(seconds if seconds and seconds > 0 else None, cancellation)
+
+    def within(self, seconds: Optional[float]) -> 'Deadline':
+        """
+        Deadline expiring `seconds` from now or at this deadline, whichever comes first
+
+        The derived deadline shares this deadline's cancellation.
+        """
+        remaining = self.remaining()
+        if not seconds or seconds <= 0:
+            return Deadline(remaining, self.cancellation)
+        return Deadline(seconds if remaining is None else min(seconds, remaining), self.cancellation)
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cancel the work bounded by this deadline (and every deadline derived from it)"""
+        self.cancellation.cancel(reason)
+
+    def cancelled(self) -> bool:
+        return self.cancellation.is_set()
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback once cancelled, returns a function removing it (see Cancellation.add_callback)"""
+        return self.cancellation.add_callback(callback)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (None if unbounded, never negative)"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def cap(self, timeout: float) -> float:
+        """Shrink a per-request timeout so it does not outlive the deadline"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return max(0.001, min(timeout, remaining))
+
+    def check(self, description: str = "operation"):
+        """
+        Raises:
+            GenerationCancelledError: Deadline was cancelled
+            DeadlineExceededError: Deadline has passed
+        """
+        self.check_cancelled(description)
+        if self.expired():
+            raise DeadlineExceededError(f"Time budget exhausted before {description}")
+
+    def check_cancelled(self, description: str = "operation"):
+        """
+        Raises:
+            GenerationCancelledError: Deadline was cancelled
+        """
+        if self.cancelled():
+            raise GenerationCancelledError(f"Cancelled before {description} ({self.cancellation.reason})")
+
+    def sleep(self, seconds: float):
+        """Sleep for `seconds`, but never past the deadline, wakes up immediately when cancelled"""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        if seconds > 0:
+            self.cancellation.wait(seconds)
+
+    async def sleep_async(self, seconds: float):
+        """Async variant of sleep()"""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        if seconds <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        woken = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: woken.done() or woken.set_result(None))
+
+        remove_callback = self.on_cancel(wake)
+        try:
+            await asyncio.wait_for(woken, seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            remove_callback()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delay in seconds or HTTP date)
+
+    Returns:
+        Seconds to wait, or None if missing/invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for RetryableAPIError"""
+
+    def __init__(
+        self,
+        max_attempts: int = None,
+        base_delay: float = None,
+        max_delay: float = None
+    ):
+        self.max_attempts = max_attempts or config.RETRY_MAX_ATTEMPTS
+        self.base_delay = base_delay if base_delay is not None else config.RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else config.RETRY_MAX_DELAY
+
+    def backoff(self, attempt: int, error: RetryableAPIError) -> float:
+        """
+        Delay before the next attempt
+
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+            error: Error raised by that attempt
+        """
+        if error.retry_after is not None:
+            return min(error.retry_after, self.max_delay)
+        # Full jitter: uniform in [0, min(max_delay, base * 2^(attempt-1))]
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def _next_delay(self, attempt: int, error: RetryableAPIError, deadline: Optional[Deadline], description: str) -> float:
+        """Delay before retrying, or raise if attempts or time budget are exhausted"""
+        if deadline:
+            deadline.check_cancelled(description)
+        if attempt >= self.max_attempts:
+            logger.error(f"{description} failed after {attempt} attempts: {str(error)}")
+            raise error
+        if error.retry_after is not None and error.retry_after > self.max_delay:
+            logger.error(
+                f"{description} asked to retry after {error.retry_after:.0f}s, "
+                f"longer than the {self.max_delay:.0f}s retry cap: {str(error)}"
+            )
+            raise error
+
+        delay = self.backoff(attempt, error)
+        remaining = deadline.remaining() if deadline else None
+        if remaining is not None and delay >= remaining:
+            logger.error(f"{description} out of time budget after {attempt} attempts: {str(error)}")
+            raise DeadlineExceededError(
+                f"{description} did not succeed within the time budget: {str(error)}",
+                last_error=error
+            ) from error
+
+        logger.warning(f"{description} attempt {attempt}/{self.max_attempts} failed ({type(error).__name__}), retrying in {delay:.1f}s")
+        return delay
+
+    def call(self, fn: Callable[[], T], deadline: Deadline = None, description: str = "request") -> T:
+        """
+        Call fn, retrying retryable errors
+
+        Raises:
+            RetryableAPIError: Last error once attempts are exhausted
+            DeadlineExceededError: Next retry would pass the deadline
+        """
+        attempt = 0
+        while True:
+            if deadline:
+                deadline.check(description)
+            attempt += 1
+            try:
+                return fn()
+            except RetryableAPIError as e:
+                delay = self._next_delay(attempt, e, deadline, description)
+            if deadline:
+                deadline.sleep(delay)
+            else:
+                time.sleep(delay)
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]], deadline: Deadline = None, description: str = "request") -> T:
+        """Async variant of call(), fn returns a new awaitable per attempt"""
+        attempt = 0
+        while True:
+            if deadline:
+                deadline.check(description)
+            attempt += 1
+            try:
+                return await fn()
+            except RetryableAPIError as e:
+                delay = self._next_delay(attempt, e, deadline, description)
+            if deadline:
+                await deadline.sleep_async(delay)
+            else:
+                await asyncio.sleep(delay)
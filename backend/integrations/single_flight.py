@@ -0,0 +1,240 @@
+"""
+Single-Flight Request Coalescing
+Concurrent identical external calls share one upstream request and one result
+
+The first caller for a key (the leader) makes the call. Callers arriving with
+the same key while it is in flight wait for the leader and receive its result,
+or its exception. Nothing is remembered once the call completes, so this only
+deduplicates overlapping work (see response_cache for persistent reuse).
+
+A leader that fails because its own deadline ran out or was cancelled says
+nothing about the request: its followers do not receive that error, one of
+them runs the call again as the new leader (within its own deadline).
+"""
+import asyncio
+import copy
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config import config
+from integrations.response_cache import cache_key
+from integrations.clients.reference_image import ReferenceImage
+from integrations.retry import Deadline
+from utils.logger import setup_logger
+from utils.exceptions import DeadlineExceededError
+
+logger = setup_logger(__name__)
+
+
+class _Call:
+    """An in-flight call and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Thread-based single-flight group"""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any], deadline: Optional[Deadline] = None) -> Any:
+        """
+        Run fn, or wait for the identical call already in flight
+
+        Args:
+            key: Request identity
+            fn: Function making the call (bounded by the caller's own deadline)
+            deadline: Caller's time budget, bounds how long a follower waits (None waits indefinitely)
+
+        Raises:
+            DeadlineExceededError: Follower's deadline ran out while waiting for the leader
+            GenerationCancelledError: Follower's deadline was cancelled before it took over the call
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                break
+
+            logger.info(f"Joining in-flight request {key[:12]}")
+            if not call.done.wait(deadline.remaining() if deadline else None):
+                raise DeadlineExceededError("Time budget exhausted while waiting for an identical in-flight request")
+            if isinstance(call.error, DeadlineExceededError):
+                # The leader ran out of (or cancelled) its own budget, take over the call
+                logger.info(f"In-flight request {key[:12]} stopped on its caller's deadline, retrying")
+                if deadline:
+                    deadline.check("retrying an identical in-flight request")
+                continue
+            if call.error is not None:
+                raise call.error
+            return copy.copy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """asyncio single-flight group (calls are coalesced per event loop)"""
+
+    def __init__(self):
+        self._calls: Dict[tuple, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], deadline: Optional[Deadline] = None) -> Any:
+        """Async variant of SingleFlight.do(), fn returns the awaitable making the call"""
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+
+        while True:
+            future = self._calls.get(loop_key)
+            if future is None:
+                break
+
+            self.coalesced += 1
+            logger.info(f"Joining in-flight request {key[:12]}")
+            try:
+                # Shield so a cancelled follower does not cancel the leader's result
+                result = await asyncio.wait_for(asyncio.shield(future), deadline.remaining() if deadline else None)
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError("Time budget exhausted while waiting for an identical in-flight request")
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # This follower was cancelled
+            except DeadlineExceededError:
+                pass
+            else:
+                return copy.copy(result)
+            # The leader was cancelled or ran out of its own budget, take over the call
+            logger.info(f"In-flight request {key[:12]} stopped on its caller's deadline, retrying")
+            if deadline:
+                deadline.check("retrying an identical in-flight request")
+
+        future = self._calls[loop_key] = loop.create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved, followers (if any) re-raise it
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(loop_key, None)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+_single_flight = SingleFlight()
+_async_single_flight = AsyncSingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group"""
+    return _single_flight
+
+
+def get_async_single_flight() -> AsyncSingleFlight:
+    """Get the process-wide asyncio single-flight group"""
+    return _async_single_flight
+
+
+def _key_value(value: Any) -> Any:
+    """JSON-friendly stand-in for an argument (images are identified by digest)"""
+    if isinstance(value, ReferenceImage):
+        return {'sha256': value.digest}
+    if isinstance(value, (bytes, bytearray)):
+        return {'sha256': ReferenceImage(value).digest}
+    if isinstance(value, (list, tuple)):
+        return [_key_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(k): _key_value(v) for k, v in value.items()}
+    return value
+
+
+def flight_key(namespace: str, arguments: dict) -> str:
+    """Hash call arguments into a single-flight key"""
+    return cache_key(namespace, {name: _key_value(value) for name, value in arguments.items()})
+
+
+def single_flight(namespace: str, bypass_if_set: tuple = ()):
+    """
+    Coalesce concurrent identical calls of a client method
+
+    The key is built from the bound arguments (excluding self and deadline).
+    The deadline of a waiting caller bounds how long it waits for the leader,
+    and the call it takes over when the leader stops on its own deadline.
+
+    Args:
+        namespace: Key namespace, usually the endpoint name
+        bypass_if_set: Arguments with per-caller side effects (e.g. frame_sink);
+            calls where any of them is not None are never coalesced
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        def prepare(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop('self', None)
+            deadline = arguments.pop('deadline', None)
+            if not config.SINGLE_FLIGHT_ENABLED or any(arguments.get(name) is not None for name in bypass_if_set):
+                return None, None
+            return flight_key(namespace, arguments), deadline
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(*args, **kwargs):
+                key, deadline = prepare(args, kwargs)
+                if key is None:
+                    return await method(*args, **kwargs)
+                return await _async_single_flight.do(key, lambda: method(*args, **kwargs), deadline)
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            key, deadline = prepare(args, kwargs)
+            if key is None:
+                return method(*args, **kwargs)
+            return _single_flight.do(key, lambda: method(*args, **kwargs), deadline)
+        return wrapper
+
+    return decorator
+
+
+def get_single_flight_stats() -> dict:
+    """Coalescing counters (for health checks)"""
+    return {
+        'coalesced': _single_flight.coalesced + _async_single_flight.coalesced,
+        'in_flight': _single_flight.in_flight() + _async_single_flight.in_flight()
+    }
@@ -0,0 +1,93 @@
+"""
+HTTP Connection Pool Benchmark
+Compares per-call overhead of bare requests.post against the pooled PixelLab client
+
+The mock server is plain HTTP on loopback, so the measured saving only covers
+the TCP handshake; against the real HTTPS API each reused connection also
+skips a TLS handshake and is worth considerably more.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_http_pool --calls 200
+"""
+import argparse
+import logging
+import statistics
+import time
+import requests
+from config import config
+from integrations.clients.http_session import close_session
+from integrations.clients.pixellab_client import PixelLabClient
+from scripts.mock_provider_server import start_server
+
+
+def measure(label: str, call, calls: int) -> dict:
+    """Run call() N times and collect latency statistics (milliseconds)"""
+    call()  # Warm up (first connection is always paid)
+
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        'label': label,
+        'mean': statistics.mean(samples),
+        'p50': samples[len(samples) // 2],
+        'p95': samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pooled vs unpooled PixelLab calls')
+    parser.add_argument('--calls', type=int, default=200, help='Number of calls per scenario')
+    args = parser.parse_args()
+
+    logging.getLogger('integrations.clients.pixellab_client').setLevel(logging.WARNING)
+    config.RATE_LIMITS.clear()  # Measure connection overhead only
+    config.PIXELLAB_CACHE_ENABLED = False
+    config.SINGLE_FLIGHT_ENABLED = False
+
+    server = start_server()
+    api_base = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    url = f"{api_base}/generate-image-pixflux"
+    payload = {
+        "description": "benchmark knight",
+        "image_size": {"width": 64, "height": 64},
+        "detail": "medium detail",
+        "direction": "south",
+        "no_background": True,
+    }
+
+    client = PixelLabClient()
+    client.api_key = client.api_key or 'benchmark'
+    client.api_base = api_base
+
+    results = [
+        measure(
+            'requests.post (new connection per call)',
+            lambda: requests.post(url, json=payload, timeout=10).json(),
+            args.calls
+        ),
+        measure(
+            'PixelLabClient.generate_pixel_art (pooled)',
+            lambda: client.generate_pixel_art(description=payload['description'], image_width=64, image_length=64),
+            args.calls
+        ),
+    ]
+
+    print(f"\n{args.calls} calls per scenario against {url}\n")
+    print(f"{'scenario':<46}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for result in results:
+        print(f"{result['label']:<46}{result['mean']:>10.2f}{result['p50']:>10.2f}{result['p95']:>10.2f}")
+
+    saved = results[0]['mean'] - results[1]['mean']
+    print(f"\nPer-call overhead saved by pooling: {saved:.2f} ms")
+
+    close_session()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+"""
+Mock Provider Server
+Local stand-in for the PixelLab and HuggingFace APIs, for load testing without API credits
+
+Implements the endpoints the clients call:
+    POST /v1/generate-image-pixflux
+    POST /v1/rotate
+    POST /v1/animate-with-text
+    POST /v1/animate-with-skeleton
+    POST /v1/chat/completions      (HuggingFace router, OpenAI format)
+    GET  /stats                    (request and injected error counters)
+
+Responses carry valid base64 PNGs (sized from the request's image_size) and
+generated stories. Latency, 429/503 injection and payload size are
+configurable.
+
+Latency specs (milliseconds):
+    fixed:MS  uniform:MIN:MAX  normal:MEAN:STD  lognormal:MEDIAN:SIGMA  exponential:MEAN
+
+Usage (from the backend directory):
+    python -m scripts.mock_provider_server --port 8090 --latency lognormal:800:0.5 \\
+        --endpoint-latency rotate=lognormal:2000:0.4 --rate-429 0.05 --rate-503 0.02
+
+Then point the backend at it:
+    PIXELLAB_BASE_URL=http://127.0.0.1:8090/v1 HF_BASE_URL=http://127.0.0.1:8090/v1 python run.py
+"""
+import argparse
+import base64
+import io
+import json
+import math
+import random
+import string
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from PIL import Image, PngImagePlugin
+
+# Request path -> endpoint name (same names as the clients' rate limit/breaker keys)
+ROUTES = {
+    '/v1/generate-image-pixflux': 'pixflux',
+    '/v1/rotate': 'rotate',
+    '/v1/animate-with-text': 'animate-with-text',
+    '/v1/animate-with-skeleton': 'animate-with-skeleton',
+    '/v1/chat/completions': 'hf-router',
+}
+
+STORY_WORDS = (
+    "the wanderer once guarded a forgotten keep beyond the northern pass until a storm of "
+    "embers scattered the old order and left only a worn blade a faded map and a promise "
+    "to return before the last lantern in the valley goes dark"
+).split()
+
+PALETTE = [
+    (200, 60, 60), (60, 160, 80), (70, 90, 200), (220, 180, 60),
+    (150, 80, 170), (60, 170, 170), (230, 120, 40), (120, 120, 120),
+]
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency spec into a sampler returning seconds
+
+    Raises:
+        ValueError: Unknown distribution or wrong parameter count
+    """
+    name, *params = spec.split(':')
+    values = [float(p) for p in params]
+
+    def ms(value: float) -> float:
+        return max(0.0, value) / 1000.0
+
+    if name == 'fixed' and len(values) == 1:
+        return lambda rng: ms(values[0])
+    if name == 'uniform' and len(values) == 2:
+        return lambda rng: ms(rng.uniform(values[0], values[1]))
+    if name == 'normal' and len(values) == 2:
+        return lambda rng: ms(rng.gauss(values[0], values[1]))
+    if name == 'lognormal' and len(values) == 2:
+        return lambda rng: ms(rng.lognormvariate(math.log(max(values[0], 1e-3)), values[1]))
+    if name == 'exponential' and len(values) == 1:
+        return lambda rng: ms(rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0)
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+@lru_cache(maxsize=256)
+def render_png(width: int, height: int, variant: int, extra_bytes: int) -> str:
+    """
+    Render a simple sprite PNG and return it base64-encoded
+
+    A random text chunk of extra_bytes pads the file to simulate larger payloads.
+    """
+    width = max(1, min(width, 1024))
+    height = max(1, min(height, 1024))
+    image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    color = PALETTE[variant % len(PALETTE)]
+
+    # Body block, offset per variant so frames differ
+    body_w, body_h = max(1, width // 3), max(1, height // 2)
+    left = (width - body_w) // 2 + (variant % 3) - 1
+    top = height // 4 + (variant % 2)
+    for x in range(max(0, left), min(width, left + body_w)):
+        for y in range(max(0, top), min(height, top + body_h)):
+            image.putpixel((x, y), color + (255,))
+
+    info = None
+    if extra_bytes > 0:
+        info = PngImagePlugin.PngInfo()
+        padding_rng = random.Random(variant)
+        info.add_text('padding', ''.join(padding_rng.choices(string.ascii_letters, k=extra_bytes)))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', pnginfo=info)
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+class MockProviderState:
+    """Server behaviour settings and counters shared by handler threads"""
+
+    def __init__(
+        self,
+        latency: str = 'fixed:0',
+        endpoint_latency: Optional[Dict[str, str]] = None,
+        rate_429: float = 0.0,
+        rate_503: float = 0.0,
+        retry_after: Optional[float] = None,
+        extra_bytes: int = 0,
+        story_words: int = 100,
+        seed: Optional[int] = None
+    ):
+        self.default_latency = parse_latency(latency)
+        self.endpoint_latency = {name: parse_latency(spec) for name, spec in (endpoint_latency or {}).items()}
+        self.rate_429 = rate_429
+        self.rate_503 = rate_503
+        self.retry_after = retry_after
+        self.extra_bytes = extra_bytes
+        self.story_words = story_words
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.injected = Counter()
+
+    def draw(self) -> float:
+        """Uniform random number in [0, 1)"""
+        with self._lock:
+            return self._rng.random()
+
+    def latency(self, endpoint: str) -> float:
+        sampler = self.endpoint_latency.get(endpoint, self.default_latency)
+        with self._lock:
+            return sampler(self._rng)
+
+    def count(self, endpoint: str, outcome: str = None):
+        with self._lock:
+            self.requests[endpoint] += 1
+            if outcome:
+                self.injected[f"{endpoint}:{outcome}"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'requests': dict(self.requests), 'injected': dict(self.injected)}
+
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    """Request handler, behaviour comes from server.state (MockProviderState)"""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real APIs
+    disable_nagle_algorithm = True  # Avoid delayed-ACK stalls on reused connections
+
+    @property
+    def state(self) -> MockProviderState:
+        return self.server.state
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send_json(200, self.state.stats())
+        else:
+            self._send_json(404, {'detail': 'Not found'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length)
+
+        endpoint = ROUTES.get(self.path.split('?', 1)[0])
+        if endpoint is None:
+            self._send_json(404, {'detail': 'Not found'})
+            return
+
+        try:
+            body = json.loads(raw or b'{}')
+        except ValueError:
+            self._send_json(422, {'detail': 'Invalid JSON body'})
+            return
+
+        time.sleep(self.state.latency(endpoint))
+
+        draw = self.state.draw()
+        if draw < self.state.rate_429:
+            self.state.count(endpoint, '429')
+            headers = {'Retry-After': f"{self.state.retry_after:g}"} if self.state.retry_after is not None else {}
+            self._send_json(429, {'detail': 'Rate limit exceeded, please wait longer between requests'}, headers)
+            return
+        if draw < self.state.rate_429 + self.state.rate_503:
+            self.state.count(endpoint, '503')
+            self._send_json(503, {'error': 'Model is loading', 'estimated_time': 1.0})
+            return
+
+        self.state.count(endpoint)
+        if endpoint == 'hf-router':
+            self._send_json(200, self._story_response(body))
+        elif endpoint in ('pixflux', 'rotate'):
+            width, height = self._image_size(body)
+            variant = int(self.state.draw() * len(PALETTE))
+            self._send_json(200, {'image': {'type': 'base64', 'base64': render_png(width, height, variant, self.state.extra_bytes)}})
+        else:
+            width, height = self._image_size(body)
+            n_frames = max(1, min(int(body.get('n_frames', 4) or 4), 20))
+            images = [
+                {'type': 'base64', 'base64': render_png(width, height, index, self.state.extra_bytes)}
+                for index in range(n_frames)
+            ]
+            self._send_json(200, {'images': images})
+
+    def _image_size(self, body: dict) -> tuple:
+        size = body.get('image_size') or {}
+        return int(size.get('width', 64)), int(size.get('height', 64))
+
+    def _story_response(self, body: dict) -> dict:
+        words = max(1, min(int(body.get('max_tokens', 150) or 150), self.state.story_words))
+        story = ' '.join(STORY_WORDS[i % len(STORY_WORDS)] for i in range(words)).capitalize() + '.'
+        return {
+            'id': 'mock-completion',
+            'object': 'chat.completion',
+            'model': body.get('model', 'mock'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': story}, 'finish_reason': 'stop'}],
+        }
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host: str = '127.0.0.1', port: int = 0, state: MockProviderState = None) -> ThreadingHTTPServer:
+    """
+    Start the mock server in a background thread
+
+    Returns:
+        Running server (base URL: f"http://{host}:{server.server_address[1]}/v1")
+    """
+    server = ThreadingHTTPServer((host, port), MockProviderHandler)
+    server.daemon_threads = True
+    server.state = state or MockProviderState()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local PixelLab/HuggingFace stand-in for load testing')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', default='fixed:0', help='Default latency spec, e.g. lognormal:800:0.5')
+    parser.add_argument('--endpoint-latency', action='append', default=[], metavar='ENDPOINT=SPEC',
+                        help='Per-endpoint latency, e.g. rotate=uniform:500:3000 (repeatable)')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--rate-503', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--retry-after', type=float, default=None, help='Retry-After seconds sent with 429')
+    parser.add_argument('--extra-bytes', type=int, default=0, help='Padding added to every PNG to enlarge payloads')
+    parser.add_argument('--story-words', type=int, default=100, help='Maximum words per story')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    endpoint_latency = {}
+    for item in args.endpoint_latency:
+        name, _, spec = item.partition('=')
+        endpoint_latency[name.strip()] = spec.strip()
+
+    state = MockProviderState(
+        latency=args.latency,
+        endpoint_latency=endpoint_latency,
+        rate_429=args.rate_429,
+        rate_503=args.rate_503,
+        retry_after=args.retry_after,
+        extra_bytes=args.extra_bytes,
+        story_words=args.story_words,
+        seed=args.seed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), MockProviderHandler)
+    server.daemon_threads = True
+    server.state = state
+
+    base_url = f"http://{args.host}:{server.server_address[1]}/v1"
+    print(f"Mock provider listening on {base_url}")
+    print(f"  PIXELLAB_BASE_URL={base_url} HF_BASE_URL={base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
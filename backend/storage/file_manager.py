@@ -3,8 +3,10 @@ File Manager
 Handles file operations: save, delete, query, etc.
 """
 import os
+import shutil
+import tempfile
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Union
 from config import config
 from utils.logger import setup_logger
 from utils.exceptions import StorageError
@@ -29,6 +31,67 @@ class FileManager:
         for directory in [self.images_dir, self.gifs_dir, self.temp_dir]:
             directory.mkdir(parents=True, exist_ok=True)
     
+    def write_file(self, file_path: Union[str, Path], data: bytes):
+        """
+        Write a file atomically (temp file + rename)
+        
+        The rename replaces the directory entry instead of overwriting the file in
+        place, so files hard-linked into other characters (see clone_character_files)
+        are never modified, and readers never see partial files.
+        """
+        file_path = Path(file_path)
+        fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, file_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    
+    def clone_character_files(self, source_id: str, target_id: str) -> Dict[str, str]:
+        """
+        Give a character its own copy of another character's files (images, animations, GIF)
+        
+        Files are hard-linked when the filesystem allows it (no extra disk space),
+        copied otherwise. Deleting either character leaves the other's files intact.
+        
+        Returns:
+            Source path -> target path
+        
+        Raises:
+            StorageError: Cloning failed (files cloned so far are removed)
+        """
+        pairs = []
+        source_dir = self.images_dir / source_id
+        if source_dir.exists():
+            target_dir = self.images_dir / target_id
+            pairs.extend(
+                (source_path, target_dir / source_path.relative_to(source_dir))
+                for source_path in source_dir.rglob('*') if source_path.is_file()
+            )
+        source_gif = self.get_gif_path(source_id)
+        if source_gif:
+            pairs.append((source_gif, self.gifs_dir / f"{target_id}.gif"))
+        
+        cloned = {}
+        try:
+            for source_path, target_path in pairs:
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(source_path, target_path)
+                except OSError:
+                    shutil.copy2(source_path, target_path)
+                cloned[str(source_path)] = str(target_path)
+        except Exception as e:
+            logger.error(f"Failed to clone files of character {source_id}: {str(e)}")
+            self.delete_character_files(target_id)
+            raise StorageError(f"Failed to clone character files: {str(e)}")
+        
+        logger.info(f"Cloned {len(cloned)} files from character {source_id} to {target_id}")
+        return cloned
+    
     def save_image(self, image_data: bytes, character_id: str, angle: str, index: int, 
                    extension: str = 'png') -> tuple[str, str]:
         """
@@ -54,8 +117,7 @@ class FileManager:
             file_path = character_dir / filename
             
             # Save file
-            with open(file_path, 'wb') as f:
-                f.write(image_data)
+            self.write_file(file_path, image_data)
             
             # Generate URL (relative path, frontend will automatically add API base URL)
             url = f"{config.STATIC_URL_PREFIX}/{config.IMAGES_DIR}/{character_id}/{filename}"
@@ -84,8 +146,7 @@ class FileManager:
             file_path = self.gifs_dir / filename
             
             # Save file
-            with open(file_path, 'wb') as f:
-                f.write(gif_data)
+            self.write_file(file_path, gif_data)
             
             # Generate URL
             url = f"{config.STATIC_URL_PREFIX}/{config.GIFS_DIR}/{filename}"
@@ -180,8 +241,7 @@ class FileManager:
             file_path = animation_dir / filename
             
             # Save file
-            with open(file_path, 'wb') as f:
-                f.write(frame_data)
+            self.write_file(file_path, frame_data)
             
             # Generate URL
             url = f"{config.STATIC_URL_PREFIX}/{config.IMAGES_DIR}/{character_id}/{animation_type}/{direction}/{filename}"
@@ -0,0 +1,98 @@
+"""
+Generation deduplication: form fingerprints and reusing an earlier character's assets
+"""
+from unittest.mock import MagicMock
+import mongoengine
+import pytest
+from core.services.generation_service import (
+    BASE_IMAGE_STEP, GenerationService, character_fingerprint, rotation_step
+)
+from database.repositories.character_repository import CharacterRepository
+
+FORM = {
+    'name': 'Sir Knight',
+    'characterClass': 'Paladin',
+    'appearance': 'silver armor, red cape',
+    'imageWidth': 64,
+    'imageLength': 64,
+    'imageCount': 4
+}
+
+
+def test_trivially_different_forms_share_a_fingerprint():
+    variant = {**FORM, 'name': '  sir   KNIGHT ', 'imageWidth': '64', 'detail': '', 'description': 'ignored'}
+
+    assert character_fingerprint(variant) == character_fingerprint(FORM)
+    assert character_fingerprint({**FORM, 'imageCount': 3}) == character_fingerprint(FORM)
+
+
+def test_fields_that_change_the_assets_change_the_fingerprint():
+    assert character_fingerprint({**FORM, 'appearance': 'gold armor'}) != character_fingerprint(FORM)
+    assert character_fingerprint({**FORM, 'imageCount': 8}) != character_fingerprint(FORM)
+    assert character_fingerprint({**FORM, 'noBackground': False}) != character_fingerprint(FORM)
+
+
+def test_mirror_mode_only_changes_the_fingerprint_when_enabled():
+    assert character_fingerprint({**FORM, 'mirrorDirections': False}) == character_fingerprint(FORM)
+    assert character_fingerprint({**FORM, 'mirrorDirections': True}) != character_fingerprint(FORM)
+
+
+@pytest.fixture
+def service():
+    mongomock = pytest.importorskip('mongomock')
+    connection = mongoengine.connect('test_character_reuse', mongo_client_class=mongomock.MongoClient)
+    service = GenerationService.__new__(GenerationService)
+    service.character_repo = CharacterRepository()
+    service.file_manager = MagicMock()
+    yield service
+    connection.drop_database('test_character_reuse')
+    mongoengine.disconnect()
+
+
+def _finished_character(service, tmp_path):
+    source = service.create_character(FORM)
+    source_id = str(source.id)
+    directory = tmp_path / source_id
+    directory.mkdir()
+    for index, direction in enumerate(['south', 'north', 'east', 'west']):
+        (directory / f"{direction}.png").write_bytes(b'png')
+        source.images.append({
+            'url': f"/api/v1/files/{source_id}/{direction}.png",
+            'path': str(directory / f"{direction}.png"),
+            'angle': direction,
+            'index': index
+        })
+    source.metadata = {'master_reference_path': str(directory / 'south.png'), 'character_dna': 'dna'}
+    source.story = {'content': 'Once upon a time'}
+    source.completed_steps = [BASE_IMAGE_STEP] + [rotation_step(d) for d in ('north', 'east', 'west')]
+    source.status = 'pending_save'
+    source.save()
+    return source
+
+
+def test_reuse_copies_assets_under_the_new_character_id(service, tmp_path):
+    source = _finished_character(service, tmp_path)
+    source_id = str(source.id)
+
+    character = service.reuse_character({**FORM, 'name': 'sir knight'})
+
+    character_id = str(character.id)
+    assert character_id != source_id
+    service.file_manager.clone_character_files.assert_called_once_with(source_id, character_id)
+    assert character.status == 'pending_save'
+    assert character.metadata['reused_from'] == source_id
+    assert character.metadata['master_reference_path'] == str(tmp_path / character_id / 'south.png')
+    assert [image['url'] for image in character.images] == [
+        f"/api/v1/files/{character_id}/{direction}.png" for direction in ('south', 'north', 'east', 'west')
+    ]
+    assert not any(source_id in image['path'] for image in character.images)
+    assert character.story == source.story
+    assert character.completed_steps == source.completed_steps
+
+
+def test_nothing_is_reused_when_the_source_images_are_gone(service, tmp_path):
+    source = _finished_character(service, tmp_path)
+    (tmp_path / str(source.id) / 'east.png').unlink()
+
+    assert service.reuse_character(FORM) is None
+    service.file_manager.clone_character_files.assert_not_called()
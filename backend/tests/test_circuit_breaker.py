@@ -0,0 +1,98 @@
+"""
+Circuit breaker state transitions: closed -> open -> half-open -> closed/open
+"""
+import pytest
+from integrations import circuit_breaker
+from integrations.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from utils.exceptions import CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def _breaker(**overrides):
+    options = dict(failure_rate_threshold=0.5, minimum_calls=4, window_size=4,
+                   open_seconds=30, half_open_max_calls=1)
+    options.update(overrides)
+    return CircuitBreaker('rotate', **options)
+
+
+def _open(breaker):
+    for _ in range(breaker.minimum_calls):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_stays_closed_until_minimum_calls(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_stays_closed_below_failure_rate(clock):
+    breaker = _breaker()
+    for failed in (True, False, False, False, False, True):
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()['failure_rate'] == pytest.approx(0.25)
+
+
+def test_open_breaker_fails_fast_with_retry_after(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock[0] += 10
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call()
+    assert error.value.retry_after == pytest.approx(20)
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock[0] += 30
+
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Only one probe at a time
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()['window_calls'] == 0
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock[0] += 30
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_release_frees_the_probe_slot(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock[0] += 30
+    breaker.before_call()
+    breaker.release()
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
@@ -0,0 +1,163 @@
+"""
+Adaptive concurrency limiter: additive increase, multiplicative decrease
+"""
+import asyncio
+import pytest
+from config import config
+from integrations import concurrency_limiter
+from integrations.concurrency_limiter import AdaptiveConcurrencyLimiter
+from integrations.retry import Cancellation
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(concurrency_limiter.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def _limiter(initial_limit=4, **overrides):
+    options = dict(min_limit=1, max_limit=16, backoff=0.5, latency_spike_ratio=2, enabled=True)
+    options.update(overrides)
+    return AdaptiveConcurrencyLimiter('rotate', initial_limit=initial_limit, **options)
+
+
+def _request(limiter, clock, latency=1.0, status_code=200, timed_out=False):
+    assert limiter.try_acquire()
+    started = clock[0]
+    clock[0] += latency
+    limiter.release(started, None if timed_out else status_code, timed_out)
+
+
+def test_slots_are_bounded_by_the_limit():
+    limiter = _limiter(initial_limit=2)
+
+    assert limiter.try_acquire() and limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release()
+    assert limiter.try_acquire()
+
+
+def test_success_at_full_use_increases_the_limit_additively(clock):
+    limiter = _limiter(initial_limit=2)
+    limiter.try_acquire()  # The other slot stays in use
+    _request(limiter, clock)
+
+    assert limiter._limit == pytest.approx(2.5)
+    assert limiter.limit == 2
+    _request(limiter, clock)
+    assert limiter._limit == pytest.approx(2.5 + 1 / 2.5)
+    assert limiter.increases == 2
+
+
+def test_limit_does_not_grow_while_mostly_idle(clock):
+    limiter = _limiter(initial_limit=4)
+    for _ in range(5):
+        _request(limiter, clock)
+
+    assert limiter.limit == 4
+    assert limiter.increases == 0
+
+
+@pytest.mark.parametrize('outcome', [{'status_code': 429}, {'status_code': 503}, {'timed_out': True}])
+def test_overload_halves_the_limit(clock, outcome):
+    limiter = _limiter(initial_limit=8)
+    _request(limiter, clock, **outcome)
+
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+
+def test_client_errors_do_not_change_the_limit(clock):
+    limiter = _limiter(initial_limit=8)
+    _request(limiter, clock, status_code=400)
+
+    assert limiter.limit == 8
+    assert (limiter.increases, limiter.decreases) == (0, 0)
+
+
+def test_a_burst_of_failures_decreases_once(clock):
+    limiter = _limiter(initial_limit=8)
+    sent = []
+    for _ in range(4):
+        limiter.try_acquire()
+        sent.append(clock[0])
+    clock[0] += 1
+    for started in sent:
+        limiter.release(started, 429)
+
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+    # A request sent after the decrease that also fails lowers it again
+    _request(limiter, clock, status_code=429)
+    assert limiter.limit == 2
+
+
+def test_limit_stays_within_bounds(clock):
+    limiter = _limiter(initial_limit=2, min_limit=1, max_limit=3)
+    for _ in range(5):
+        _request(limiter, clock, status_code=503)
+    assert limiter.limit == 1
+
+    limiter = _limiter(initial_limit=3, max_limit=3)
+    for _ in range(3):
+        limiter.try_acquire()
+    for _ in range(3):
+        limiter.release(clock[0], 200)
+    assert limiter.limit == 3
+
+
+def test_latency_spike_counts_as_overload(clock, monkeypatch):
+    monkeypatch.setattr(config, 'ADAPTIVE_LATENCY_MIN_SAMPLES', 3)
+    limiter = _limiter(initial_limit=8)
+    for _ in range(3):
+        _request(limiter, clock, latency=1.0)
+    _request(limiter, clock, latency=1.5)
+    assert limiter.limit == 8
+
+    _request(limiter, clock, latency=5.0)
+    assert limiter.limit == 4
+
+
+def test_acquire_times_out_or_stops_when_cancelled():
+    limiter = _limiter(initial_limit=1)
+    limiter.try_acquire()
+    cancellation = Cancellation()
+    cancellation.cancel("stop")
+
+    assert not limiter.acquire(timeout=0.01)
+    assert not limiter.acquire(cancellation=cancellation)
+    assert not asyncio.run(limiter.acquire_async(cancellation=cancellation))
+    limiter.release()
+    assert asyncio.run(limiter.acquire_async(timeout=1))
+
+
+def test_disabled_limiter_never_blocks():
+    limiter = _limiter(initial_limit=1, enabled=False)
+
+    assert all(limiter.try_acquire() for _ in range(10))
+
+
+def test_async_client_frees_the_slot_when_cancelled_waiting_for_the_rate_limit(monkeypatch):
+    from integrations.clients import async_pixellab_client
+
+    class StuckRateLimiter:
+        async def acquire_async(self, *args, **kwargs):
+            await asyncio.sleep(30)
+
+    limiter = _limiter(initial_limit=1)
+    monkeypatch.setattr(async_pixellab_client, 'get_concurrency_limiter', lambda endpoint: limiter)
+    monkeypatch.setattr(async_pixellab_client, 'get_rate_limiter', lambda: StuckRateLimiter())
+
+    async def scenario():
+        client = async_pixellab_client.AsyncPixelLabClient.__new__(async_pixellab_client.AsyncPixelLabClient)
+        attempt = asyncio.ensure_future(client._attempt('rotate', {}, 10, 'PixelLab', None, None))
+        await asyncio.sleep(0.01)
+        assert limiter.stats()['in_flight'] == 1
+        attempt.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await attempt
+
+    asyncio.run(scenario())
+    assert limiter.stats()['in_flight'] == 0
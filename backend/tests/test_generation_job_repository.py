@@ -0,0 +1,64 @@
+"""
+Weighted fair queuing of generation jobs (runs against an in-memory MongoDB)
+"""
+import pytest
+from bson import ObjectId
+
+mongomock = pytest.importorskip('mongomock')
+import mongoengine  # noqa: E402
+from database.repositories.generation_job_repository import GenerationJobRepository  # noqa: E402
+
+
+@pytest.fixture
+def repository():
+    connection = mongoengine.connect('test_generation_jobs', mongo_client_class=mongomock.MongoClient)
+    yield GenerationJobRepository()
+    connection.drop_database('test_generation_jobs')
+    mongoengine.disconnect()
+
+
+def _enqueue(repository, owner, priority='interactive', weight=1.0):
+    return repository.enqueue(str(ObjectId()), priority=priority, owner=owner, weight=weight)
+
+
+def _claim_owners(repository, count):
+    return [repository.claim_next('worker', 60).owner for _ in range(count)]
+
+
+def test_owner_with_many_jobs_does_not_starve_others(repository):
+    for _ in range(3):
+        _enqueue(repository, 'alice')
+    _enqueue(repository, 'bob')
+
+    assert _claim_owners(repository, 4) == ['alice', 'bob', 'alice', 'alice']
+
+
+def test_heavier_flow_is_served_first_in_proportion(repository):
+    for _ in range(2):
+        _enqueue(repository, 'alice', priority='bulk', weight=1)
+    for _ in range(4):
+        _enqueue(repository, 'bob', priority='interactive', weight=4)
+
+    assert _claim_owners(repository, 6) == ['bob', 'bob', 'bob', 'alice', 'bob', 'alice']
+
+
+def test_idle_flow_starts_at_the_virtual_clock(repository):
+    for _ in range(4):
+        _enqueue(repository, 'alice')
+    _claim_owners(repository, 3)
+
+    # Carol was idle while alice's jobs ran, she gets no credit for that time
+    for _ in range(2):
+        _enqueue(repository, 'carol')
+
+    assert _claim_owners(repository, 3) == ['carol', 'alice', 'carol']
+
+
+def test_expired_lease_is_claimed_again(repository):
+    job = _enqueue(repository, 'alice')
+    repository.claim_next('crashed-worker', -1)
+
+    reclaimed = repository.claim_next('worker', 60)
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+    assert repository.claim_next('worker', 60) is None
@@ -0,0 +1,97 @@
+"""
+Hedged requests: percentile delay, hedge budget and the race between attempts
+"""
+import threading
+import pytest
+from integrations import hedging
+from integrations.hedging import Hedger, hedged
+from integrations.retry import Deadline
+
+
+def _hedger(**overrides):
+    options = dict(percentile=95, min_samples=20, window_size=100, min_delay=0.01,
+                   budget_ratio=0.1, budget_burst=1)
+    options.update(overrides)
+    return Hedger('rotate', **options)
+
+
+def test_no_hedge_delay_until_enough_samples():
+    hedger = _hedger(min_samples=5)
+    for _ in range(4):
+        hedger._record_latency(1.0)
+    assert hedger.hedge_delay() is None
+
+    hedger._record_latency(1.0)
+    assert hedger.hedge_delay() == 1.0
+
+
+def test_hedge_delay_is_the_latency_percentile():
+    hedger = _hedger()
+    for seconds in range(1, 101):
+        hedger._record_latency(seconds / 100)
+
+    assert hedger.hedge_delay() == pytest.approx(0.95)
+
+
+def test_hedge_delay_has_a_floor():
+    hedger = _hedger(min_samples=1, min_delay=0.5)
+    hedger._record_latency(0.01)
+
+    assert hedger.hedge_delay() == 0.5
+
+
+def test_budget_limits_hedges_and_refills_per_request():
+    hedger = _hedger(budget_burst=1, budget_ratio=0.5)
+
+    assert hedger._take_budget(None)
+    assert not hedger._take_budget(None)
+    assert hedger.budget_denied == 1
+
+    hedger.call(lambda deadline: 'ok')
+    assert not hedger._take_budget(None)
+    hedger.call(lambda deadline: 'ok')  # Two requests earn one hedge
+    assert hedger._take_budget(None)
+
+
+def test_no_hedge_for_a_cancelled_caller():
+    deadline = Deadline(30)
+    deadline.cancel("stop")
+
+    assert not _hedger()._take_budget(deadline)
+
+
+def test_slow_primary_is_hedged_and_the_loser_is_cancelled():
+    hedger = _hedger(min_samples=1)
+    hedger._record_latency(0.01)
+    attempts = []
+    primary_cancelled = threading.Event()
+
+    def call(attempt_deadline):
+        attempts.append(attempt_deadline)
+        if len(attempts) == 1:
+            attempt_deadline.sleep(5)  # Stuck until it loses the race
+            if attempt_deadline.cancelled():
+                primary_cancelled.set()
+            return 'primary'
+        return 'hedge'
+
+    assert hedger.call(call, Deadline(30)) == 'hedge'
+    assert primary_cancelled.wait(5)
+    assert (hedger.hedges, hedger.hedge_wins) == (1, 1)
+
+
+def test_calls_with_a_frame_sink_are_not_hedged(monkeypatch):
+    hedger = _hedger(min_samples=1)
+    hedger._record_latency(0.01)
+    monkeypatch.setattr(hedging, 'get_hedger', lambda endpoint: hedger)
+    deadline = Deadline(30)
+
+    class Client:
+        @hedged('rotate', bypass_if_set=('frame_sink',))
+        def animate(self, frame_sink=None, deadline=None):
+            return deadline
+
+    assert Client().animate(frame_sink=lambda index, data: None, deadline=deadline) is deadline
+    assert hedger.requests == 0
+    assert Client().animate(deadline=deadline) is not deadline
+    assert hedger.requests == 1
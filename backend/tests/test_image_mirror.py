@@ -0,0 +1,104 @@
+"""
+Mirror mode: west-facing directions are flipped from their east-facing counterpart,
+and generated normally when the counterpart is unavailable
+"""
+import io
+from unittest.mock import MagicMock
+from bson import ObjectId
+from PIL import Image
+from core.services.generation_service import GenerationService
+from database.models.character_model import Character
+from database.repositories.character_repository import ANIMATION_DIRECTIONS
+from utils.exceptions import APIError
+from utils.image_mirror import MIRROR_SOURCES, mirror_image
+
+
+def _png(pixels):
+    image = Image.new('RGBA', (len(pixels), 1))
+    image.putdata(pixels)
+    output = io.BytesIO()
+    image.save(output, format='PNG')
+    return output.getvalue()
+
+
+def _pixels(png_bytes):
+    with Image.open(io.BytesIO(png_bytes)) as image:
+        return [image.getpixel((x, 0)) for x in range(image.width)]
+
+
+def test_mirror_image_flips_horizontally_and_keeps_transparency():
+    red, blue, clear = (255, 0, 0, 255), (0, 0, 255, 255), (0, 0, 0, 0)
+    assert _pixels(mirror_image(_png([red, blue, clear]))) == [clear, blue, red]
+
+
+def test_mirror_sources_map_west_facing_to_east_facing_directions():
+    assert set(MIRROR_SOURCES) == {'west', 'south-west', 'north-west'}
+    for direction, source in MIRROR_SOURCES.items():
+        assert direction in ANIMATION_DIRECTIONS and source in ANIMATION_DIRECTIONS
+        assert source == direction.replace('west', 'east')
+
+
+def _service(tmp_path):
+    service = GenerationService.__new__(GenerationService)
+    service.character_repo = MagicMock()
+    service.progress = MagicMock()
+    service.pixellab_client = MagicMock()
+    service.file_manager = MagicMock()
+
+    def save(data, character_id, direction, index):
+        path = tmp_path / f"{direction}.png"
+        path.write_bytes(data)
+        return str(path), f"/{direction}.png"
+
+    service.file_manager.save_image.side_effect = save
+    return service
+
+
+def _character(tmp_path, **fields):
+    south = tmp_path / 'south.png'
+    south.write_bytes(_png([(1, 2, 3, 255)]))
+    character = Character(name='hero', **fields)
+    character.id = ObjectId()
+    character.images = [{'url': '/south.png', 'path': str(south), 'angle': 'south', 'direction': 'south', 'index': 0}]
+    return character
+
+
+def test_direction_is_rotated_when_its_mirror_source_failed(tmp_path):
+    service = _service(tmp_path)
+    service._extract_character_dna = lambda form_data, width: 'dna'
+    service._generate_base_image = lambda *args: _png([(1, 2, 3, 255)])
+
+    def rotate_image(to_direction, **kwargs):
+        if to_direction == 'east':
+            raise APIError("east failed")
+        return _png([(4, 5, 6, 255)])
+
+    service.pixellab_client.rotate_image.side_effect = rotate_image
+    form_data = {'imageCount': 4, 'mirrorDirections': True}
+    character = _character(tmp_path, input_params=form_data)
+
+    images = service._generate_images(character, form_data)
+
+    rotated = [call.kwargs['to_direction'] for call in service.pixellab_client.rotate_image.call_args_list]
+    assert sorted(rotated) == ['east', 'north', 'west']
+    assert {image['direction'] for image in images} == {'north', 'south', 'west'}
+
+
+def test_animation_is_generated_when_its_mirror_source_failed(tmp_path):
+    service = _service(tmp_path)
+    generated = []
+
+    def generate_frames(character_id, animation_type, direction, **kwargs):
+        generated.append(direction)
+        if direction == 'east':
+            raise APIError("east failed")
+        return [{'url': f"/{direction}.png", 'path': str(tmp_path / f"{direction}.png"), 'frame_index': 0}]
+
+    service._generate_animation_frames = generate_frames
+    character = _character(tmp_path, input_params={'mirrorDirections': True})
+
+    frames = service.generate_animation(character, 'walk', ['east', 'west'])
+
+    assert sorted(generated) == ['east', 'west']
+    assert list(frames) == ['west']
+    assert 'mirrored_from' not in service.progress.step.call_args.args[2]
@@ -0,0 +1,88 @@
+"""
+Token-bucket rate limiter: burst, refill and bounded waits
+"""
+import asyncio
+import pytest
+from integrations import rate_limiter
+from integrations.rate_limiter import InMemoryRateLimitBackend, RateLimiter
+from integrations.retry import Cancellation
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_bucket_allows_burst_then_reports_wait(clock):
+    backend = InMemoryRateLimitBackend()
+
+    assert [backend.try_acquire('rotate', 2, 3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.try_acquire('rotate', 2, 3) == pytest.approx(0.5)
+
+
+def test_bucket_refills_at_rate_and_caps_at_burst(clock):
+    backend = InMemoryRateLimitBackend()
+    for _ in range(3):
+        backend.try_acquire('rotate', 2, 3)
+
+    clock.now += 0.5
+    assert backend.try_acquire('rotate', 2, 3) == 0.0
+    assert backend.try_acquire('rotate', 2, 3) > 0
+
+    clock.now += 60
+    assert [backend.try_acquire('rotate', 2, 3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.try_acquire('rotate', 2, 3) > 0
+
+
+def test_buckets_are_per_endpoint(clock):
+    backend = InMemoryRateLimitBackend()
+    backend.try_acquire('rotate', 1, 1)
+
+    assert backend.try_acquire('rotate', 1, 1) > 0
+    assert backend.try_acquire('pixflux', 1, 1) == 0.0
+
+
+def test_acquire_waits_for_the_next_token(clock):
+    limiter = RateLimiter(InMemoryRateLimitBackend(), {'rotate': {'rate': 4, 'burst': 1}})
+    started = clock.now
+
+    assert limiter.acquire('rotate')
+    assert limiter.acquire('rotate')
+    assert clock.now - started == pytest.approx(0.25)
+
+
+def test_acquire_gives_up_at_timeout(clock):
+    limiter = RateLimiter(InMemoryRateLimitBackend(), {'rotate': {'rate': 0.1, 'burst': 1}})
+    limiter.acquire('rotate')
+
+    assert not limiter.acquire('rotate', timeout=2)
+
+
+def test_unlimited_endpoint_never_waits(clock):
+    limiter = RateLimiter(InMemoryRateLimitBackend(), {'rotate': {'rate': 0, 'burst': 1}})
+
+    assert all(limiter.acquire(endpoint, timeout=0) for endpoint in ('rotate', 'rotate', 'unknown'))
+
+
+def test_cancelled_wait_returns_false():
+    limiter = RateLimiter(InMemoryRateLimitBackend(), {'rotate': {'rate': 0.01, 'burst': 1}})
+    limiter.acquire('rotate')
+    cancellation = Cancellation()
+    cancellation.cancel("stop")
+
+    assert not limiter.acquire('rotate', cancellation=cancellation)
+    assert not asyncio.run(limiter.acquire_async('rotate', cancellation=cancellation))
@@ -0,0 +1,72 @@
+"""
+Response cache: key normalization and size-bounded LRU eviction
+"""
+import os
+from integrations.response_cache import ResponseCache, cache_key, normalize_pixflux_request
+
+
+def _key(**overrides):
+    arguments = dict(description='a knight', image_width=64, image_length=64,
+                     detail='medium detail', direction=None, no_background=False)
+    arguments.update(overrides)
+    return cache_key('pixflux', normalize_pixflux_request(**arguments))
+
+
+def test_trivially_different_requests_share_a_key():
+    assert _key(description='  a   knight ', detail='Medium Detail ') == _key()
+    assert _key(direction='South') == _key(direction='south')
+    assert _key(direction='') == _key()
+
+
+def test_different_requests_and_variants_get_different_keys():
+    assert _key(description='a wizard') != _key()
+    assert _key(image_width=128) != _key()
+    assert _key(variant='walk:south:frame:0') != _key(variant='walk:south:frame:1')
+    assert _key(variant='walk:south:frame:0') != _key()
+
+
+def test_get_returns_stored_data_and_counts_hits(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=100)
+    cache.set('a' * 64, b'png')
+
+    assert cache.get('a' * 64) == b'png'
+    assert cache.get('b' * 64) is None
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10)
+    first, second, third = 'a' * 64, 'b' * 64, 'c' * 64
+    cache.set(first, b'1234')
+    cache.set(second, b'1234')
+    cache.get(first)  # second is now the least recently used
+    cache.set(third, b'1234')
+
+    assert cache.get(second) is None
+    assert cache.get(first) == b'1234'
+    assert cache.get(third) == b'1234'
+    assert cache.stats()['evictions'] == 1
+    assert not (tmp_path / second[:2] / f"{second}.bin").exists()
+
+
+def test_entry_larger_than_the_bound_is_not_stored(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=4)
+    cache.set('a' * 64, b'12345')
+
+    assert cache.get('a' * 64) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_order_survives_a_restart(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10)
+    old, new = 'a' * 64, 'b' * 64
+    cache.set(old, b'1234')
+    cache.set(new, b'1234')
+    os.utime(tmp_path / old[:2] / f"{old}.bin", (1, 1))
+
+    reloaded = ResponseCache(tmp_path, max_bytes=10)
+    assert reloaded.stats()['bytes'] == 8
+    reloaded.set('c' * 64, b'1234')
+
+    assert reloaded.get(old) is None
+    assert reloaded.get(new) == b'1234'
@@ -0,0 +1,95 @@
+"""
+Retry policy: jittered backoff, Retry-After handling and deadlines
+"""
+import email.utils
+import time
+import pytest
+from integrations import retry
+from integrations.retry import Deadline, RetryPolicy, parse_retry_after
+from utils.exceptions import (
+    APIError, APITimeoutError, DeadlineExceededError, GenerationCancelledError, RateLimitError
+)
+
+
+def test_backoff_is_full_jitter_capped_at_max_delay(monkeypatch):
+    policy = RetryPolicy(max_attempts=10, base_delay=1, max_delay=5)
+    bounds = []
+    monkeypatch.setattr(retry.random, 'uniform', lambda low, high: bounds.append((low, high)) or high)
+
+    delays = [policy.backoff(attempt, APITimeoutError("slow")) for attempt in (1, 2, 3, 4)]
+
+    assert bounds == [(0, 1), (0, 2), (0, 4), (0, 5)]
+    assert delays == [1, 2, 4, 5]
+
+
+def test_retry_after_takes_precedence_over_jitter():
+    policy = RetryPolicy(max_attempts=3, base_delay=1, max_delay=30)
+
+    assert policy.backoff(1, RateLimitError("429", retry_after=7)) == 7
+    assert policy._next_delay(1, RateLimitError("429", retry_after=7), None, "request") == 7
+
+
+def test_retry_after_longer_than_max_delay_fails_fast():
+    policy = RetryPolicy(max_attempts=3, base_delay=1, max_delay=30)
+    error = RateLimitError("429", retry_after=120)
+
+    with pytest.raises(RateLimitError) as raised:
+        policy._next_delay(1, error, None, "request")
+    assert raised.value is error
+
+
+def test_last_attempt_raises_the_error():
+    policy = RetryPolicy(max_attempts=2, base_delay=0, max_delay=0)
+    error = APITimeoutError("slow")
+
+    with pytest.raises(APITimeoutError):
+        policy._next_delay(2, error, None, "request")
+
+
+def test_delay_past_the_deadline_raises_deadline_exceeded():
+    policy = RetryPolicy(max_attempts=3, base_delay=1, max_delay=30)
+
+    with pytest.raises(DeadlineExceededError):
+        policy._next_delay(1, RateLimitError("429", retry_after=10), Deadline(5), "request")
+
+
+def test_cancelled_deadline_stops_retrying():
+    policy = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+    deadline = Deadline(30)
+    deadline.cancel("user cancelled")
+
+    with pytest.raises(GenerationCancelledError):
+        policy._next_delay(1, APITimeoutError("slow"), deadline, "request")
+
+
+def test_call_retries_retryable_errors_only(monkeypatch):
+    monkeypatch.setattr(retry.time, 'sleep', lambda seconds: None)
+    policy = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+    outcomes = [APITimeoutError("slow"), RateLimitError("429", retry_after=0), 'ok']
+
+    def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert policy.call(flaky) == 'ok'
+
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise APIError("bad request")
+
+    with pytest.raises(APIError):
+        policy.call(broken)
+    assert len(calls) == 1
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after('3') == 3
+    assert parse_retry_after('-1') == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    in_a_minute = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 <= parse_retry_after(in_a_minute) <= 60
@@ -0,0 +1,118 @@
+"""
+Single-flight coalescing: a leader stopped by its own deadline must not fail its followers
+"""
+import asyncio
+import threading
+import pytest
+from integrations.retry import Deadline
+from integrations.single_flight import AsyncSingleFlight, SingleFlight
+from utils.exceptions import GenerationCancelledError
+
+
+def test_follower_takes_over_when_leader_is_cancelled():
+    group = SingleFlight()
+    leader_deadline = Deadline(30)
+    follower_deadline = Deadline(30)
+    leader_started = threading.Event()
+    outcomes = {}
+
+    def leader_call():
+        leader_started.set()
+        leader_deadline.sleep(30)  # Wakes up as soon as the job is cancelled
+        leader_deadline.check_cancelled("request")
+
+    def run_leader():
+        try:
+            group.do('key', leader_call, leader_deadline)
+        except GenerationCancelledError as e:
+            outcomes['leader'] = e
+
+    def run_follower():
+        outcomes['follower'] = group.do('key', lambda: 'follower result', follower_deadline)
+
+    leader = threading.Thread(target=run_leader)
+    leader.start()
+    assert leader_started.wait(5)
+
+    follower = threading.Thread(target=run_follower)
+    follower.start()
+    while group.coalesced == 0:
+        follower.join(0.01)
+
+    leader_deadline.cancel("user A cancelled")
+    leader.join(5)
+    follower.join(5)
+
+    assert isinstance(outcomes['leader'], GenerationCancelledError)
+    assert outcomes['follower'] == 'follower result'
+    assert group.in_flight() == 0
+
+
+def test_follower_with_cancelled_deadline_does_not_take_over():
+    group = SingleFlight()
+    leader_deadline = Deadline(30)
+    follower_deadline = Deadline(30)
+    leader_started = threading.Event()
+    follower_calls = []
+    outcomes = {}
+
+    def leader_call():
+        leader_started.set()
+        leader_deadline.sleep(30)
+        leader_deadline.check_cancelled("request")
+
+    def run_leader():
+        try:
+            group.do('key', leader_call, leader_deadline)
+        except GenerationCancelledError as e:
+            outcomes['leader'] = e
+
+    def run_follower():
+        try:
+            group.do('key', lambda: follower_calls.append(1), follower_deadline)
+        except GenerationCancelledError as e:
+            outcomes['follower'] = e
+
+    leader = threading.Thread(target=run_leader)
+    leader.start()
+    assert leader_started.wait(5)
+
+    follower = threading.Thread(target=run_follower)
+    follower.start()
+    while group.coalesced == 0:
+        follower.join(0.01)
+
+    follower_deadline.cancel("user B cancelled")
+    leader_deadline.cancel("user A cancelled")
+    leader.join(5)
+    follower.join(5)
+
+    assert isinstance(outcomes['follower'], GenerationCancelledError)
+    assert follower_calls == []
+
+
+def test_async_follower_takes_over_when_leader_is_cancelled():
+    async def scenario():
+        group = AsyncSingleFlight()
+        leader_deadline = Deadline(30)
+        follower_deadline = Deadline(30)
+
+        async def leader_call():
+            await leader_deadline.sleep_async(30)
+            leader_deadline.check_cancelled("request")
+
+        async def follower_call():
+            return 'follower result'
+
+        leader = asyncio.ensure_future(group.do('key', leader_call, leader_deadline))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(group.do('key', follower_call, follower_deadline))
+        await asyncio.sleep(0)
+        assert group.coalesced == 1
+
+        leader_deadline.cancel("user A cancelled")
+        with pytest.raises(GenerationCancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == 'follower result'
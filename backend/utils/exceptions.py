@@ -1,6 +1,7 @@
 """
 自定义异常类
 """
+import math
 
 
 class AppException(Exception):
@@ -32,3 +33,56 @@ class APIError(AppException):
     """API调用错误"""
     pass
 
+
+
+class CircuitOpenError(APIError):
+    """外部接口熔断中，快速失败"""
+    
+    def __init__(self, endpoint, retry_after=None):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        message = f"{endpoint} is temporarily unavailable (circuit open after repeated upstream failures)"
+        if retry_after is not None:
+            message += f", retry in {math.ceil(retry_after)}s"
+        super().__init__(message)
+
+
+class RetryableAPIError(APIError):
+    """可重试的外部接口错误（限流、服务暂不可用、超时、连接失败）"""
+    
+    def __init__(self, message, retry_after=None):
+        self.retry_after = retry_after  # 服务端建议的等待秒数（Retry-After），可为空
+        super().__init__(message)
+
+
+class RateLimitError(RetryableAPIError):
+    """外部接口限流（HTTP 429）"""
+    pass
+
+
+class ServiceUnavailableError(RetryableAPIError):
+    """外部接口暂不可用（HTTP 5xx、模型加载中）"""
+    pass
+
+
+class APITimeoutError(RetryableAPIError):
+    """外部接口请求超时"""
+    pass
+
+
+class APIConnectionError(RetryableAPIError):
+    """外部接口连接失败"""
+    pass
+
+
+class DeadlineExceededError(APIError):
+    """整体时间预算已用完，不再重试"""
+    
+    def __init__(self, message, last_error=None):
+        self.last_error = last_error
+        super().__init__(message)
+
+
+class GenerationCancelledError(DeadlineExceededError):
+    """生成已被取消（剩余的时间预算作废，不再发起或重试外部请求）"""
+    pass
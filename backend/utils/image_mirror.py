@@ -0,0 +1,33 @@
+"""
+Image Mirror Utility
+Uses Pillow (PIL) to flip images horizontally (local synthesis of mirrored directions)
+"""
+import io
+from PIL import Image
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Direction that is the horizontal mirror of each direction on the left side of a side-view character
+MIRROR_SOURCES = {
+    'west': 'east',
+    'south-west': 'south-east',
+    'north-west': 'north-east',
+}
+
+
+def mirror_image(image_bytes: bytes) -> bytes:
+    """
+    Flip an image horizontally
+
+    Args:
+        image_bytes: Image binary data (any format Pillow reads)
+
+    Returns:
+        Mirrored image as PNG binary data (transparency is kept)
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        mirrored = image.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+        output = io.BytesIO()
+        mirrored.save(output, format='PNG')
+    return output.getvalue()
@@ -44,6 +44,17 @@ def validate_character_form(data: dict) -> dict:
         except (ValueError, TypeError):
             raise ValidationError("imageLength must be a valid integer")
     
+    if 'deadlineSeconds' in data:
+        try:
+            deadline_seconds = float(data['deadlineSeconds'])
+        except (ValueError, TypeError):
+            raise ValidationError("deadlineSeconds must be a number")
+        if deadline_seconds <= 0 or deadline_seconds > 3600:
+            raise ValidationError("deadlineSeconds must be between 0 and 3600")
+    
+    if 'mirrorDirections' in data and not isinstance(data['mirrorDirections'], bool):
+        raise ValidationError("mirrorDirections must be a boolean")
+    
     return data
 
 
@@ -60,3 +71,31 @@ def validate_character_id(character_id: str) -> str:
     
     return character_id
 
+
+def validate_batch_id(batch_id: str) -> str:
+    """Validate batch ID format"""
+    if not batch_id:
+        raise ValidationError("Batch ID is required")
+    
+    try:
+        from bson import ObjectId
+        ObjectId(batch_id)
+    except Exception:
+        raise ValidationError("Invalid batch ID format")
+    
+    return batch_id
+
+
+def validate_job_id(job_id: str) -> str:
+    """Validate job ID format"""
+    if not job_id:
+        raise ValidationError("Job ID is required")
+    
+    try:
+        from bson import ObjectId
+        ObjectId(job_id)
+    except Exception:
+        raise ValidationError("Invalid job ID format")
+    
+    return job_id
+
@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import CharacterForm from "../components/create/CharacterForm";
 import GeneratingLoader from "../components/result/GeneratingLoader";
 import ImageGrid from "../components/result/ImageGrid";
@@ -7,10 +7,86 @@ import ActionButtons from "../components/result/ActionButtons";
 import RotatingCharacter from "../components/result/RotatingCharacter";
 import PageLayout from "../components/common/PageLayout";
 
+const JOB_POLL_INTERVAL_MS = 2000; // Generation job status polling interval
+
 function CreateResultPage() {
   const [isGenerating, setIsGenerating] = useState(false);
   const [generatedData, setGeneratedData] = useState(null);
   const [lastFormData, setLastFormData] = useState(null); // Save last form data for regenerate
+  const activeGeneration = useRef(null); // Queued generation response while waiting for its result
+
+  // Leaving the page cancels the generation nobody is waiting for anymore
+  useEffect(() => {
+    const cancelActiveGeneration = () => {
+      const queued = activeGeneration.current;
+      if (queued?.cancel_url) {
+        navigator.sendBeacon(`${import.meta.env.VITE_API_URL}${queued.cancel_url}`);
+        activeGeneration.current = null;
+      }
+    };
+    window.addEventListener('pagehide', cancelActiveGeneration);
+    return () => {
+      window.removeEventListener('pagehide', cancelActiveGeneration);
+      cancelActiveGeneration();
+    };
+  }, []);
+
+  const waitForJob = async (apiUrl, jobId) => {
+    while (true) {
+      await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+      const response = await fetch(`${apiUrl}/api/v1/jobs/${jobId}`);
+      if (!response.ok) {
+        throw new Error(`Failed to get generation status (${response.status})`);
+      }
+      const job = await response.json();
+      if (job.status === 'succeeded') {
+        return job.character;
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Character generation failed');
+      }
+      if (job.status === 'cancelled') {
+        throw new Error('Character generation was cancelled');
+      }
+    }
+  };
+
+  // Wait for the generation through its progress event stream, fall back to polling the job
+  const waitForGeneration = (apiUrl, queued) => {
+    if (!window.EventSource || !queued.events_url) {
+      return waitForJob(apiUrl, queued.job_id);
+    }
+    return new Promise((resolve, reject) => {
+      const source = new EventSource(`${apiUrl}${queued.events_url}`);
+      const finish = (settle, value) => {
+        source.close();
+        settle(value);
+      };
+      const fallBackToPolling = () => {
+        source.close();
+        waitForJob(apiUrl, queued.job_id).then(resolve, reject);
+      };
+
+      source.addEventListener('snapshot', (event) => {
+        const snapshot = JSON.parse(event.data);
+        if (snapshot.status === 'pending_save' || snapshot.status === 'completed') {
+          finish(resolve, snapshot.character);
+        }
+      });
+      source.addEventListener('completed', (event) => {
+        finish(resolve, JSON.parse(event.data).character);
+      });
+      source.addEventListener('failed', (event) => {
+        finish(reject, new Error(JSON.parse(event.data).error || 'Character generation failed'));
+      });
+      source.addEventListener('cancelled', () => {
+        finish(reject, new Error('Character generation was cancelled'));
+      });
+      // Stream ended without a result event (or the connection dropped)
+      source.addEventListener('end', fallBackToPolling);
+      source.onerror = fallBackToPolling;
+    });
+  };
 
   const handleGenerate = async (formData) => {
     setIsGenerating(true);
@@ -43,7 +119,10 @@ function CreateResultPage() {
         throw new Error(errorData.message || errorData.error || 'Failed to generate character');
       }
 
-      const data = await response.json();
+      // Generation runs as a background job, wait until it finishes
+      const queued = await response.json();
+      activeGeneration.current = queued;
+      const data = await waitForGeneration(apiUrl, queued);
       
       // Convert image URLs to full URLs (if API returns relative paths) (with safety check)
       const images = (data.images || []).map(img => ({
@@ -80,6 +159,7 @@ function CreateResultPage() {
         stack: error.stack
       });
     } finally {
+      activeGeneration.current = null;
       setIsGenerating(false);
     }
   };